@@ -1,160 +1,469 @@
+import time
+STARTUP_STARTED = time.perf_counter()
+
 import turtle
 import sys
-import random
-from PIL import Image 
 import os
-import pygame
-import time
+import threading
 import math
+import argparse
+import sqlite3
+from pong_core import Court, MultiBallMatch, BALL_RADIUS, SCORE, TICK_SECONDS
+from pong_frontend import FrontEnd, game_size
+from pong_net import NetClient, NetHost, DEFAULT_PORT, parse_address
+from pong_widgets import Widget, WidgetIndex
+from pong_render import (MatchRenderer, SkinCache, SKIN_FILES, SKIN_SIZE, SOUND_FILES, FALLBACK_BALL_COLOR,
+                         TIMER_FONT_SIZE, OVERLAY_FONT_SIZE, score_font_size, score_text, timer_text)
 
 # Constants
-MIN_WIDTH = 800
-MIN_HEIGHT = 600
-DEFAULT_BALL_SPEED = 0.15
-DEFAULT_PADDLE_SPEED = 20
+GAME_LOOP_MODE = "timer"  # "timer" (Tk ontimer, non-blocking) or "blocking"
+STARTUP_BUDGET_MS = 300  # Target time from launch to the first drawn frame
+BALL_COUNTS = (1, 10, 25, 50, 100, 200)  # Choices for the Balls setting
+STOCK_SHAPE_SIZE = 20  # Width of turtle's square and circle shapes at shapesize 1
+
+# The turtle front end only needs pygame for audio, so it is imported by load_pygame()
+pygame = None
+
+
+def load_pygame():
+    """Import pygame on first use and return the module."""
+    global pygame
+    if pygame is None:
+        import pygame as pygame_module
+        pygame = pygame_module
+    return pygame
+
+
+class TurtlePool:
+    """Hands out hidden turtles and takes them back for reuse.
+
+    Turtle never forgets a turtle once created (every instance stays in
+    the screen's turtle list), so menus and overlays borrow from here
+    instead of creating new ones on each visit.
+    """
 
-class PongGame:
     def __init__(self):
-        # Initialize pygame for sound
-        pygame.init()
-        pygame.mixer.init()
+        self.free = []
+        self.in_use = set()
+
+    def acquire(self):
+        """Return a hidden, pen-up turtle at the origin."""
+        if self.free:
+            t = self.free.pop()
+        else:
+            t = turtle.Turtle(visible=False)
+            t.speed(0)
+            t.penup()
+        self.in_use.add(t)
+        return t
+
+    def release(self, t):
+        """Wipe a turtle's drawings and state and put it back in the pool."""
+        if t not in self.in_use:
+            return
+        self.in_use.discard(t)
+        t.reset()
+        t.hideturtle()
+        t.penup()
+        t.speed(0)
+        t.shape("classic")
+        self.free.append(t)
+
+    @property
+    def size(self):
+        """Total number of turtles ever created by the pool."""
+        return len(self.free) + len(self.in_use)
+
+
+class HudText:
+    """A single line of HUD text that is only redrawn when it changes."""
+
+    def __init__(self, pen, x, y, font, color="black"):
+        self.pen = pen
+        self.pen.color(color)
+        self.pen.goto(x, y)
+        self.font = font
+        self.text = None
+
+    def write(self, text, position=None):
+        """Draw text, skipping the canvas work if nothing changed."""
+        position = position or self.pen.position()
+        if text == self.text and position == self.pen.position():
+            return
+        self.pen.clear()
+        self.pen.goto(position)
+        self.pen.write(text, align="center", font=self.font)
+        self.text = text
+
+    def clear(self):
+        """Remove the text from the canvas."""
+        self.pen.clear()
+        self.text = None
+
+
+class MenuScene:
+    """A menu screen that is drawn once, then shown and hidden as a group.
+
+    Borders and fixed text all go on one pen turtle. Hiding the scene
+    sets the state of its canvas items instead of deleting them, so going
+    back to a menu costs one Tk call per item rather than a full redraw.
+    Text that changes, like a setting's value, is a HudText label that is
+    rewritten in place; only set labels while the scene is shown. Buttons
+    are registered in the scene's WidgetIndex with the rectangle they are
+    drawn with.
+    """
+
+    def __init__(self, screen, pool, pensize):
+        self.canvas = screen.getcanvas()
+        self.pool = pool
+        self.pensize = pensize
+        self.pen = pool.acquire()
+        self.labels = {}
+        self.shapes = []
+        self.widgets = WidgetIndex()
+        self.visible = True
+
+    def border(self, x, y, width, height, color="black"):
+        """Draw a rectangle outline centered on (x, y)."""
+        pen = self.pen
+        pen.pensize(self.pensize)
+        pen.color(color)
+        pen.goto(x - width / 2, y - height / 2)
+        pen.pendown()
+        for _ in range(2):
+            pen.forward(width)
+            pen.left(90)
+            pen.forward(height)
+            pen.left(90)
+        # Closing the line keeps screen.update() from redrawing it every frame
+        pen.penup()
+
+    def button(self, x, y, width, height, onclick, color="black"):
+        """Draw a border that calls onclick() when clicked inside."""
+        self.border(x, y, width, height, color)
+        return self.widgets.add(Widget(x, y, width, height, onclick))
+
+    def text(self, x, y, text, font_size=16, color="black"):
+        """Write fixed text centered on x."""
+        self.pen.color(color)
+        self.pen.goto(x, y)
+        self.pen.write(text, align="center", font=("Courier", font_size, "bold"))
+
+    def label(self, name, x, y, font_size=16, color="black"):
+        """Add a line of text that set_label() can change later."""
+        self.labels[name] = HudText(self.pool.acquire(), x, y, ("Courier", font_size, "bold"), color)
+
+    def set_label(self, name, text):
+        self.labels[name].write(text)
+
+    def shape(self, shape, x, y):
+        """Show a turtle shape, such as a skin image, as part of the scene."""
+        t = self.pool.acquire()
+        try:
+            t.shape(shape)
+        except (turtle.TurtleGraphicsError, AttributeError):
+            self.pool.release(t)
+            raise
+        t.goto(x, y)
+        t.showturtle()
+        self.shapes.append(t)
+        return t
+
+    def set_visible(self, visible):
+        if visible == self.visible:
+            return
+        state = "normal" if visible else "hidden"
+        for t in (self.pen, *(label.pen for label in self.labels.values())):
+            for item in t.items:
+                self.canvas.itemconfigure(item, state=state)
+        for t in self.shapes:
+            if visible:
+                t.showturtle()
+            else:
+                t.hideturtle()
+        self.visible = visible
+
+
+class TurtleRenderer(MatchRenderer):
+    """Draws a match with turtles from a PongGame's pool onto its Tk screen."""
+
+    def __init__(self, game):
+        self.game = game
+        self.elements = []  # Paddles and ball of the current match
+        self.paddle_a = None
+        self.paddle_b = None
+        self.ball = None
+        self.ball_color = None
+        self.names = None
+        self.score_pen = None
+        self.timer_pen = None
+        self.overlay_pen = None
+
+    def start(self, match, names, skin, show_timer):
+        """Create the paddles, ball and HUD for a match."""
+        court = match.court
+        self.names = names
+        if show_timer:
+            if not self.timer_pen:
+                self.timer_pen = HudText(self.game.turtle_pool.acquire(), 0, court.boundary_y - 30,
+                                         ("Courier", TIMER_FONT_SIZE, "bold"))
+            self.timer_pen.write(timer_text(match))
+        self.paddle_a = self.create_paddle(-court.paddle_x_position, 0)
+        self.paddle_b = self.create_paddle(court.paddle_x_position, 0)
+        self.ball = self.create_ball(match, skin)
+        if not self.score_pen:
+            self.score_pen = HudText(self.game.turtle_pool.acquire(), 0, court.boundary_y - 50,
+                                     ("Courier", score_font_size(court), "normal"))
+        self.update_score(match)
+
+    def create_paddle(self, x, y):
+        """Create a paddle at the given position."""
+        paddle = self.game.turtle_pool.acquire()
+        paddle.shape("square")
+        paddle.color("black")
+        paddle.shapesize(stretch_wid=5, stretch_len=1)
+        paddle.goto(x, y)
+        paddle.showturtle()
+        self.elements.append(paddle)
+        return paddle
+    
+    def create_ball(self, match, skin):
+        """Create the game ball with the selected skin."""
+        game = self.game
+        ball = game.turtle_pool.acquire()
+
+        if isinstance(match, MultiBallMatch):
+            # One hidden pen draws every ball as a dot each frame
+            color = game.ball_skins.get(skin, "")
+            self.ball_color = color if color.startswith("#") else "red"
+            self.elements.append(ball)
+            self.draw_balls(match, ball)
+            return ball
+
+        if skin in game.ball_skins:
+            shape = game.skin_shape(skin)
+            if shape:
+                ball.shape(shape)
+            else:
+                ball.shape("circle")
+                ball.color(game.ball_skins[skin])
+        else:
+            ball.shape("circle")
+            ball.color("red")
+
+        ball.goto(match.ball_x, match.ball_y)
+        ball.showturtle()
+        self.elements.append(ball)
+        return ball
+    
+    def draw_balls(self, match, pen=None):
+        """Redraw all balls of a multi-ball match with the ball pen."""
+        pen = pen or self.ball
+        pen.clear()
+        for x, y in zip(match.ball_xs, match.ball_ys):
+            pen.goto(x, y)
+            pen.dot(BALL_RADIUS * 2, self.ball_color)
+
+    def update_score(self, match):
+        """Update the score display."""
+        scoreboard_y = match.court.boundary_y - (score_font_size(match.court) * 0.1)
+        self.score_pen.write(score_text(match, self.names), (0, scoreboard_y))
+
+    def draw(self, match, events, previous=None, alpha=1.0):
+        """Copy the simulated match state onto the paddle and ball turtles.
+
+        Turtle frames are slower than physics ticks, so previous and
+        alpha are ignored and the latest tick is drawn.
+        """
+        if isinstance(match, MultiBallMatch):
+            self.draw_balls(match)
+        else:
+            self.ball.goto(match.ball_x, match.ball_y)
+        self.paddle_a.sety(match.paddle_a_y)
+        self.paddle_b.sety(match.paddle_b_y)
+        if SCORE in events:
+            self.update_score(match)
+        if self.timer_pen and self.timer_pen.text:
+            self.timer_pen.write(timer_text(match))
+
+    def show_overlay(self, text):
+        if text is None:
+            if self.overlay_pen:
+                self.overlay_pen.clear()
+            return
+        if not self.overlay_pen:
+            self.overlay_pen = HudText(self.game.turtle_pool.acquire(), 0, -self.game.boundary_y + 10,
+                                       ("Courier", OVERLAY_FONT_SIZE, "normal"), color="gray40")
+        self.overlay_pen.write(text)
+
+    def present(self):
+        self.game.screen.update()
+
+    def clear(self):
+        """Return the paddles and ball to the pool and blank the HUD."""
+        for element in self.elements:
+            self.game.turtle_pool.release(element)
+        self.elements.clear()
+        for pen in (self.score_pen, self.timer_pen, self.overlay_pen):
+            if pen:
+                pen.clear()
+
+
+class PongGame(FrontEnd):
+    def __init__(self, network=None):
+        self.startup_timings = {}
+        self.mark_startup("imports")
+        super().__init__(network)
         
         # Game state variables
-        self.score_a = 0
-        self.score_b = 0
-        self.game_running = False
-        self.paused = False
+        self.loop_generation = 0
         self.mode_selected = False
-        self.one_player = False
-        self.audio_enabled = True
-        self.difficulty_level = "medium"
-        self.time_limit_seconds = 300  # 5 minutes
-        self.time_left = self.time_limit_seconds
-        self.timer_pen = None
-        self.selected_skin = "default"
         self.version = "1.0.0" 
-        self.player_1_name = "Player 1"  # Default name for Player 1
-        self.player_2_name = "Player 2"  # Default name for Player 2
         
         self.menu_elements = []  # Initialize menu elements list
+        # MenuScenes by name, built on first visit; active_scene is the one on screen
+        self.scenes = {}
+        self.active_scene = None
+        # Buttons of the screen on display when it is not a cached scene
+        self.widgets = WidgetIndex()
+        self.turtle_pool = TurtlePool()
+        self.audio_button = None
+        self.renderer = TurtleRenderer(self)
         
         # Initialize screen
         self.setup_screen()
+        self.mark_startup("screen")
         
         # Load resources
         self.load_resources()
+        self.mark_startup("resources")
         
         # Initialize game elements
-        self.show_start_screen()
+        if self.network:
+            self.start_network_game()
+        else:
+            self.show_start_screen()
+
+    def mark_startup(self, phase):
+        """Record how many milliseconds after launch a startup phase finished."""
+        if phase not in self.startup_timings:
+            self.startup_timings[phase] = (time.perf_counter() - STARTUP_STARTED) * 1000
+
+    def startup_report(self):
+        """Return a one-line summary of the startup phase timings."""
+        phases = ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.startup_timings.items())
+        first_frame = self.startup_timings.get("first_frame")
+        if first_frame is not None and first_frame > STARTUP_BUDGET_MS:
+            phases += f" (over the {STARTUP_BUDGET_MS} ms budget)"
+        return f"Startup: {phases}"
 
     def setup_screen(self):
         """Set up the game screen with responsive dimensions."""
         self.screen = turtle.Screen()
-        screen_width = max(self.screen.window_width(), MIN_WIDTH)
-        screen_height = max(self.screen.window_height(), MIN_HEIGHT)
         
         # Calculate game area dimensions
-        self.game_width = min(1000, int(screen_width * 0.95))
-        self.game_height = min(800, int(screen_height * 0.95))
-        
-        # Calculate boundaries
-        self.boundary_x = int(self.game_width / 2) - 10
-        self.boundary_y = int(self.game_height / 2) - 10
-        self.paddle_x_position = int(self.boundary_x * 0.9)
+        game_width, game_height = game_size(self.screen.window_width(), self.screen.window_height())
+        if self.network_client:
+            # Play on the host's court
+            game_width = self.network.court.game_width
+            game_height = self.network.court.game_height
+        
+        # Calculate boundaries and the speeds scaled to them
+        self.set_court(Court(game_width, game_height))
+        self.boundary_x = self.court.boundary_x
+        self.boundary_y = self.court.boundary_y
+        self.paddle_x_position = self.court.paddle_x_position
         
         # Set up the screen
         self.screen.title("Pong Game")
         self.screen.bgcolor("black")
         self.screen.setup(width=self.game_width, height=self.game_height)
         self.screen.tracer(0)
-        
-        # Calculate scale factor for responsive design
-        self.scale_factor = min(self.game_width / 800, self.game_height / 600)
-        
-        # Game speeds
-        self.ball_speed_x = DEFAULT_BALL_SPEED * self.scale_factor
-        self.ball_speed_y = DEFAULT_BALL_SPEED * self.scale_factor
-        self.paddle_speed = DEFAULT_PADDLE_SPEED * self.scale_factor
 
     def load_resources(self):
-        """Load game resources (sounds, skins, etc.) with error handling."""
-        # Set up sounds directory
-        sounds_dir = "sounds"
-        if not os.path.exists(sounds_dir):
-            os.makedirs(sounds_dir)
-        
+        """Set up game resources; sounds load in the background when needed."""
         # Sound paths
-        sound_files = {
-            "paddle_hit": "sounds/boing-101318.wav",
-            "wall_hit": "sounds/wall-hit-3-48114.wav",
-            "score": "sounds/score.wav",
-            "click": "sounds/click.wav"
-        }
-        
-        # Load sounds
+        self.sound_files = dict(SOUND_FILES)
         self.sounds = {}
-        for name, path in sound_files.items():
+        self.audio_loader = None
+        
+        # Set up skins
+        self.setup_skins()
+
+    def start_audio(self):
+        """Start the mixer and load sounds in a background thread."""
+        if self.audio_loader is None:
+            self.audio_loader = threading.Thread(target=self.load_sounds, daemon=True)
+            self.audio_loader.start()
+
+    def load_sounds(self):
+        """Start only pygame's mixer and load every sound file."""
+        try:
+            load_pygame().mixer.init()
+        except ImportError as e:
+            print(f"Audio disabled, pygame is not available: {e}")
+            return
+        except pygame.error as e:
+            print(f"Error starting audio: {e}")
+            return
+
+        sounds = {}
+        for name, path in self.sound_files.items():
             try:
                 if os.path.exists(path):
-                    self.sounds[name] = pygame.mixer.Sound(path)
+                    sounds[name] = pygame.mixer.Sound(path)
                 else:
-                    self.sounds[name] = None
+                    sounds[name] = None
                     print(f"Sound file not found: {path}")
             except (pygame.error, FileNotFoundError) as e:
-                self.sounds[name] = None
+                sounds[name] = None
                 print(f"Error loading sound {path}: {e}")
-        
-        # Set up skins
-        self.setup_skins()
+        self.sounds = sounds
     
     def setup_skins(self):
-        """Set up ball skins with fallbacks."""
-        self.original_skins = {
-            "default": "#FF0000",
-            "Basketball": "skins/skin ball.gif",
-            "Pingpong Ball": "skins/pingpong.gif",
-            "Tennis Ball": "skins/tennis.gif"
-        }
+        """Set up ball skins with fallbacks; images are resized on first use."""
+        self.original_skins = dict(SKIN_FILES)
         
         self.ball_skins = {}
+        self.skin_shapes = {}
+        self.skin_cache = SkinCache()
         
-        # Create skins directory if it doesn't exist
-        if not os.path.exists("skins"):
-            os.makedirs("skins")
-            print("Created 'skins' directory. Please add skin images to this directory.")
-        
-        # Process each skin
+        # Check each skin
         for skin, img in self.original_skins.items():
-            if isinstance(img, str) and img.endswith(".gif"):
-                if os.path.exists(img):
-                    resized_img = self.resize_image(img)  
-                    if resized_img:
-                        self.ball_skins[skin] = resized_img
-                        self.screen.addshape(resized_img)
-                    else:
-                        self.ball_skins[skin] = "#FF0000"  # Fallback
-                else:
-                    print(f"Skin image not found: {img}")
-                    self.ball_skins[skin] = "#FF0000"  # Fallback
+            if isinstance(img, str) and img.endswith(".gif") and not os.path.exists(img):
+                print(f"Skin image not found: {img}")
+                self.ball_skins[skin] = FALLBACK_BALL_COLOR
             else:
                 self.ball_skins[skin] = img
+
+    def skin_shape(self, skin):
+        """Return the turtle shape for an image skin, or None for a color skin."""
+        img = self.ball_skins.get(skin)
+        if not (isinstance(img, str) and img.endswith(".gif")):
+            return None
+        if skin not in self.skin_shapes:
+            shape = self.resize_image(img)
+            if shape:
+                self.screen.addshape(shape)
+            else:
+                self.ball_skins[skin] = FALLBACK_BALL_COLOR
+            self.skin_shapes[skin] = shape
+        return self.skin_shapes[skin]
     
-    def resize_image(self, image_path, new_size=(80, 60)):
-        """Resizes an image to a given size."""
+    def resize_image(self, image_path, new_size=SKIN_SIZE):
+        """Resizes an image to a given size, using the skin cache."""
         try:
-            img = Image.open(image_path)
-            img = img.resize(new_size)
-            
-            new_path = image_path.replace(".gif", "_resized.gif") 
-            img.save(new_path)
-            return new_path
+            return self.skin_cache.get(image_path, new_size)
         except (FileNotFoundError, IOError) as e:
             print(f"Error processing image {image_path}: {e}")
             return None
     
     def play_sound(self, sound_name):
         """Play a sound if audio is enabled and the sound exists."""
-        if self.audio_enabled and sound_name in self.sounds and self.sounds[sound_name]:
+        if not self.audio_enabled:
+            return
+        self.start_audio()
+        if sound_name in self.sounds and self.sounds[sound_name]:
             try:
                 self.sounds[sound_name].play()
             except (pygame.error, AttributeError):
@@ -166,57 +475,44 @@ class PongGame:
         self.play_sound("click")
         self.update_game_ui()
     
-    def create_button(self, shape, position, size=1, onclick=None):
+    def create_button(self, shape, position, size=1, onclick=None, sound=True):
         """Create an interactive button."""
-        button = turtle.Turtle()
-        button.speed(0)
-        button.penup()
+        button = self.turtle_pool.acquire()
         button.shape(shape)
         button.shapesize(size)
         button.goto(position)
+        button.showturtle()
+        self.menu_elements.append(button)
         
         if onclick:
-            self.menu_elements.append({
-                "turtle": button,
-                "x": position[0],
-                "y": position[1],
-                "width": 30 * size,
-                "height": 30 * size,
-                "onclick": onclick
-            })
-        else:
-            self.menu_elements.append(button)
+            self.widgets.add(Widget(position[0], position[1], STOCK_SHAPE_SIZE * size,
+                                    STOCK_SHAPE_SIZE * size, onclick, sound))
         
         return button
+
+    def draw_button(self, x, y, width, height, onclick, color="black"):
+        """Draw a bordered button that calls onclick() when clicked inside."""
+        self.draw_border(x, y, width, height, color=color)
+        return self.widgets.add(Widget(x, y, width, height, onclick))
+
+    def on_click(self, x, y):
+        """Call the button under a click, on the cached scene or the current screen."""
+        widgets = self.active_scene.widgets if self.active_scene else self.widgets
+        widget = widgets.find(x, y)
+        if widget:
+            if widget.sound:
+                self.play_sound("click")
+            widget.onclick()
     
     
-    def create_timer_display(self):
-        """Create or update the timer display."""
-        if not self.timer_pen:
-            self.timer_pen = turtle.Turtle()
-            self.timer_pen.hideturtle()
-            self.timer_pen.penup()
-            self.timer_pen.color("black")
-            self.timer_pen.goto(0, self.boundary_y - 30)
-        self.update_timer_display()
-
-    def update_timer_display(self):
-        """Update the timer display."""
-        if self.timer_pen:
-            self.timer_pen.clear()
-            mins = int(self.time_left) // 60
-            secs = int(self.time_left) % 60
-            self.timer_pen.write(f"Time Left: {mins:02d}:{secs:02d}", align="center", font=("Courier", 18, "bold"))
-    
     def show_start_screen(self):
         """Show an enhanced animated press-to-start screen."""
         self.hide_menu()
         self.screen.bgcolor("white")
 
         # Optional: fade-in overlay effect
-        fade = turtle.Turtle(visible=False)
-        fade.penup()
-        fade.goto(0, 0)
+        fade = self.turtle_pool.acquire()
+        self.menu_elements.append(fade)
         fade.shape("circle")
         fade.shapesize(self.game_height, self.game_width)
         fade.color("white")
@@ -227,6 +523,13 @@ class PongGame:
             for alpha in range(10, -1, -1):
                 fade.color((alpha / 10, alpha / 10, alpha / 10))  # grayscale fade
                 self.screen.update()
+                if "first_frame" not in self.startup_timings:
+                    self.mark_startup("first_frame")
+                    if os.environ.get("PONG_STARTUP_REPORT"):
+                        print(self.startup_report())
+                    # Audio is not needed for the first frame, so warm it up now
+                    if self.audio_enabled:
+                        self.start_audio()
                 time.sleep(0.05)
             fade.clear()
 
@@ -239,7 +542,6 @@ class PongGame:
 
         # Pulsing "Press Anywhere" text
         press_text = self.create_text(0, 40, "Press Anywhere to Start", font_size=int(18 * self.scale_factor), color="black")
-        self.menu_elements.append(press_text)
 
         # Version info
         version_text = f"Version {getattr(self, 'version', 'Classic Pong')}"
@@ -249,21 +551,24 @@ class PongGame:
         balls = []
         ball_colors = ["red", "blue", "green", "yellow", "purple"]
         for i in range(3):
-            ball = turtle.Turtle()
+            ball = self.turtle_pool.acquire()
             ball.shape("circle")
             ball.shapesize(0.7)
             ball.color(ball_colors[i % len(ball_colors)])
-            ball.penup()
             ball.goto(-200 + i * 100, -50 + i * 40)
+            ball.showturtle()
             ball.dx = 2 + i * 0.5
             ball.dy = 1 + i * 0.3
             balls.append(ball)
             self.menu_elements.append(ball)
 
         self.start_screen_active = True
+        # Balls go back to the pool when this screen is left, so an older
+        # animation must never touch them again
+        self.start_screen_token = token = object()
 
         def animate_elements():
-            if not self.start_screen_active:
+            if not self.start_screen_active or self.start_screen_token is not token:
                 return
 
             for ball in balls:
@@ -306,8 +611,7 @@ class PongGame:
         help_x = self.game_width // 2 - 40
         help_y = -self.game_height // 2 + 40
         self.draw_border(help_x, help_y, 48, 48, color="orange")
-        help_btn = self.create_text(help_x, help_y -20, "?", font_size=int(28 * self.scale_factor), color="darkblue")
-        self.menu_elements.append(help_btn)
+        self.create_text(help_x, help_y -20, "?", font_size=int(28 * self.scale_factor), color="darkblue")
 
         def show_manual(x, y):
             # Check if click is inside the help button
@@ -320,9 +624,7 @@ class PongGame:
                         obj.hideturtle()
                 
                 # Draw filled background for the manual
-                bg = turtle.Turtle()
-                bg.hideturtle()
-                bg.penup()
+                bg = self.turtle_pool.acquire()
                 bg.goto(-self.calc_width(80)//2, -self.calc_height(60)//2)
                 bg.pendown()
                 bg.color("black")
@@ -384,250 +686,123 @@ class PongGame:
     def start_game(self):
         """Start the main game."""
         self.hide_menu()
-        self.reset_scores()
-        
-        if not self.one_player:
-            self.time_left = self.time_limit_seconds
-            self.create_timer_display()
-        
-        # Create game objects
-        self.paddle_a = self.create_paddle(-self.paddle_x_position, 0)
-        self.paddle_b = self.create_paddle(self.paddle_x_position, 0)
-        self.ball = self.create_ball()
-        self.pen = self.create_score_display()
+        self.start_match()
         self.create_game_ui()
         
         # Set up key bindings
         self.setup_key_bindings()
         # Start game loop
-        self.game_running = True
-        # Timer logic for two player mode
-        self.game_loop()
+        if GAME_LOOP_MODE == "blocking":
+            self.game_loop()
+        else:
+            self.start_game_timer()
+    
+    def start_network_game(self):
+        """Start a two player match over the network, waiting for the client if hosting."""
+        self.one_player = False
+        self.ball_count = 1
+        if self.network_client:
+            self.player_1_name = "Host"
+            self.start_game()
+            return
+        
+        self.player_2_name = "Remote"
+        port = self.network.address[1]
+        self.create_text(0, 0, f"Waiting for a player on port {port}...",
+                         font_size=int(16 * self.scale_factor), color="white")
+        self.screen.update()
+        
+        def wait_for_client():
+            self.network.poll()
+            if self.network.connected:
+                self.start_game()
+            else:
+                self.screen.ontimer(wait_for_client, 50)
+        wait_for_client()
     
     def setup_key_bindings(self):
         """Set up keyboard controls for the game."""
         self.screen.listen()
-        self.screen.onkeypress(lambda: self.move_paddle(self.paddle_a, self.paddle_speed), "w")
-        self.screen.onkeypress(lambda: self.move_paddle(self.paddle_a, -self.paddle_speed), "s")
-        
-        if not self.one_player:
-            self.screen.onkeypress(lambda: self.move_paddle(self.paddle_b, self.paddle_speed), "Up")
-            self.screen.onkeypress(lambda: self.move_paddle(self.paddle_b, -self.paddle_speed), "Down")
+        # Key presses and releases only update keys_held; the paddles move
+        # once per physics tick for as long as a key is held
+        for key, side in self.paddle_keys().items():
+            self.screen.onkeypress(lambda k=key, sd=side: self.set_key_held(k, sd, True), key)
+            self.screen.onkeyrelease(lambda k=key, sd=side: self.set_key_held(k, sd, False), key)
         
         self.screen.onkeypress(self.toggle_pause, "p")
         self.screen.onkeypress(self.return_to_menu, "Escape")
+        self.screen.onkeypress(self.toggle_profiler_overlay, "F3")
     
     def game_loop(self):
-        """Main game loop."""
-        ai_frame_counter = 0
-        ai_recovery_counter = 0
+        """Blocking game loop: physics at a fixed tick rate, one render per pass."""
+        self.reset_frame_clock()
     
         while self.game_running:
-            self.screen.update()
+            if self.paused:
+                self.screen.update()
+                self.reset_frame_clock()
+                time.sleep(TICK_SECONDS)
+                continue
 
-            if not self.paused:
-            # Move ball
-                self.ball.setx(self.ball.xcor() + self.ball.dx)
-                self.ball.sety(self.ball.ycor() + self.ball.dy)
+            delay = self.advance_frame()
+            if delay is None:
+                break
+            self.present_frame()
 
-            # AI player logic
-                if self.one_player:
-                    if ai_recovery_counter > .0100:
-                        ai_recovery_counter -= .1
-                
-                    ai_frame_counter += .1
-                    if ai_frame_counter >= self.ai_reaction_delay and ai_recovery_counter == 0:
-                        self.ai_move_paddle(self.paddle_b, self.ball)
-                        ai_frame_counter = 0
-
-            # Ball collision with top and bottom
-                if self.ball.ycor() > self.boundary_y or self.ball.ycor() < -self.boundary_y:
-                    self.ball.dy *= -1
-                    self.play_sound("wall_hit")
-
-            # Scoring
-                if self.ball.xcor() > self.boundary_x:
-                    self.score_a += 1
-                    self.play_sound("score")
-                    self.reset_ball()
-                    self.update_score()
-                    ai_recovery_counter = 30
-                elif self.ball.xcor() < -self.boundary_x:
-                    self.score_b += 1
-                    self.play_sound("score")
-                    self.reset_ball()
-                    self.update_score()
-                    
-                # --- WIN CHECK FOR EASY MODE ---
-                if self.one_player and self.difficulty_level == "easy":
-                    if self.score_a >= 5 or self.score_b >= 5:
-                        self.game_running = False
-                        winner = self.player_1_name if self.score_a >= 5 else "AI"
-                        self.show_end_screen(winner)
-                        break
-                    
-                if self.one_player and self.difficulty_level == "medium":
-                    if self.score_a >= 10 or self.score_b >= 3:
-                        self.game_running = False
-                        winner = self.player_1_name if self.score_a >= 10 else "AI"
-                        self.show_end_screen(winner)
-                        break
-                
-                if self.one_player and self.difficulty_level == "hard":
-                    if self.score_a >= 15 or self.score_b >= 5:
-                        self.game_running = False
-                        winner = self.player_1_name if self.score_a >= 15 else "AI"
-                        self.show_end_screen(winner)
-                        break
-
-            # Paddle collisions with improved bounce logic
-                paddle_collision_margin = self.paddle_x_position - 20
-                if self.check_paddle_collision(self.ball, self.paddle_b, paddle_collision_margin):
-                    self.ball.dx = -abs(self.ball.dx)  # Ensure ball moves left
-                    self.play_sound("paddle_hit")
-                elif self.check_paddle_collision(self.ball, self.paddle_a, -paddle_collision_margin):
-                    self.ball.dx = abs(self.ball.dx)  # Ensure ball moves right
-                    self.play_sound("paddle_hit")
-                        # Timer logic for two player mode
-                if not self.one_player:
-                    self.time_left -= 0.01
-                    self.update_timer_display()
-                    if self.time_left <= 0:
-                        self.game_running = False
-                        # Decide winner or tie
-                        if self.score_a > self.score_b:
-                            winner = self.player_1_name
-                        elif self.score_b > self.score_a:
-                            winner = self.player_2_name
-                        else:
-                            winner = "It's a Tie!"
-                        self.show_end_screen(winner)
-                        break
-            
-        # Control game speed
-            time.sleep(0.01)
-        
-    def show_end_screen(self, winner):
+        # Sleep until the next physics tick is due
+            time.sleep(delay)
+
+    def start_game_timer(self):
+        """Start the non-blocking game loop on Tk's event scheduler."""
+        self.loop_generation += 1
+        self.reset_frame_clock()
+        generation = self.loop_generation
+        self.screen.ontimer(lambda: self.game_tick(generation), 0)
+
+    def game_tick(self, generation):
+        """Run one pass of the non-blocking loop and schedule the next one."""
+        # A newer loop (restart, unpause) has taken over
+        if generation != self.loop_generation or not self.game_running:
+            return
+        # Nothing is rescheduled while paused; toggle_pause restarts the timer
+        if self.paused:
+            return
+
+        delay = self.advance_frame()
+        if delay is None:
+            return
+        self.present_frame()
+        self.screen.ontimer(lambda: self.game_tick(generation), max(1, int(delay * 1000)))
+
+    def toggle_profiler_overlay(self):
+        super().toggle_profiler_overlay()
+        self.redraw_while_paused()
+
+    def show_end_screen(self, title):
         """Show end screen with winner and options to rematch or return to menu."""
+        head_to_head = self.record_match()
         
         # Hide gameplay objects
-        if hasattr(self, 'paddle_a'):
-            self.paddle_a.hideturtle()
-        if hasattr(self, 'paddle_b'):
-            self.paddle_b.hideturtle()
-        if hasattr(self, 'ball'):
-            self.ball.hideturtle()
-        if hasattr(self, 'pen'):
-            self.pen.clear()
-            self.pen.hideturtle()
-        if self.timer_pen:
-            self.timer_pen.clear()
-            self.timer_pen.hideturtle()  # <-- Add this line
+        self.clear_game_objects()
             
         self.hide_menu()
         self.screen.bgcolor("white")
-        self.create_text(0, 80, f"{winner} Wins!", font_size=int(36 * self.scale_factor), color="darkblue")
+        self.create_text(0, 80, title, font_size=int(36 * self.scale_factor), color="darkblue")
+        if head_to_head:
+            self.create_text(0, 55, head_to_head, font_size=int(14 * self.scale_factor), color="gray40")
         self.create_text(0, 20, "Rematch", font_size=int(24 * self.scale_factor), color="green")
         self.create_text(0, -50, "Back to Menu", font_size=int(24 * self.scale_factor), color="orange")
-        self.draw_border(0, 30, 200, 50, color="green")
-        self.draw_border(0, -30, 200, 50, color="orange")
-
-        def on_end_click(x, y):
-            if -100 < x < 100 and 5 < y < 55:
-                self.play_sound("click")
-                self.hide_menu()
-                self.reset_scores()
-                self.start_game()
-            elif -100 < x < 100 and -55 < y < -5:
-                self.play_sound("click")
-                self.create_main_menu()
+        self.draw_button(0, 30, 200, 50, self.rematch, color="green")
+        self.draw_button(0, -30, 200, 50, self.create_main_menu, color="orange")
 
-        self.screen.onscreenclick(on_end_click)
+        self.screen.onscreenclick(self.on_click)
         self.screen.update()
-    
-    def move_paddle(self, paddle, distance):
-        """Move a paddle while staying within boundaries."""
-        paddle_boundary = self.boundary_y - 100
-        new_y = paddle.ycor() + distance
-        if -paddle_boundary < new_y < paddle_boundary:
-            paddle.sety(new_y)
-    
-    def ai_move_paddle(self, paddle, ball):
-        """AI logic for moving the paddle."""
-        # Don't move if ball is moving away
-        if ball.dx < 0:
-            if random.random() < 0.1:
-                random_move = random.uniform(-5, 5)
-                self.move_paddle(paddle, random_move)
-            return
-        
-        # --- Add a miss chance ---
-        if random.random() < 0.08:  
-            return
-        
-        # Predict ball position
-        predicted_y = self.predict_ball_y(ball, paddle)
-        
-        # Apply difficulty factors
-        edge_factor = 1.0
-        if abs(ball.ycor()) > self.boundary_y * 0.75:
-            edge_factor = 1.0 - (self.ai_edge_weakness * (abs(ball.ycor()) - self.boundary_y * 0.75) / (self.boundary_y * 0.25))
-        
-        perfect_y = predicted_y * edge_factor
-        
-        # Add randomness based on difficulty
-        if random.random() > self.ai_accuracy:
-            noise_factor = (1 - self.ai_accuracy) * (self.game_height / 2)
-            perfect_y += random.uniform(-noise_factor, noise_factor)
-        
-        # Limit to screen boundaries
-        perfect_y = max(-self.boundary_y + 50, min(self.boundary_y - 50, perfect_y))
-        
-        # Move paddle
-        if perfect_y > paddle.ycor() + 10:
-            move_amount = min(self.ai_max_speed, abs(perfect_y - paddle.ycor()))
-            paddle.sety(paddle.ycor() + move_amount)
-        elif perfect_y < paddle.ycor() - 10:
-            move_amount = min(self.ai_max_speed, abs(perfect_y - paddle.ycor()))
-            paddle.sety(paddle.ycor() - move_amount)
-    
-    def predict_ball_y(self, ball, paddle):
-        """Predict where the ball will be when it reaches the paddle."""
-        if ball.dx == 0:
-            return ball.ycor()
-        
-        dist_x = abs(paddle.xcor() - ball.xcor())
-        time_steps = dist_x / abs(ball.dx)
-        predicted_y = ball.ycor() + (ball.dy * time_steps)
-        effective_height = self.game_height - 20
-        
-        # Simulate bounces
-        while abs(predicted_y) > effective_height/2:
-            if predicted_y > effective_height/2:
-                over = predicted_y - effective_height/2
-                predicted_y = effective_height/2 - over
-            elif predicted_y < -effective_height/2:
-                under = -predicted_y - effective_height/2
-                predicted_y = -effective_height/2 + under
-        
-        # Add prediction error
-        error = random.uniform(-self.ai_prediction_error * (self.game_height/4), 
-                              self.ai_prediction_error * (self.game_height/4))
-        return predicted_y + error
-    
-    def check_paddle_collision(self, ball, paddle, x_boundary):
-        """Check if the ball collides with a paddle."""
-        paddle_width = 30
-        paddle_height = 80
-        # Check if ball is within paddle's vertical range
-        if paddle.ycor() - paddle_height < ball.ycor() < paddle.ycor() + paddle_height:
-        # For right paddle (positive x_boundary)
-            if x_boundary > 0 and ball.xcor() + 10 >= x_boundary - paddle_width and ball.dx > 0:
-                return True
-        # For left paddle (negative x_boundary)
-            elif x_boundary < 0 and ball.xcor() - 10 <= x_boundary + paddle_width and ball.dx < 0:
-                return True
-        return False
+
+    def rematch(self):
+        """Play again with the same players and settings."""
+        self.hide_menu()
+        self.reset_scores()
+        self.start_game()
     
     def prompt_player_names_screen(self):
         """Custom screen to enter player names before starting Two Player mode."""
@@ -635,6 +810,14 @@ class PongGame:
         self.screen.onscreenclick(None) 
         self.player_1_name = ""
         self.player_2_name = ""
+        # Enter on an empty name reuses the last two player match's names
+        history = self.open_history()
+        try:
+            last_names = history.last_names("two_player") if history else None
+        except sqlite3.Error as e:
+            print(f"Error reading match history: {e}")
+            last_names = None
+        default_1, default_2 = last_names or ("Player 1", "Player 2")
         self._name_entry_active = 1  # 1 for Player 1, 2 for Player 2
         self._name_buffer = ""
 
@@ -655,7 +838,10 @@ class PongGame:
         # Show initial input
         self._player1_text = self.create_text(0, box_y1, "", font_size=int(18 * self.scale_factor), color="black")
         self._player2_text = self.create_text(0, box_y2, "", font_size=int(18 * self.scale_factor), color="black")
-        self._entry_hint = self.create_text(0, -100, "Type name and press Enter", font_size=int(14 * self.scale_factor), color="gray40")
+        hint = "Type name and press Enter"
+        if last_names:
+            hint += f" (empty: {default_1} / {default_2})"
+        self._entry_hint = self.create_text(0, -100, hint, font_size=int(14 * self.scale_factor), color="gray40")
 
         def update_display():
             self._player1_text.clear()
@@ -669,12 +855,12 @@ class PongGame:
         def on_key_press(char):
             if char == "Return":
                 if self._name_entry_active == 1:
-                    self.player_1_name = self._name_buffer or "Player 1"
+                    self.player_1_name = self._name_buffer or default_1
                     self._name_buffer = ""
                     self._name_entry_active = 2
                     update_display()
                 elif self._name_entry_active == 2:
-                    self.player_2_name = self._name_buffer or "Player 2"
+                    self.player_2_name = self._name_buffer or default_2
                     self._name_buffer = ""
                     # Remove key listeners
                     for key in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -_":
@@ -699,113 +885,34 @@ class PongGame:
         self.screen.listen()
         update_display()
     
-    def create_score_display(self):
-        """Create the score display."""
-        pen = turtle.Turtle()
-        pen.speed(0)
-        pen.color("black")
-        pen.penup()
-        pen.hideturtle()
-        pen.goto(0, self.boundary_y - 50)
-        self.update_score(pen)
-        return pen
-    
-    def update_score(self, pen=None):
-        """Update the score display."""
-        pen = pen or self.pen
-        if not pen:
-            return
-
-        pen.clear()
-        font_size = max(18, min(24, int(self.game_height / 30)))
-        scoreboard_y = self.boundary_y - (font_size * 0.1)
-        pen.goto(0, scoreboard_y)
-        pen.write(f"{self.player_1_name}: {self.score_a}  {self.player_2_name}: {self.score_b}",
-              align="center", font=("Courier", font_size, "normal"))
-    
-    def create_paddle(self, x, y):
-        """Create a paddle at the given position."""
-        paddle = turtle.Turtle()
-        paddle.speed(0)
-        paddle.shape("square")
-        paddle.color("black")
-        paddle.shapesize(stretch_wid=5, stretch_len=1)
-        paddle.penup()
-        paddle.goto(x, y)
-        return paddle
-    
-    def create_ball(self):
-        """Create the game ball with the selected skin."""
-        ball = turtle.Turtle()
-        ball.speed(0)
-
-        if self.selected_skin in self.ball_skins:
-            skin = self.ball_skins[self.selected_skin]
-            if isinstance(skin, str) and skin.endswith(".gif"):
-                ball.shape(skin)
-            else:
-                ball.shape("circle")
-                ball.color(skin)
-        else:
-            ball.shape("circle")
-            ball.color("red")
-
-        ball.penup()
-        ball.goto(0, 0)
-        ball.dx = random.choice([-self.ball_speed_x, self.ball_speed_x])
-        ball.dy = random.choice([-self.ball_speed_y, self.ball_speed_y])
-        return ball
-    
-    def reset_ball(self):
-        """Reset the ball to the center with random direction."""
-        self.ball.goto(0, 0)
-        self.ball.dx = random.choice([-self.ball_speed_x, self.ball_speed_x])
-        self.ball.dy = random.choice([-self.ball_speed_y, self.ball_speed_y])
-    
     def reset_scores(self):
         """Reset the game scores."""
-        self.score_a = 0
-        self.score_b = 0
+        if self.match:
+            self.match.reset()
     
     def toggle_pause(self):
         """Toggle pause state."""
         self.paused = not self.paused
         self.update_game_ui()
+        if not self.paused and self.game_running and GAME_LOOP_MODE != "blocking":
+            self.start_game_timer()
     
     def create_game_ui(self):
         """Create in-game UI elements."""
         self.settings_button = self.create_settings_button()
         self.audio_button = self.create_audio_button()
-        self.screen.onscreenclick(self.handle_game_ui_click)
+        self.screen.onscreenclick(self.on_click)
         self.update_game_ui()
     
-    def handle_game_ui_click(self, x, y):
-        """Handle clicks on game UI elements."""
-        ui_margin = 40
-        settings_x = -self.boundary_x + ui_margin
-        audio_x = self.boundary_x - ui_margin
-        scoreboard_y = self.boundary_y - (max(18, min(24, int(self.game_height / 30)) * .1))
-        
-        if (x < settings_x + 20 and x > settings_x - 20 and 
-            y > scoreboard_y - 20 and y < scoreboard_y + 20):
-            self.return_to_menu()
-        elif (x > audio_x - 20 and x < audio_x + 20 and 
-              y > scoreboard_y - 20 and y < scoreboard_y + 20):
-            self.toggle_audio()
-    
     def create_settings_button(self):
         """Create the settings button."""
         ui_margin = 40
         settings_x = -self.boundary_x + ui_margin
         scoreboard_y = self.boundary_y - (max(18, min(24, int(self.game_height / 30)) * .1))
         
-        settings = turtle.Turtle()
-        settings.speed(0)
-        settings.penup()
-        settings.shape("square")
+        # return_to_menu() plays its own click
+        settings = self.create_button("square", (settings_x, scoreboard_y), onclick=self.return_to_menu, sound=False)
         settings.color("black")
-        settings.goto(settings_x, scoreboard_y)
-        self.menu_elements.append(settings)
         return settings
     
     def create_audio_button(self):
@@ -814,19 +921,21 @@ class PongGame:
         audio_x = self.boundary_x - ui_margin
         scoreboard_y = self.boundary_y - (max(18, min(24, int(self.game_height / 30)) * .1))
         
-        audio = turtle.Turtle()
-        audio.speed(0)
-        audio.penup()
-        audio.shape("circle")
+        # toggle_audio() plays its own click
+        audio = self.create_button("circle", (audio_x, scoreboard_y), onclick=self.toggle_audio, sound=False)
         audio.color("black")
-        audio.goto(audio_x, scoreboard_y)
-        self.menu_elements.append(audio)
         return audio
     
     def update_game_ui(self):
         """Update the game UI elements."""
-        if hasattr(self, 'audio_button'):
+        if self.audio_button:
             self.audio_button.color("green" if self.audio_enabled else "red")
+        self.redraw_while_paused()
+
+    def redraw_while_paused(self):
+        """Draw UI changes made during a pause, when the timer loop presents no frames."""
+        if self.paused and self.game_running:
+            self.screen.update()
     
     def return_to_menu(self):
         """Return to the main menu."""
@@ -834,144 +943,73 @@ class PongGame:
         self.game_running = False
     
     # Clean up game objects
-        if hasattr(self, 'paddle_a'):
-            self.paddle_a.hideturtle()
-        if hasattr(self, 'paddle_b'):
-            self.paddle_b.hideturtle()
-        if hasattr(self, 'ball'):
-            self.ball.hideturtle()
-        if hasattr(self, 'pen'):
-            self.pen.clear()
+        self.clear_game_objects()
     
     # Clear any click handlers
         self.screen.onscreenclick(None)
     
         self.create_main_menu()  # Go to main menu
     
-    def select_game_mode(self, x, y):
+    def select_game_mode(self, one_player):
         """Handle game mode selection from the main menu."""
-        button_width = 100
-        button_height = 20
-        button_spacing = 60
-        button_y_offset = 60
-        
-        self.play_sound("click")
-
-        # Solo player button
-        if (-button_width < x < button_width and 
-            button_y_offset < y < button_y_offset + button_height*2):
-            self.one_player = True
-            self.mode_selected = True
+        self.one_player = one_player
+        self.mode_selected = True
+        if one_player:
             self.select_difficulty()
-        
-        # Two Player button
-        elif (-button_width < x < button_width and 
-            button_y_offset - button_spacing < y < button_y_offset - button_spacing + button_height*2):
-            self.one_player = False
-            self.mode_selected = True
-            self.prompt_player_names_screen()   
-        
-        # Exit button
-        elif (-button_width < x < button_width and 
-              button_y_offset - button_spacing*2 < y < button_y_offset - button_spacing*2 + button_height*2):
-            self.exit_game()
-        
-        # Select Skin button
-        elif (-button_width < x < button_width and 
-              button_y_offset - button_spacing*3 < y < button_y_offset - button_spacing*3 + button_height*2):
-            self.select_skin()
-            
-        # Settings button
-        elif (-button_width < x < button_width and 
-              button_y_offset - button_spacing*4 < y < button_y_offset - button_spacing*4 + button_height*2):
-            self.open_settings()
+        else:
+            self.prompt_player_names_screen()
     
     def select_difficulty(self):
         """Show difficulty selection screen."""
-        self.play_sound("click")
-        self.hide_menu()
-        
+        self.show_scene("difficulty", self.build_difficulty_menu)
+
+    def build_difficulty_menu(self, scene):
+        """Draw the difficulty selection scene."""
         button_width = 100
         button_height = 25
         button_spacing = 80
         title_y = self.game_height / 4
         first_button_y = title_y - 100
-        
+
         # Title
-        self.create_text(0, title_y, "Select Difficulty", font_size=max(20, int(self.game_height / 30)))
-        
+        scene.text(0, title_y, "Select Difficulty", font_size=max(20, int(self.game_height / 30)))
+
         # Difficulty buttons
-        self.draw_border(0, first_button_y, button_width*2, button_height*2)
-        self.create_text(0, first_button_y - 10, "Easy", font_size=max(16, int(self.game_height / 40)))
-        
-        self.draw_border(0, first_button_y - button_spacing, button_width*2, button_height*2)
-        self.create_text(0, first_button_y - button_spacing - 10, "Medium", font_size=max(16, int(self.game_height / 40)))
-        
-        self.draw_border(0, first_button_y - button_spacing*2, button_width*2, button_height*2)
-        self.create_text(0, first_button_y - button_spacing*2 - 10, "Hard", font_size=max(16, int(self.game_height / 40)))
-        
+        for i, level in enumerate(("easy", "medium", "hard")):
+            y = first_button_y - button_spacing*i
+            scene.button(0, y, button_width*2, button_height*2, lambda level=level: self.start_solo_game(level))
+            scene.text(0, y - 10, level.capitalize(), font_size=max(16, int(self.game_height / 40)))
+
         # Back button
-        self.draw_border(0, first_button_y - button_spacing*3, button_width*2, button_height*1.5)
-        self.create_text(0, first_button_y - button_spacing*3 - 10, "Back", font_size=max(14, int(self.game_height / 50)))
-        
-        def on_difficulty_click(x, y):
-            self.play_sound("click")
-            
-            if -button_width < x < button_width and first_button_y - button_height < y < first_button_y + button_height:
-                self.set_difficulty("easy")
-                self.start_game()
-            elif (-button_width < x < button_width and 
-                  first_button_y - button_spacing - button_height < y < first_button_y - button_spacing + button_height):
-                self.set_difficulty("medium")
-                self.start_game()
-            elif (-button_width < x < button_width and 
-                  first_button_y - button_spacing*2 - button_height < y < first_button_y - button_spacing*2 + button_height):
-                self.set_difficulty("hard")
-                self.start_game()
-            elif (-button_width < x < button_width and 
-                  first_button_y - button_spacing*3 - button_height < y < first_button_y - button_spacing*3 + button_height):
-                self.create_main_menu()
-        
-        self.screen.onscreenclick(on_difficulty_click)
-        self.screen.update()
-    
+        scene.button(0, first_button_y - button_spacing*3, button_width*2, button_height*1.5, self.create_main_menu)
+        scene.text(0, first_button_y - button_spacing*3 - 10, "Back", font_size=max(14, int(self.game_height / 50)))
+
+    def start_solo_game(self, level):
+        """Start a match against the AI at a difficulty level."""
+        self.set_difficulty(level)
+        self.start_game()
+
     def set_difficulty(self, level):
-        """Set AI difficulty parameters."""
+        """Set the AI difficulty; the next Match looks up its preset."""
         self.difficulty_level = level
-        
-        if level == "easy":
-            self.ai_accuracy = 0.5
-            self.ai_reaction_delay = 10
-            self.ai_max_speed = 10
-            self.ai_prediction_error = 1
-            self.ai_edge_weakness = 1.2
-        elif level == "medium":
-            self.ai_accuracy = 0.100
-            self.ai_reaction_delay = 6
-            self.ai_max_speed = 15
-            self.ai_prediction_error = 0.6
-            self.ai_edge_weakness = 0.8
-        elif level == "hard":
-            self.ai_accuracy = 1
-            self.ai_reaction_delay = 2
-            self.ai_max_speed = 20
-            self.ai_prediction_error = 0.10
-            self.ai_edge_weakness = 0.10
     
     def exit_game(self):
         """Cleanly exit the game."""
         self.play_sound("click")
+        self.close_history()
         self.screen.bye()
-        pygame.quit()
+        if pygame:
+            pygame.quit()
         sys.exit()
     
     def select_skin(self):
         """Show skin selection menu."""
-        self.play_sound("click")
-        self.hide_menu()
+        self.show_scene("skins", self.build_skin_menu)
 
+    def build_skin_menu(self, scene):
+        """Draw the skin selection scene."""
         title_y = self.game_height / 4
-        self.create_text(0, title_y, "Selecting Ball Skin", font_size=max(20, int(self.game_height / 30)))
+        scene.text(0, title_y, "Selecting Ball Skin", font_size=max(20, int(self.game_height / 30)))
         
         skins = list(self.ball_skins.keys())
         skin_spacing = min(self.game_width / 6, 160)
@@ -997,162 +1035,148 @@ class PongGame:
                 pos_x = positions[i]
                 pos_y = 0
                 
-            self.draw_border(pos_x, pos_y, skin_spacing * 0.6, skin_spacing * 0.6)
+            scene.button(pos_x, pos_y, skin_spacing * 0.6, skin_spacing * 0.6, lambda skin=skin: self.choose_skin(skin))
 
-            if isinstance(self.ball_skins[skin], str) and self.ball_skins[skin].endswith(".gif"):
+            shape = self.skin_shape(skin)
+            if shape:
                 try:
-                    img_turtle = turtle.Turtle()
-                    img_turtle.shape(self.ball_skins[skin])
-                    img_turtle.penup()
-                    img_turtle.goto(pos_x, pos_y)
-                    self.menu_elements.append(img_turtle)
+                    scene.shape(shape, pos_x, pos_y)
                 except (turtle.TurtleGraphicsError, AttributeError) as e:
                     print(f"Error displaying skin {skin}: {e}")
-                    self.create_text(pos_x, pos_y, "🔴", font_size=max(30, int(self.game_height / 20)))
+                    scene.text(pos_x, pos_y, "🔴", font_size=max(30, int(self.game_height / 20)))
             else:
-                self.create_text(pos_x, pos_y, "🔴", font_size=max(30, int(self.game_height / 20)))
+                scene.text(pos_x, pos_y, "🔴", font_size=max(30, int(self.game_height / 20)))
 
-            self.create_text(pos_x, pos_y - skin_spacing * 0.5, skin.capitalize(), 
-                           font_size=max(12, int(self.game_height / 60)))
+            scene.text(pos_x, pos_y - skin_spacing * 0.5, skin.capitalize(),
+                       font_size=max(12, int(self.game_height / 60)))
 
         # Back button
         back_x = -self.boundary_x + 50
         back_y = self.boundary_y - 50
-        self.draw_border(back_x, back_y, 50, 50)
-        self.create_text(back_x, back_y, "←", font_size=max(16, int(self.game_height / 40)))
-        
-        def on_skin_click(x, y):
-            self.play_sound("click")
-            
-            for i, skin in enumerate(skins):
-                if isinstance(positions[i], tuple):
-                    pos_x, pos_y = positions[i]
-                else:
-                    pos_x = positions[i]
-                    pos_y = 0
-                    
-                if (pos_x - skin_spacing * 0.3 < x < pos_x + skin_spacing * 0.3 and 
-                    pos_y - skin_spacing * 0.3 < y < pos_y + skin_spacing * 0.3):
-                    self.selected_skin = skin
-                    self.create_main_menu()
-
-            # Back button
-            if (back_x - 25 < x < back_x + 25 and 
-                back_y - 25 < y < back_y + 25):
-                self.create_main_menu()
-
-        self.screen.onscreenclick(on_skin_click)
-        self.screen.update()
+        scene.button(back_x, back_y, 50, 50, self.create_main_menu)
+        scene.text(back_x, back_y, "←", font_size=max(16, int(self.game_height / 40)))
+
+    def choose_skin(self, skin):
+        """Use a ball skin from the next match on and go back to the main menu."""
+        self.selected_skin = skin
+        self.create_main_menu()
     
     def open_settings(self):
         """Open settings menu."""
-        self.play_sound("click")
-        self.hide_menu()
-        
-        self.create_text(0, self.calc_height(20), "Settings", font_size=int(24 * self.scale_factor))
-        
+        self.show_scene("settings", self.build_settings_menu, self.update_settings_labels)
+
+    def update_settings_labels(self, scene):
+        """Bring the settings scene's value labels up to date."""
+        scene.set_label("audio", f"Audio: {'On' if self.audio_enabled else 'Off'}")
+        scene.set_label("ball_speed", f"Ball Speed: {self.ball_speed_x*500:.0f}")
+        scene.set_label("paddle_speed", f"Paddle Speed: {self.paddle_speed}")
+        scene.set_label("balls", f"Balls: {self.ball_count}")
+
+    def build_settings_menu(self, scene):
+        """Draw the settings scene; the values are labels set by update_settings_labels()."""
+        scene.text(0, self.calc_height(20), "Settings", font_size=int(24 * self.scale_factor))
+        row_width = self.calc_width(37.5)
+        row_height = self.calc_height(7)
+
         # Volume setting
-        self.draw_border(0, self.calc_height(10), self.calc_width(37.5), self.calc_height(7))
-        self.create_text(0, self.calc_height(9), f"Audio: {'On' if self.audio_enabled else 'Off'}", 
-                       font_size=int(16 * self.scale_factor))
-        
-        # Ball speed setting
-        self.draw_border(0, self.calc_height(3), self.calc_width(37.5), self.calc_height(7))
-        self.create_text(0, self.calc_height(2), f"Ball Speed: {self.ball_speed_x*500:.0f}", 
-                       font_size=int(16 * self.scale_factor))
-        
-        # Paddle speed setting
-        self.draw_border(0, self.calc_height(-4), self.calc_width(37.5), self.calc_height(7))
-        self.create_text(0, self.calc_height(-5), f"Paddle Speed: {self.paddle_speed}", 
-                       font_size=int(16 * self.scale_factor))
-        
+        scene.button(0, self.calc_height(10), row_width, row_height, lambda: self.change_setting("audio", 1))
+        scene.label("audio", 0, self.calc_height(9), font_size=int(16 * self.scale_factor))
+
+        # Ball speed, paddle speed and ball count; the left half of a row
+        # decreases the setting and the right half increases it
+        for setting, y in (("ball_speed", 3), ("paddle_speed", -4), ("balls", -11)):
+            scene.border(0, self.calc_height(y), row_width, row_height)
+            scene.widgets.add(Widget(-row_width / 4, self.calc_height(y), row_width / 2, row_height,
+                                     lambda setting=setting: self.change_setting(setting, -1)))
+            scene.widgets.add(Widget(row_width / 4, self.calc_height(y), row_width / 2, row_height,
+                                     lambda setting=setting: self.change_setting(setting, 1)))
+            scene.label(setting, 0, self.calc_height(y - 1), font_size=int(16 * self.scale_factor))
+
         # Back button
-        self.draw_border(0, self.calc_height(-11), self.calc_width(25), self.calc_height(7))
-        self.create_text(0, self.calc_height(-12), "Back to Menu", font_size=int(16 * self.scale_factor))
-        
-        def on_settings_click(x, y):
-            self.play_sound("click")
-            
-            # Audio toggle
-            if (-self.calc_width(18.75) < x < self.calc_width(18.75) and 
-                self.calc_height(6.5) < y < self.calc_height(13.5)):
-                self.audio_enabled = not self.audio_enabled
-                self.open_settings()
-                
-            # Ball speed adjustment
-            elif (-self.calc_width(18.75) < x < self.   calc_width(18.75) and 
-              self.calc_height(-0.5) < y < self.calc_height(6.5)):
-                mid_x = 0
-                # Decrease
-                if x < mid_x:
-                    self.ball_speed_x = max(0.05, self.ball_speed_x - 0.05)
-                    self.ball_speed_y = self.ball_speed_x
-                # Increase
-                else:
-                    self.ball_speed_x = min(0.4, self.ball_speed_x + 0.05)
-                    self.ball_speed_y = self.ball_speed_x
-                self.open_settings()
-                
-            # Paddle speed adjustment
-            elif (-self.calc_width(18.75) < x < self.calc_width(18.75) and 
-              self.calc_height(-7.5) < y < self.calc_height(-0.5)):
-                mid_x = 0
-                # Decrease
-                if x < mid_x:
-                    self.paddle_speed = max(5, self.paddle_speed - 5)
-                # Increase
-                else:
-                    self.paddle_speed = min(40, self.paddle_speed + 5)
-                self.open_settings()
-                
-            # Back button
-            elif (-self.calc_width(12.5) < x < self.calc_width(12.5) and 
-                  self.calc_height(-14.5) < y < self.calc_height(-7.5)):
-                self.create_main_menu()
-        
-        self.screen.onscreenclick(on_settings_click)
+        scene.button(0, self.calc_height(-18), self.calc_width(25), self.calc_height(7), self.create_main_menu)
+        scene.text(0, self.calc_height(-19), "Back to Menu", font_size=int(16 * self.scale_factor))
+
+    def change_setting(self, setting, step):
+        """Step a setting down (step -1) or up (step 1) and redraw its label."""
+        if setting == "audio":
+            self.audio_enabled = not self.audio_enabled
+        elif setting == "ball_speed":
+            if step < 0:
+                self.ball_speed_x = max(0.05, self.ball_speed_x - 0.05)
+            else:
+                self.ball_speed_x = min(0.4, self.ball_speed_x + 0.05)
+            self.ball_speed_y = self.ball_speed_x
+        elif setting == "paddle_speed":
+            if step < 0:
+                self.paddle_speed = max(5, self.paddle_speed - 5)
+            else:
+                self.paddle_speed = min(40, self.paddle_speed + 5)
+        elif setting == "balls":
+            index = BALL_COUNTS.index(self.ball_count) + step
+            self.ball_count = BALL_COUNTS[max(0, min(len(BALL_COUNTS) - 1, index))]
+
+        # Only the label that changed is redrawn
+        self.update_settings_labels(self.scenes["settings"])
         self.screen.update()
-    
+
     def create_main_menu(self):
         """Create the main menu screen."""
-        self.hide_menu()
-        if self.timer_pen:
-            self.timer_pen.clear()
-            self.timer_pen.hideturtle()
-        
-        
+        self.show_scene("main_menu", self.build_main_menu)
+
+    def build_main_menu(self, scene):
+        """Draw the main menu scene."""
         # Title
-        self.create_text(0, self.calc_height(25), "PONG GAME", font_size=int(36 * self.scale_factor))
-        
+        scene.text(0, self.calc_height(25), "PONG GAME", font_size=int(36 * self.scale_factor))
+
         # Menu options
-        menu_items = ["Solo Player", "Two Player", "Exit Game", "Select Skin", "Settings"]
+        menu_items = [
+            ("Solo Player", lambda: self.select_game_mode(True)),
+            ("Two Player", lambda: self.select_game_mode(False)),
+            ("Exit Game", self.exit_game),
+            ("Select Skin", self.select_skin),
+            ("Settings", self.open_settings),
+        ]
         y_pos = self.calc_height(10)
-        
-        for item in menu_items:
-            self.draw_border(0, y_pos, self.calc_width(25), self.calc_height(7))
-            self.create_text(0, y_pos - self.calc_height(1), item, font_size=int(16 * self.scale_factor))
+
+        for item, onclick in menu_items:
+            scene.button(0, y_pos, self.calc_width(25), self.calc_height(7), onclick)
+            scene.text(0, y_pos - self.calc_height(1), item, font_size=int(16 * self.scale_factor))
             y_pos -= self.calc_height(10)
-        
-        self.screen.onscreenclick(self.select_game_mode)
+
+    def show_scene(self, name, build, refresh=None):
+        """Hide the current menu and show a cached scene, building it with build(scene) on first use.
+
+        refresh(scene), if given, updates the scene's labels once it is shown.
+        """
+        self.hide_menu(update=False)
+        scene = self.scenes.get(name)
+        if scene is None:
+            scene = self.scenes[name] = MenuScene(self.screen, self.turtle_pool, int(3 * self.scale_factor))
+            build(scene)
+        scene.set_visible(True)
+        self.active_scene = scene
+        if refresh:
+            refresh(scene)
+        self.screen.onscreenclick(self.on_click)
         self.screen.update()
-    
-    def hide_menu(self):
-        """Hide all menu elements."""
+        return scene
+
+    def hide_menu(self, update=True):
+        """Hide all menu elements and the cached scene on screen."""
+        if self.active_scene:
+            self.active_scene.set_visible(False)
+            self.active_scene = None
         for element in self.menu_elements:
-            if isinstance(element, dict):
-                element["turtle"].clear()
-                element["turtle"].hideturtle()
-            else:
-                element.clear()
-                element.hideturtle()
+            self.turtle_pool.release(element)
         self.menu_elements.clear()
-        self.screen.update()
+        self.widgets.clear()
+        self.audio_button = None
+        if update:
+            self.screen.update()
     
     def draw_border(self, x, y, width, height, color="black", pen_width=3):
         """Draw a bordered rectangle."""
-        border = turtle.Turtle()
-        border.speed(0)
-        border.penup()
+        border = self.turtle_pool.acquire()
         border.goto(x - width / 2, y - height / 2)
         border.pendown()
         border.pensize(int(3 * self.scale_factor))
@@ -1167,9 +1191,7 @@ class PongGame:
     
     def create_text(self, x, y, text, font_size=16, color="black"):
         """Create text for the menu."""
-        text_turtle = turtle.Turtle()
-        text_turtle.hideturtle()
-        text_turtle.penup()
+        text_turtle = self.turtle_pool.acquire()
         text_turtle.color(color)
         text_turtle.goto(x, y)
         text_turtle.write(text, align="center", font=("Courier", font_size, "bold"))
@@ -1184,7 +1206,45 @@ class PongGame:
         """Calculate height based on percentage."""
         return self.game_height * percent / 100
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Pong.")
+    parser.add_argument("--host", type=int, nargs="?", const=DEFAULT_PORT, metavar="PORT",
+                        help="host a network match on this UDP port")
+    parser.add_argument("--join", metavar="HOST[:PORT]", help="join a network match")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated one-way delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="simulated random +/- delay in seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="simulated fraction of packets dropped")
+    parser.add_argument("--renderer", choices=("turtle", "pygame"), default="turtle",
+                        help="draw with turtle/Tk or with pygame (faster, no network play)")
+    parser.add_argument("--fps", type=int, default=240, help="pygame frame rate cap, 0 for none")
+    parser.add_argument("--vsync", action="store_true", help="pygame: wait for the display's vertical sync")
+    args = parser.parse_args(argv)
+
+    if args.renderer == "pygame":
+        if args.host is not None or args.join:
+            print("Error: network play needs the turtle renderer")
+            return 1
+        from pong_pygame import PygameGame
+        return PygameGame(fps=args.fps, vsync=args.vsync).run()
+    link = dict(latency=args.latency, jitter=args.jitter, loss=args.loss)
+
+    network = None
+    try:
+        if args.host is not None:
+            network = NetHost(port=args.host, **link)
+        elif args.join:
+            network = NetClient(parse_address(args.join), **link)
+            if not network.connect(timeout=30):
+                print(f"Error joining {args.join}: no answer from host")
+                return 1
+    except OSError as e:
+        print(f"Error opening network game: {e}")
+        return 1
+
+    game = PongGame(network)
+    game.screen.mainloop()
+    return 0
+
 # Start the game
 if __name__ == "__main__":
-    game = PongGame()
-    game.screen.mainloop()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""NumPy batch versions of the pong_core rules for offline evaluation.
+
+Each function takes arrays with one entry per ball state or match
+and works on all of them in one vectorized call.
+"""
+import numpy as np
+
+from pong_core import (AI_RECOVERY_TICKS, BALL_RADIUS, DIFFICULTY_PRESETS, MAX_BOUNCES_PER_TICK,
+                       PADDLE_HALF_HEIGHT, PADDLE_WIDTH, TICK_SECONDS, WIN_SCORES, Court)
+
+
+def fold_into_court(y, half_height):
+    """Vectorized pong_core.fold_into_court."""
+    y = np.asarray(y, dtype=np.float64)
+    period = 4 * half_height
+    u = np.mod(y + half_height, period)
+    u = np.where(u > 2 * half_height, period - u, u)
+    return np.where(np.abs(y) <= half_height, y, u - half_height)
+
+
+def predict_landing_y(ball_x, ball_y, ball_dx, ball_dy, paddle_x, game_height,
+                      prediction_error=0.0, rng=None):
+    """Predict where each ball reaches paddle_x, as Match.predict_ball_y does.
+
+    With a prediction_error and a numpy Generator, the same uniform
+    error as the AI uses is added to every prediction.
+    """
+    ball_x = np.asarray(ball_x, dtype=np.float64)
+    ball_y = np.asarray(ball_y, dtype=np.float64)
+    ball_dx = np.asarray(ball_dx, dtype=np.float64)
+    ball_dy = np.asarray(ball_dy, dtype=np.float64)
+
+    moving = ball_dx != 0
+    speed_x = np.where(moving, np.abs(ball_dx), 1.0)
+    time_steps = np.abs(paddle_x - ball_x) / speed_x
+    predicted_y = fold_into_court(ball_y + ball_dy * time_steps, (game_height - 20) / 2)
+    predicted_y = np.where(moving, predicted_y, ball_y)
+
+    if rng is not None and np.any(prediction_error):
+        error_range = np.asarray(prediction_error) * (game_height / 4)
+        predicted_y = predicted_y + rng.uniform(-1.0, 1.0, predicted_y.shape) * error_range
+    return predicted_y
+
+
+def sweep(x, y, dx, dy, wall, face, paddle_a_y, paddle_b_y):
+    """Vectorized pong_core.sweep.
+
+    Moves every ball through one tick, bouncing at the exact time of
+    impact. Returns the new (x, y, dx, dy) and a boolean array of the
+    balls that bounced off paddle b.
+    """
+    x, y, dx, dy = x.copy(), y.copy(), dx.copy(), dy.copy()
+    remaining = np.ones(len(x))
+    moving = np.ones(len(x), dtype=bool)
+    returned = np.zeros(len(x), dtype=bool)
+    # Balls that are not moving toward a wall or paddle never divide by their zero speed
+    safe_dx = np.where(dx == 0, 1.0, dx)
+    safe_dy = np.where(dy == 0, 1.0, dy)
+
+    for _ in range(MAX_BOUNCES_PER_TICK):
+        t = remaining.copy()
+
+        # Walls
+        up = (dy > 0) & (y + dy * remaining > wall)
+        down = (dy < 0) & (y + dy * remaining < -wall)
+        t = np.where(up, (wall - y) / safe_dy, np.where(down, (-wall - y) / safe_dy, t))
+        wall_hit = up | down
+
+        # Paddle faces, if reached before the wall
+        face_x = np.where(dx > 0, face, -face)
+        t_hit = (face_x - x) / safe_dx
+        y_hit = y + dy * t_hit
+        toward_b = (dx > 0) & (x < face) & (face <= x + dx * t)
+        toward_a = (dx < 0) & (x > -face) & (-face >= x + dx * t)
+        hit_b = toward_b & (paddle_b_y - PADDLE_HALF_HEIGHT < y_hit) & (y_hit < paddle_b_y + PADDLE_HALF_HEIGHT)
+        hit_a = toward_a & (paddle_a_y - PADDLE_HALF_HEIGHT < y_hit) & (y_hit < paddle_a_y + PADDLE_HALF_HEIGHT)
+        paddle_hit = (hit_a | hit_b) & moving
+        t = np.where(paddle_hit, t_hit, t)
+        wall_hit &= moving & ~paddle_hit
+
+        t = np.where(moving, t, 0.0)
+        x += dx * t
+        y += dy * t
+        remaining -= t
+        dy = np.where(wall_hit, -dy, dy)
+        dx = np.where(paddle_hit, -dx, dx)
+        safe_dy = np.where(wall_hit, -safe_dy, safe_dy)
+        safe_dx = np.where(paddle_hit, -safe_dx, safe_dx)
+        returned |= hit_b & paddle_hit
+        moving &= wall_hit | paddle_hit
+        if not moving.any():
+            break
+    else:
+        # Out of bounces; finish the tick in a straight line
+        x += np.where(moving, dx * remaining, 0.0)
+        y += np.where(moving, dy * remaining, 0.0)
+
+    return x, y, dx, dy, returned
+
+
+class BatchMatch:
+    """N solo matches stored as structure-of-arrays and stepped together.
+
+    Uses the same rules as pong_core.Match: ball motion, wall and paddle
+    bounces (swept by default, as in the game, or the discrete checks
+    with swept=False), scoring, the AI and the per-difficulty win scores.
+    The left paddle is driven by a simple reference player that tracks
+    the ball at player_speed per tick, aiming off by up to player_error
+    (redrawn on every serve and AI return) so it can miss. Matches that finish are dropped
+    from the working arrays; their results stay in the result_* arrays,
+    indexed by match number.
+    """
+
+    STATE_FIELDS = ("index", "ball_x", "ball_y", "ball_dx", "ball_dy",
+                    "paddle_a_y", "paddle_b_y", "score_a", "score_b", "player_offset",
+                    "ai_frame_counter", "ai_recovery_counter", "ticks",
+                    "ai_accuracy", "ai_reaction_delay", "ai_max_speed",
+                    "ai_prediction_error", "ai_edge_weakness",
+                    "win_score_a", "win_score_b")
+
+    def __init__(self, n, court=None, difficulty="medium", ai_params=None,
+                 ball_speed_x=None, ball_speed_y=None, player_speed=6.0,
+                 player_error=100.0, seed=None, swept=True):
+        self.court = court or Court()
+        self.n = n
+        self.swept = swept
+        self.difficulty_level = difficulty
+        self.ball_speed_x = ball_speed_x if ball_speed_x is not None else 0.15 * self.court.scale_factor
+        self.ball_speed_y = ball_speed_y if ball_speed_y is not None else self.ball_speed_x
+        self.player_speed = player_speed
+        self.player_error = player_error
+        self.rng = np.random.default_rng(seed)
+
+        # AI parameters are per match so callers can mix presets
+        params = dict(DIFFICULTY_PRESETS.get(difficulty, DIFFICULTY_PRESETS["medium"]))
+        if ai_params:
+            params.update(ai_params)
+        for name, value in params.items():
+            setattr(self, name, np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy())
+        limit_a, limit_b = WIN_SCORES.get(difficulty, WIN_SCORES["medium"])
+        self.win_score_a = np.full(n, limit_a, dtype=np.int32)
+        self.win_score_b = np.full(n, limit_b, dtype=np.int32)
+
+        self.index = np.arange(n)
+        self.ball_x = np.zeros(n)
+        self.ball_y = np.zeros(n)
+        self.ball_dx = np.zeros(n)
+        self.ball_dy = np.zeros(n)
+        self.paddle_a_y = np.zeros(n)
+        self.paddle_b_y = np.zeros(n)
+        self.score_a = np.zeros(n, dtype=np.int32)
+        self.score_b = np.zeros(n, dtype=np.int32)
+        self.ai_frame_counter = np.zeros(n)
+        self.ai_recovery_counter = np.zeros(n)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.player_offset = np.zeros(n)
+        self.reset_ball(np.ones(n, dtype=bool))
+
+        # 0 while running, 1 if the player won, 2 if the AI won
+        self.result_winner = np.zeros(n, dtype=np.int8)
+        self.result_score_a = np.zeros(n, dtype=np.int32)
+        self.result_score_b = np.zeros(n, dtype=np.int32)
+        self.result_ticks = np.zeros(n, dtype=np.int64)
+
+    @property
+    def active(self):
+        """Number of matches still running."""
+        return len(self.index)
+
+    def reset_ball(self, mask):
+        """Reset the masked balls to the center with random direction."""
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return
+        self.ball_x[mask] = 0.0
+        self.ball_y[mask] = 0.0
+        self.ball_dx[mask] = self.rng.choice([-self.ball_speed_x, self.ball_speed_x], count)
+        self.ball_dy[mask] = self.rng.choice([-self.ball_speed_y, self.ball_speed_y], count)
+        self.player_offset[mask] = self.rng.uniform(-self.player_error, self.player_error, count)
+
+    def move_paddle_b(self, mask, distance):
+        """Move the masked AI paddles while staying within boundaries."""
+        paddle_boundary = self.court.boundary_y - 100
+        new_y = self.paddle_b_y + distance
+        mask = mask & (-paddle_boundary < new_y) & (new_y < paddle_boundary)
+        self.paddle_b_y = np.where(mask, new_y, self.paddle_b_y)
+
+    def move_player(self):
+        """Reference player: step toward the ball like a held key would."""
+        paddle_boundary = self.court.boundary_y - 100
+        diff = self.ball_y + self.player_offset - self.paddle_a_y
+        move = np.clip(diff, -self.player_speed, self.player_speed)
+        new_y = self.paddle_a_y + move
+        inside = (-paddle_boundary < new_y) & (new_y < paddle_boundary)
+        self.paddle_a_y = np.where(inside, new_y, self.paddle_a_y)
+
+    def ai_move_paddle(self, acting):
+        """Vectorized Match.ai_move_paddle for the matches in acting."""
+        court = self.court
+        n = self.active
+        rng = self.rng
+
+        # Drift randomly while the ball moves away
+        away = self.ball_dx < 0
+        jitter = acting & away & (rng.random(n) < 0.1)
+        self.move_paddle_b(jitter, rng.uniform(-5, 5, n))
+
+        # Miss chance, then predict and aim
+        aiming = acting & ~away & (rng.random(n) >= 0.08)
+        if not aiming.any():
+            return
+        predicted_y = predict_landing_y(self.ball_x, self.ball_y, self.ball_dx, self.ball_dy,
+                                        court.paddle_x_position, court.game_height,
+                                        self.ai_prediction_error, rng)
+
+        abs_y = np.abs(self.ball_y)
+        edge_start = court.boundary_y * 0.75
+        edge_factor = np.where(abs_y > edge_start,
+                               1.0 - self.ai_edge_weakness * (abs_y - edge_start) / (court.boundary_y * 0.25),
+                               1.0)
+        perfect_y = predicted_y * edge_factor
+
+        noisy = rng.random(n) > self.ai_accuracy
+        noise_factor = (1 - self.ai_accuracy) * (court.game_height / 2)
+        perfect_y = perfect_y + np.where(noisy, rng.uniform(-1.0, 1.0, n) * noise_factor, 0.0)
+        perfect_y = np.clip(perfect_y, -court.boundary_y + 50, court.boundary_y - 50)
+
+        diff = perfect_y - self.paddle_b_y
+        move_amount = np.minimum(self.ai_max_speed, np.abs(diff))
+        move = np.where(diff > 10, move_amount, np.where(diff < -10, -move_amount, 0.0))
+        self.paddle_b_y = np.where(aiming, self.paddle_b_y + move, self.paddle_b_y)
+
+    def step(self):
+        """Advance every running match by one tick."""
+        court = self.court
+        self.ticks += 1
+        self.move_player()
+
+        # Move ball
+        if self.swept:
+            self.sweep_balls()
+        else:
+            self.ball_x += self.ball_dx
+            self.ball_y += self.ball_dy
+
+        # AI player logic
+        recovering = self.ai_recovery_counter > .0100
+        self.ai_recovery_counter = np.where(recovering, np.maximum(0, self.ai_recovery_counter - .1),
+                                            self.ai_recovery_counter)
+        self.ai_frame_counter += .1
+        acting = (self.ai_frame_counter >= self.ai_reaction_delay) & (self.ai_recovery_counter == 0)
+        if acting.any():
+            self.ai_move_paddle(acting)
+            self.ai_frame_counter[acting] = 0
+
+        # Ball collision with top and bottom
+        if not self.swept:
+            wall = np.abs(self.ball_y) > court.boundary_y
+            self.ball_dy = np.where(wall, -self.ball_dy, self.ball_dy)
+
+        # Scoring
+        scored_a = self.ball_x > court.boundary_x
+        scored_b = self.ball_x < -court.boundary_x
+        if scored_a.any() or scored_b.any():
+            self.score_a += scored_a
+            self.score_b += scored_b
+            self.reset_ball(scored_a | scored_b)
+            self.ai_recovery_counter[scored_a] = AI_RECOVERY_TICKS
+
+            # Win check
+            won_a = self.score_a >= self.win_score_a
+            finished = won_a | (self.score_b >= self.win_score_b)
+            if finished.any():
+                done = self.index[finished]
+                self.result_winner[done] = np.where(won_a[finished], 1, 2)
+                self.result_score_a[done] = self.score_a[finished]
+                self.result_score_b[done] = self.score_b[finished]
+                self.result_ticks[done] = self.ticks[finished]
+                self._compact(~finished)
+
+        # Paddle collisions
+        margin = court.paddle_x_position - 20
+        near_b = (self.paddle_b_y - PADDLE_HALF_HEIGHT < self.ball_y) & (self.ball_y < self.paddle_b_y + PADDLE_HALF_HEIGHT)
+        near_a = (self.paddle_a_y - PADDLE_HALF_HEIGHT < self.ball_y) & (self.ball_y < self.paddle_a_y + PADDLE_HALF_HEIGHT)
+        hit_b = near_b & (self.ball_x + BALL_RADIUS >= margin - PADDLE_WIDTH) & (self.ball_dx > 0)
+        hit_a = ~hit_b & near_a & (self.ball_x - BALL_RADIUS <= -margin + PADDLE_WIDTH) & (self.ball_dx < 0)
+        self.ball_dx = np.where(hit_b, -np.abs(self.ball_dx), np.where(hit_a, np.abs(self.ball_dx), self.ball_dx))
+        self.new_player_offsets(np.flatnonzero(hit_b))
+
+    def sweep_balls(self):
+        """Move every ball through one tick with pong_core.sweep's exact bounces."""
+        court = self.court
+        wall = court.boundary_y
+        face = court.paddle_x_position - 20 - PADDLE_WIDTH - BALL_RADIUS
+        new_x = self.ball_x + self.ball_dx
+        new_y = self.ball_y + self.ball_dy
+        # Only balls that reach a wall or a paddle face this tick can bounce
+        near = np.flatnonzero((np.abs(new_y) > wall) | (np.abs(new_x) >= face))
+        if len(near):
+            (new_x[near], new_y[near], self.ball_dx[near], self.ball_dy[near], returned) = sweep(
+                self.ball_x[near], self.ball_y[near], self.ball_dx[near], self.ball_dy[near], wall, face,
+                self.paddle_a_y[near], self.paddle_b_y[near])
+            self.new_player_offsets(near[returned])
+        self.ball_x, self.ball_y = new_x, new_y
+
+    def new_player_offsets(self, returned):
+        """Redraw the reference player's aim for the matches at indices returned, after an AI return."""
+        if len(returned):
+            self.player_offset[returned] = self.rng.uniform(-self.player_error, self.player_error, len(returned))
+
+    def _compact(self, keep):
+        """Drop finished matches from the working arrays."""
+        for name in self.STATE_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def run(self, max_ticks=None):
+        """Step until every match has finished or max_ticks elapse."""
+        ticks = 0
+        while self.active and (max_ticks is None or ticks < max_ticks):
+            self.step()
+            ticks += 1
+        return self.summary()
+
+    def summary(self):
+        """Return win rates and score statistics over finished matches."""
+        finished = self.result_winner > 0
+        played = int(np.count_nonzero(finished))
+        player_wins = int(np.count_nonzero(self.result_winner == 1))
+        return {
+            "difficulty": self.difficulty_level,
+            "matches": self.n,
+            "finished": played,
+            "player_win_rate": player_wins / played if played else 0.0,
+            "ai_win_rate": (played - player_wins) / played if played else 0.0,
+            "mean_score_a": float(self.result_score_a[finished].mean()) if played else 0.0,
+            "mean_score_b": float(self.result_score_b[finished].mean()) if played else 0.0,
+            "mean_seconds": float(self.result_ticks[finished].mean()) * TICK_SECONDS if played else 0.0,
+        }
+
+
+def simulate_win_rates(matches=100000, difficulties=("easy", "medium", "hard"), seed=None, **kwargs):
+    """Monte-Carlo the reference player's win rate against each preset."""
+    return {level: BatchMatch(matches, difficulty=level, seed=seed, **kwargs).run()
+            for level in difficulties}
@@ -0,0 +1,453 @@
+"""Benchmarks for the physics, AI and rendering hot paths.
+
+    python pong_bench.py                       # headless benchmarks
+    python pong_bench.py --tk                  # also time Tk rendering
+    python pong_bench.py --pygame              # also time pygame rendering
+    python pong_bench.py -o new.json --compare old.json
+
+Headless benchmarks only need pong_core (and NumPy for the batch ones).
+Tk benchmarks need a display; without one an Xvfb virtual framebuffer
+is started if it is installed. They include tk/paused_cpu/<mode>, the
+process CPU time per second of a paused match in each GAME_LOOP_MODE. pygame benchmarks draw to SDL's dummy
+video driver when there is no display. Results are written as JSON, and
+--compare flags any benchmark whose time per operation grew by more
+than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+from pong_core import Court, Match, MultiBallMatch, DIFFICULTY_PRESETS
+from pong_render import timer_text
+
+
+def measure(func, number, repeat=5):
+    """Time func(number) repeat times and return per-operation stats."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(number)
+        times.append((time.perf_counter() - start) / number)
+    times.sort()
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": times[0] * 1e6,
+        "median_us": times[len(times) // 2] * 1e6,
+        "ops_per_sec": 1 / times[0] if times[0] else 0.0,
+    }
+
+
+def ball_states(count, speed, seed=0):
+    """Random ball states heading toward the AI paddle."""
+    rng = random.Random(seed)
+    court = Court()
+    return [(rng.uniform(-court.boundary_x, court.paddle_x_position - 40),
+             rng.uniform(-court.boundary_y, court.boundary_y),
+             speed, rng.choice([-speed, speed]))
+            for _ in range(count)]
+
+
+def bench_match_step(difficulty=None):
+    """A full physics tick, as game_loop runs it."""
+    match = Match(one_player=difficulty is not None, difficulty=difficulty or "medium", seed=1)
+
+    def run(number):
+        for _ in range(number):
+            if not match.running:
+                match.reset()
+            match.step()
+    return run
+
+
+def bench_fast_step(swept):
+    """A two-player tick with a ball fast enough to tunnel without sweeping."""
+    match = Match(ball_speed_x=120, ball_speed_y=90, swept=swept, seed=1)
+
+    def run(number):
+        for _ in range(number):
+            if not match.running:
+                match.reset()
+            match.paddle_a_y = match.paddle_b_y = max(-189, min(189, match.ball_y))
+            match.step()
+    return run
+
+
+def bench_multi_ball(ball_count):
+    """A solo tick with many balls in play."""
+    match = MultiBallMatch(one_player=True, ball_count=ball_count, win_score=10**9, seed=1)
+
+    def run(number):
+        for _ in range(number):
+            match.step()
+    return run
+
+
+def bench_ai_move(difficulty):
+    """One ai_move_paddle call with the ball approaching."""
+    match = Match(one_player=True, difficulty=difficulty, seed=1)
+    states = ball_states(1024, match.ball_speed_x)
+
+    def run(number):
+        for i in range(number):
+            match.ball_x, match.ball_y, match.ball_dx, match.ball_dy = states[i & 1023]
+            match.paddle_b_y = 0.0
+            match.ai_move_paddle()
+    return run
+
+
+def bench_predict(speed):
+    """One predict_ball_y call at a given ball speed."""
+    match = Match(one_player=True, seed=1)
+    states = ball_states(1024, speed)
+
+    def run(number):
+        for i in range(number):
+            match.ball_x, match.ball_y, match.ball_dx, match.ball_dy = states[i & 1023]
+            match.predict_ball_y()
+    return run
+
+
+def bench_collision():
+    """Both check_paddle_collision calls made per tick."""
+    match = Match(seed=1)
+    states = ball_states(1024, match.ball_speed_x)
+    margin = match.court.paddle_x_position - 20
+
+    def run(number):
+        for i in range(number):
+            match.ball_x, match.ball_y, match.ball_dx, match.ball_dy = states[i & 1023]
+            match.check_paddle_collision(0.0, margin)
+            match.check_paddle_collision(0.0, -margin)
+    return run
+
+
+def bench_snapshot(operation):
+    """Save or restore one full match snapshot."""
+    from pong_rollback import SnapshotRing
+    match = Match(one_player=True, seed=1)
+    ring = SnapshotRing()
+    ring.save(match)
+
+    def run(number):
+        if operation == "save":
+            for _ in range(number):
+                ring.save(match)
+        else:
+            for _ in range(number):
+                ring.restore(match, 0)
+    return run
+
+
+def bench_rollback(ticks):
+    """Restore a snapshot and re-simulate ticks ticks, saving each one."""
+    from pong_rollback import RollbackSession
+    match = Match(one_player=True, seed=1)
+    session = RollbackSession(match)
+    for _ in range(ticks):
+        session.step()
+
+    def run(number):
+        for _ in range(number):
+            session.rollback(match.tick - ticks)
+    return run
+
+
+def bench_hit_test(count):
+    """Find the widget under random clicks on a court covered by a grid of count buttons."""
+    from pong_widgets import Widget, WidgetIndex
+    court = Court()
+    widgets = WidgetIndex()
+    columns = int(count ** 0.5)
+    rows = -(-count // columns)
+    width, height = court.game_width / columns, court.game_height / rows
+    for i in range(count):
+        x = -court.game_width / 2 + (i % columns + 0.5) * width
+        y = -court.game_height / 2 + (i // columns + 0.5) * height
+        widgets.add(Widget(x, y, width * 0.8, height * 0.8, None))
+    rng = random.Random(0)
+    clicks = [(rng.uniform(-court.boundary_x, court.boundary_x), rng.uniform(-court.boundary_y, court.boundary_y))
+              for _ in range(1000)]
+
+    def run(number):
+        find = widgets.find
+        for i in range(number):
+            find(*clicks[i % 1000])
+    return run
+
+
+def headless_benchmarks():
+    """Return (name, func, number) for every benchmark that needs no display."""
+    benches = [("match_step/two_player", bench_match_step(), 200000)]
+    for level in DIFFICULTY_PRESETS:
+        benches.append((f"match_step/{level}", bench_match_step(level), 200000))
+        benches.append((f"ai_move_paddle/{level}", bench_ai_move(level), 100000))
+    benches.append(("match_step/fast_discrete", bench_fast_step(False), 200000))
+    benches.append(("match_step/fast_swept", bench_fast_step(True), 200000))
+    for ball_count in (10, 100):
+        benches.append((f"match_step/balls_{ball_count}", bench_multi_ball(ball_count), 200000 // ball_count))
+    for speed in (0.15, 1, 5, 25):
+        benches.append((f"predict_ball_y/speed_{speed}", bench_predict(speed), 100000))
+    benches.append(("check_paddle_collision", bench_collision(), 200000))
+    benches.append(("rollback/save", bench_snapshot("save"), 50000))
+    benches.append(("rollback/restore", bench_snapshot("restore"), 50000))
+    benches.append(("rollback/resimulate_10", bench_rollback(10), 5000))
+    for count in (10, 1000):
+        benches.append((f"widgets/hit_test_{count}", bench_hit_test(count), 100000))
+
+    try:
+        import numpy as np
+        import pong_batch
+    except ImportError:
+        print("NumPy not installed, skipping batch benchmarks")
+        return benches
+
+    states = np.array(ball_states(100000, 1.0)).T
+
+    def batch_predict(number):
+        for _ in range(number):
+            pong_batch.predict_landing_y(*states, 351, 600)
+
+    batch = pong_batch.BatchMatch(10000, seed=1)
+
+    def batch_step(number):
+        for _ in range(number):
+            batch.step()
+
+    benches.append(("batch/predict_landing_y_100k", batch_predict, 20))
+    benches.append(("batch/step_10k_matches", batch_step, 50))
+
+    try:
+        import pong_video
+    except ImportError:
+        print("Pillow not installed, skipping video benchmarks")
+        return benches
+
+    match = Match(seed=1)
+    renderer = pong_video.FrameRenderer(match.court)
+    renderer.start(match, ("Player 1", "Player 2"), "default", show_timer=True)
+    palette = pong_video.build_palette(renderer.render(match))
+    encoder = pong_video.FrameEncoder(match.court, "default", ("Player 1", "Player 2"), True,
+                                      palette, 1.0, 20, None)
+
+    def render_frame(number):
+        for _ in range(number):
+            match.step()
+            renderer.render(match)
+
+    def encode_frames(number):
+        states = []
+        for _ in range(number + 1):
+            match.step()
+            states.append(pong_video.FrameState(match))
+        encoder.encode(0, states[0], states[1:])
+
+    benches.append(("video/render_frame", render_frame, 500))
+    benches.append(("video/encode_gif_frame", encode_frames, 100))
+    return benches
+
+
+def ensure_display():
+    """Make sure Tk has a display, starting Xvfb if needed. Returns a process or None."""
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None
+    display = ":99"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5)
+    return proc
+
+
+def tk_game():
+    """Return a PongGame with a two player match started, or None without a display."""
+    try:
+        import Pong
+        game = Pong.PongGame()
+    except Exception as e:  # No display, no Tk, no usable screen
+        print(f"Skipping Tk benchmarks: {e}")
+        return None
+
+    game.audio_enabled = False
+    game.one_player = False
+    game.start_game()
+    # Stop the scheduled loop; frames are driven by hand below
+    game.loop_generation += 1
+    return game
+
+
+def tk_benchmarks(game):
+    """Return Tk rendering benchmarks for a game from tk_game()."""
+    def frame(number):
+        for _ in range(number):
+            game.advance_frame()
+            game.present_frame()
+
+    renderer = game.renderer
+
+    def score_unchanged(number):
+        for _ in range(number):
+            renderer.update_score(game.match)
+
+    def score_changed(number):
+        for i in range(number):
+            game.match.score_a = i
+            renderer.update_score(game.match)
+
+    def timer_display(number):
+        for i in range(number):
+            game.match.time_left = 300 - i * 0.01
+            renderer.timer_pen.write(timer_text(game.match))
+
+    return [
+        ("tk/frame", frame, 500),
+        ("tk/update_score_unchanged", score_unchanged, 2000),
+        ("tk/update_score_changed", score_changed, 500),
+        ("tk/update_timer_display", timer_display, 2000),
+    ]
+
+
+def paused_cpu(game, mode, seconds):
+    """Pause the match for seconds in a game loop mode and return the CPU time used.
+
+    "blocking" runs PongGame.game_loop, which keeps waking up while
+    paused; "timer" starts the ontimer loop and sits in Tk's mainloop.
+    Either way a Tk timer ends the pause after seconds of wall time.
+    min_us is the CPU time per second paused, so --compare works on it.
+    """
+    game.game_running = True
+    game.paused = True
+    ms = int(seconds * 1000)
+    start = time.process_time()
+    if mode == "blocking":
+        game.screen.ontimer(lambda: setattr(game, "game_running", False), ms)
+        game.game_loop()
+    else:
+        root = game.screen.getcanvas().winfo_toplevel()
+        game.start_game_timer()
+        game.screen.ontimer(root.quit, ms)
+        root.mainloop()
+    cpu = time.process_time() - start
+    game.paused = False
+    game.game_running = True
+    game.loop_generation += 1
+    us_per_second = cpu / seconds * 1e6
+    return {"number": 1, "repeat": 1, "seconds": seconds, "cpu_seconds": cpu,
+            "min_us": us_per_second, "median_us": us_per_second, "ops_per_sec": 0.0}
+
+
+def pygame_benchmarks():
+    """Return pygame rendering benchmarks: a physics tick plus a dirty-rect frame."""
+    if not os.environ.get("DISPLAY"):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+        from pong_pygame import PygameRenderer
+        pygame.display.init()
+        pygame.font.init()
+        surface = pygame.display.set_mode((800, 600))
+    except Exception as e:  # No pygame, no usable video driver
+        print(f"Skipping pygame benchmarks: {e}")
+        return []
+
+    def frame(match):
+        renderer = PygameRenderer(surface, match.court)
+        renderer.start(match, ("Player 1", "Player 2"), "default", show_timer=True)
+
+        def run(number):
+            for _ in range(number):
+                if not match.running:
+                    match.reset()
+                previous = (match.ball_x, match.ball_y, match.paddle_a_y, match.paddle_b_y)
+                renderer.draw(match, match.step(), previous, 0.5)
+                renderer.present()
+        return run
+
+    return [
+        ("pygame/frame", frame(Match(seed=1)), 5000),
+        ("pygame/frame_balls_100", frame(MultiBallMatch(seed=1, ball_count=100)), 500),
+    ]
+
+
+def compare(results, baseline, threshold):
+    """Return benchmark names whose min time grew by more than threshold."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        change = result["min_us"] / old["min_us"] - 1 if old["min_us"] else 0.0
+        result["change"] = change
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Pong hot paths.")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="JSON file to write")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging")
+    parser.add_argument("--tk", action="store_true", help="also run Tk rendering benchmarks")
+    parser.add_argument("--pygame", action="store_true", help="also run pygame rendering benchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--pause-seconds", type=float, default=5.0,
+                        help="how long to pause for the Tk paused CPU measurement")
+    args = parser.parse_args(argv)
+
+    benches = headless_benchmarks()
+    xvfb = None
+    game = None
+    if args.tk:
+        xvfb = ensure_display()
+        game = tk_game()
+        if game:
+            benches += tk_benchmarks(game)
+    if args.pygame:
+        benches += pygame_benchmarks()
+
+    results = {}
+    try:
+        for name, func, number in benches:
+            if args.filter not in name:
+                continue
+            results[name] = measure(func, number)
+            print(f"{name:40s} {results[name]['min_us']:10.3f} us/op")
+        for mode in ("blocking", "timer") if game else ():
+            name = f"tk/paused_cpu/{mode}"
+            if args.filter not in name:
+                continue
+            results[name] = paused_cpu(game, mode, args.pause_seconds)
+            print(f"{name:40s} {results[name]['min_us']:10.3f} us CPU per second paused")
+    finally:
+        if xvfb:
+            xvfb.terminate()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name in regressions:
+            print(f"REGRESSION {name}: {results[name]['change']:+.1%}")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=1)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,583 @@
+"""Headless Pong simulation shared by the turtle front end and offline tools.
+
+Nothing in here touches turtle, Tk or pygame, so a match can be stepped
+without a display. All speeds are per physics tick; one tick is
+TICK_SECONDS of game time.
+"""
+import random
+from array import array
+
+# Constants
+TICK_SECONDS = 0.01
+PADDLE_WIDTH = 30
+PADDLE_HALF_HEIGHT = 80
+BALL_RADIUS = 10
+AI_RECOVERY_TICKS = 30
+# Held paddle keys move paddle_speed this many times per second, about
+# the keyboard auto-repeat rate that used to drive paddle movement
+HELD_KEY_RATE = 30
+# Most wall and paddle bounces resolved within one swept tick
+MAX_BOUNCES_PER_TICK = 4
+
+# Event names double as sound names in PongGame.play_sound
+WALL_HIT = "wall_hit"
+PADDLE_HIT = "paddle_hit"
+SCORE = "score"
+GAME_OVER = "game_over"
+
+DIFFICULTY_PRESETS = {
+    "easy": {
+        "ai_accuracy": 0.5,
+        "ai_reaction_delay": 10,
+        "ai_max_speed": 10,
+        "ai_prediction_error": 1,
+        "ai_edge_weakness": 1.2,
+    },
+    "medium": {
+        "ai_accuracy": 0.100,
+        "ai_reaction_delay": 6,
+        "ai_max_speed": 15,
+        "ai_prediction_error": 0.6,
+        "ai_edge_weakness": 0.8,
+    },
+    "hard": {
+        "ai_accuracy": 1,
+        "ai_reaction_delay": 2,
+        "ai_max_speed": 20,
+        "ai_prediction_error": 0.10,
+        "ai_edge_weakness": 0.10,
+    },
+}
+
+# Points needed to win a solo match: (player, AI)
+WIN_SCORES = {
+    "easy": (5, 5),
+    "medium": (10, 3),
+    "hard": (15, 5),
+}
+
+
+def fold_into_court(y, half_height):
+    """Reflect an unbounded y off the walls at +/-half_height in constant time.
+
+    Bouncing between two walls is a triangle wave with period
+    4 * half_height, so the fold is a modulo plus one mirror.
+    """
+    if -half_height <= y <= half_height:
+        return y
+    period = 4 * half_height
+    u = (y + half_height) % period
+    if u > 2 * half_height:
+        u = period - u
+    return u - half_height
+
+
+def sweep(x, y, dx, dy, wall, face, paddle_a_y, paddle_b_y, events):
+    """Move a ball through one tick, bouncing at the exact time of impact.
+
+    The ball's path is tested against the walls at +/-wall and against the
+    front face of each paddle at +/-face (the plane where
+    Match.check_paddle_collision starts to fire). Every hit reflects the
+    ball for the rest of the tick and appends its event. Returns the new
+    (x, y, dx, dy).
+    """
+    remaining = 1.0
+
+    for _ in range(MAX_BOUNCES_PER_TICK):
+        t = remaining
+        hit = None
+
+        # Walls
+        if dy > 0 and y + dy * remaining > wall:
+            t, hit = (wall - y) / dy, WALL_HIT
+        elif dy < 0 and y + dy * remaining < -wall:
+            t, hit = (-wall - y) / dy, WALL_HIT
+
+        # Paddle faces, if reached before the wall
+        if dx > 0 and x < face <= x + dx * t:
+            t_hit = (face - x) / dx
+            y_hit = y + dy * t_hit
+            if paddle_b_y - PADDLE_HALF_HEIGHT < y_hit < paddle_b_y + PADDLE_HALF_HEIGHT:
+                t, hit = t_hit, PADDLE_HIT
+        elif dx < 0 and x > -face >= x + dx * t:
+            t_hit = (-face - x) / dx
+            y_hit = y + dy * t_hit
+            if paddle_a_y - PADDLE_HALF_HEIGHT < y_hit < paddle_a_y + PADDLE_HALF_HEIGHT:
+                t, hit = t_hit, PADDLE_HIT
+
+        x += dx * t
+        y += dy * t
+        remaining -= t
+        if hit is None:
+            break
+        if hit == WALL_HIT:
+            dy = -dy
+        else:
+            dx = -dx
+        events.append(hit)
+    else:
+        # Out of bounces; finish the tick in a straight line
+        x += dx * remaining
+        y += dy * remaining
+
+    return x, y, dx, dy
+
+
+class Court:
+    """Playfield geometry derived from the game area size."""
+
+    __slots__ = ("game_width", "game_height", "boundary_x", "boundary_y",
+                 "paddle_x_position", "scale_factor")
+
+    def __init__(self, game_width=800, game_height=600):
+        self.game_width = game_width
+        self.game_height = game_height
+        self.boundary_x = int(game_width / 2) - 10
+        self.boundary_y = int(game_height / 2) - 10
+        self.paddle_x_position = int(self.boundary_x * 0.9)
+        self.scale_factor = min(game_width / 800, game_height / 600)
+
+
+class Match:
+    """State and rules of a single match, advanced one tick at a time."""
+
+    __slots__ = ("court", "one_player", "difficulty_level", "ball_speed_x",
+                 "ball_speed_y", "paddle_speed", "time_limit_seconds", "rng", "seed",
+                 "ai_accuracy", "ai_reaction_delay", "ai_max_speed",
+                 "ai_prediction_error", "ai_edge_weakness",
+                 "ball_x", "ball_y", "ball_dx", "ball_dy",
+                 "paddle_a_y", "paddle_b_y", "paddle_a_dir", "paddle_b_dir", "score_a", "score_b",
+                 "ai_frame_counter", "ai_recovery_counter", "time_left",
+                 "left_ai", "left_ai_frame_counter", "left_ai_recovery_counter",
+                 "win_score", "swept", "running", "winner", "tick")
+
+    def __init__(self, court=None, one_player=False, difficulty="medium",
+                 ball_speed_x=None, ball_speed_y=None, paddle_speed=None,
+                 time_limit_seconds=300, ai_params=None, rng=None, seed=None,
+                 left_ai=None, win_score=None, swept=True):
+        self.court = court or Court()
+        self.one_player = one_player
+        self.ball_speed_x = ball_speed_x if ball_speed_x is not None else 0.15 * self.court.scale_factor
+        self.ball_speed_y = ball_speed_y if ball_speed_y is not None else self.ball_speed_x
+        self.paddle_speed = paddle_speed if paddle_speed is not None else 20 * self.court.scale_factor
+        self.time_limit_seconds = time_limit_seconds
+        self.seed = seed
+        self.rng = rng or random.Random(seed)
+        # Optional AI for the left paddle (AI vs AI play), as a preset name or
+        # a dict of the five AI parameters
+        self.left_ai = DIFFICULTY_PRESETS[left_ai] if isinstance(left_ai, str) else left_ai
+        # First to win_score points wins, instead of the difficulty's limits
+        self.win_score = win_score
+        # Swept collisions find the exact time of impact within a tick, so
+        # fast balls cannot tunnel; False keeps the original discrete checks
+        self.swept = swept
+        self.set_difficulty(difficulty, ai_params)
+        self.reset()
+
+    def set_difficulty(self, level, ai_params=None):
+        """Set AI difficulty parameters from a preset plus optional overrides."""
+        self.difficulty_level = level
+        params = dict(DIFFICULTY_PRESETS.get(level, DIFFICULTY_PRESETS["medium"]))
+        if ai_params:
+            params.update(ai_params)
+        self.ai_accuracy = params["ai_accuracy"]
+        self.ai_reaction_delay = params["ai_reaction_delay"]
+        self.ai_max_speed = params["ai_max_speed"]
+        self.ai_prediction_error = params["ai_prediction_error"]
+        self.ai_edge_weakness = params["ai_edge_weakness"]
+
+    def reset(self):
+        """Reset scores, paddles, counters and serve a fresh ball."""
+        self.score_a = 0
+        self.score_b = 0
+        self.paddle_a_y = 0.0
+        self.paddle_b_y = 0.0
+        self.paddle_a_dir = 0
+        self.paddle_b_dir = 0
+        self.ai_frame_counter = 0
+        self.ai_recovery_counter = 0
+        self.left_ai_frame_counter = 0
+        self.left_ai_recovery_counter = 0
+        self.time_left = self.time_limit_seconds
+        self.running = True
+        self.winner = None
+        self.tick = 0
+        self.reset_ball()
+
+    def reset_ball(self):
+        """Reset the ball to the center with random direction."""
+        self.ball_x = 0.0
+        self.ball_y = 0.0
+        self.ball_dx = self.rng.choice([-self.ball_speed_x, self.ball_speed_x])
+        self.ball_dy = self.rng.choice([-self.ball_speed_y, self.ball_speed_y])
+
+    def move_paddle(self, side, distance):
+        """Move paddle "a" or "b" while staying within boundaries."""
+        paddle_boundary = self.court.boundary_y - 100
+        if side == "a":
+            new_y = self.paddle_a_y + distance
+            if -paddle_boundary < new_y < paddle_boundary:
+                self.paddle_a_y = new_y
+        else:
+            new_y = self.paddle_b_y + distance
+            if -paddle_boundary < new_y < paddle_boundary:
+                self.paddle_b_y = new_y
+
+    def set_paddle_direction(self, side, direction):
+        """Set a held paddle's direction: 1 up, -1 down, 0 still."""
+        if side == "a":
+            self.paddle_a_dir = direction
+        else:
+            self.paddle_b_dir = direction
+
+    def step(self):
+        """Advance the match by one tick and return the list of events."""
+        events = []
+        if not self.running:
+            return events
+        court = self.court
+        self.tick += 1
+
+        # Held paddle keys
+        if self.paddle_a_dir or self.paddle_b_dir:
+            self.move_held_paddles()
+
+        # Move ball
+        if self.swept:
+            self.sweep_ball(events)
+        else:
+            self.ball_x += self.ball_dx
+            self.ball_y += self.ball_dy
+
+        self.run_ai()
+
+        # Ball collision with top and bottom
+        if not self.swept and (self.ball_y > court.boundary_y or self.ball_y < -court.boundary_y):
+            self.ball_dy *= -1
+            events.append(WALL_HIT)
+
+        # Scoring
+        if self.ball_x > court.boundary_x:
+            self.score_a += 1
+            events.append(SCORE)
+            self.reset_ball()
+            self.ai_recovery_counter = AI_RECOVERY_TICKS
+        elif self.ball_x < -court.boundary_x:
+            self.score_b += 1
+            events.append(SCORE)
+            self.reset_ball()
+            self.left_ai_recovery_counter = AI_RECOVERY_TICKS
+
+        # Win check for solo play
+        if self.one_player and self.check_win():
+            events.append(GAME_OVER)
+            return events
+
+        # Paddle collisions
+        paddle_collision_margin = court.paddle_x_position - 20
+        if self.check_paddle_collision(self.paddle_b_y, paddle_collision_margin):
+            self.ball_dx = -abs(self.ball_dx)  # Ensure ball moves left
+            events.append(PADDLE_HIT)
+        elif self.check_paddle_collision(self.paddle_a_y, -paddle_collision_margin):
+            self.ball_dx = abs(self.ball_dx)  # Ensure ball moves right
+            events.append(PADDLE_HIT)
+
+        # Timer logic for two player mode
+        events.extend(self.elapse(TICK_SECONDS))
+        return events
+
+    def move_held_paddles(self):
+        """Move each paddle whose key is held by one tick's worth of travel."""
+        distance = self.paddle_speed * HELD_KEY_RATE * TICK_SECONDS
+        if self.paddle_a_dir:
+            self.move_paddle("a", self.paddle_a_dir * distance)
+        if self.paddle_b_dir:
+            self.move_paddle("b", self.paddle_b_dir * distance)
+
+    def run_ai(self):
+        """Count down the AI reaction timers and move AI paddles that are due."""
+        if self.one_player:
+            if self.ai_recovery_counter > .0100:
+                self.ai_recovery_counter = max(0, self.ai_recovery_counter - .1)
+
+            self.ai_frame_counter += .1
+            if self.ai_frame_counter >= self.ai_reaction_delay and self.ai_recovery_counter == 0:
+                self.ai_move_paddle()
+                self.ai_frame_counter = 0
+
+        if self.left_ai:
+            if self.left_ai_recovery_counter > .0100:
+                self.left_ai_recovery_counter = max(0, self.left_ai_recovery_counter - .1)
+
+            self.left_ai_frame_counter += .1
+            if (self.left_ai_frame_counter >= self.left_ai["ai_reaction_delay"]
+                    and self.left_ai_recovery_counter == 0):
+                self.ai_move_paddle("a")
+                self.left_ai_frame_counter = 0
+
+    def win_limits(self):
+        """Points each side needs to win a solo match: (player, AI)."""
+        if self.win_score:
+            return self.win_score, self.win_score
+        return WIN_SCORES.get(self.difficulty_level, WIN_SCORES["medium"])
+
+    def check_win(self):
+        """End a solo match once either side reaches its winning score."""
+        limit_a, limit_b = self.win_limits()
+        if self.score_a >= limit_a or self.score_b >= limit_b:
+            self.winner = "a" if self.score_a >= limit_a else "b"
+            self.running = False
+            return True
+        return False
+
+    def sweep_ball(self, events):
+        """Move the ball through one tick, bouncing at the exact time of impact."""
+        court = self.court
+        self.ball_x, self.ball_y, self.ball_dx, self.ball_dy = sweep(
+            self.ball_x, self.ball_y, self.ball_dx, self.ball_dy, court.boundary_y,
+            court.paddle_x_position - 20 - PADDLE_WIDTH - BALL_RADIUS,
+            self.paddle_a_y, self.paddle_b_y, events)
+
+    def elapse(self, seconds):
+        """Run the two player clock down by seconds and end the match at zero."""
+        if self.one_player or not self.running:
+            return []
+        self.time_left -= seconds
+        if self.time_left > 0:
+            return []
+        if self.score_a > self.score_b:
+            self.winner = "a"
+        elif self.score_b > self.score_a:
+            self.winner = "b"
+        else:
+            self.winner = "tie"
+        self.running = False
+        return [GAME_OVER]
+
+    def run(self, max_ticks=None):
+        """Step until the match ends or max_ticks elapse; return the winner."""
+        ticks = 0
+        while self.running and (max_ticks is None or ticks < max_ticks):
+            self.step()
+            ticks += 1
+        return self.winner
+
+    def ai_settings(self, side):
+        """Return (accuracy, max speed, prediction error, edge weakness) for a side's AI."""
+        if side == "b":
+            return self.ai_accuracy, self.ai_max_speed, self.ai_prediction_error, self.ai_edge_weakness
+        ai = self.left_ai
+        return ai["ai_accuracy"], ai["ai_max_speed"], ai["ai_prediction_error"], ai["ai_edge_weakness"]
+
+    def ai_move_paddle(self, side="b"):
+        """AI logic for moving a paddle; the right-hand one unless side is "a"."""
+        rng = self.rng
+        court = self.court
+        accuracy, max_speed, prediction_error, edge_weakness = self.ai_settings(side)
+        # Don't move if ball is moving away
+        if (self.ball_dx < 0) if side == "b" else (self.ball_dx > 0):
+            if rng.random() < 0.1:
+                self.move_paddle(side, rng.uniform(-5, 5))
+            return
+
+        # Add a miss chance
+        if rng.random() < 0.08:
+            return
+
+        # Predict ball position
+        predicted_y = self.predict_ball_y(side)
+
+        # Apply difficulty factors
+        edge_factor = 1.0
+        if abs(self.ball_y) > court.boundary_y * 0.75:
+            edge_factor = 1.0 - (edge_weakness * (abs(self.ball_y) - court.boundary_y * 0.75) / (court.boundary_y * 0.25))
+
+        perfect_y = predicted_y * edge_factor
+
+        # Add randomness based on difficulty
+        if rng.random() > accuracy:
+            noise_factor = (1 - accuracy) * (court.game_height / 2)
+            perfect_y += rng.uniform(-noise_factor, noise_factor)
+
+        # Limit to screen boundaries
+        perfect_y = max(-court.boundary_y + 50, min(court.boundary_y - 50, perfect_y))
+
+        # Move paddle
+        paddle_y = self.paddle_b_y if side == "b" else self.paddle_a_y
+        if perfect_y > paddle_y + 10:
+            paddle_y += min(max_speed, abs(perfect_y - paddle_y))
+        elif perfect_y < paddle_y - 10:
+            paddle_y -= min(max_speed, abs(perfect_y - paddle_y))
+        if side == "b":
+            self.paddle_b_y = paddle_y
+        else:
+            self.paddle_a_y = paddle_y
+
+    def predict_ball_y(self, side="b"):
+        """Predict where the ball will be when it reaches a side's paddle."""
+        if self.ball_dx == 0:
+            return self.ball_y
+
+        court = self.court
+        paddle_x = court.paddle_x_position if side == "b" else -court.paddle_x_position
+        dist_x = abs(paddle_x - self.ball_x)
+        time_steps = dist_x / abs(self.ball_dx)
+        predicted_y = self.ball_y + (self.ball_dy * time_steps)
+        effective_height = court.game_height - 20
+
+        # Fold bounces back into the court
+        predicted_y = fold_into_court(predicted_y, effective_height/2)
+
+        # Add prediction error
+        error_range = self.ai_settings(side)[2] * (court.game_height/4)
+        return predicted_y + self.rng.uniform(-error_range, error_range)
+
+    def check_paddle_collision(self, paddle_y, x_boundary):
+        """Check if the ball collides with a paddle at the given y."""
+        # Check if ball is within paddle's vertical range
+        if paddle_y - PADDLE_HALF_HEIGHT < self.ball_y < paddle_y + PADDLE_HALF_HEIGHT:
+            # For right paddle (positive x_boundary)
+            if x_boundary > 0 and self.ball_x + BALL_RADIUS >= x_boundary - PADDLE_WIDTH and self.ball_dx > 0:
+                return True
+            # For left paddle (negative x_boundary)
+            elif x_boundary < 0 and self.ball_x - BALL_RADIUS <= x_boundary + PADDLE_WIDTH and self.ball_dx < 0:
+                return True
+        return False
+
+
+class MultiBallMatch(Match):
+    """Match with many balls in play at once.
+
+    Ball state lives in four parallel arrays (ball_xs, ball_ys, ball_dxs,
+    ball_dys) and every ball is moved, bounced and scored in one pass per
+    tick. The single-ball fields (ball_x ... ball_dy) hold whichever ball
+    an AI paddle is currently tracking.
+
+    Every ball that gets past a paddle scores, so the solo winning scores
+    (win_score or WIN_SCORES) count per ball and are multiplied by
+    ball_count; otherwise a match with many balls would be over in seconds.
+    """
+
+    __slots__ = ("ball_count", "ball_xs", "ball_ys", "ball_dxs", "ball_dys")
+
+    def __init__(self, *args, ball_count=50, **kwargs):
+        self.ball_count = ball_count
+        self.ball_xs = array("d", [0.0]) * ball_count
+        self.ball_ys = array("d", [0.0]) * ball_count
+        self.ball_dxs = array("d", [0.0]) * ball_count
+        self.ball_dys = array("d", [0.0]) * ball_count
+        super().__init__(*args, **kwargs)
+
+    def reset_ball(self):
+        """Serve every ball, spread evenly along the center line."""
+        spacing = 2 * self.court.boundary_y / self.ball_count
+        for i in range(self.ball_count):
+            self.serve_ball(i, -self.court.boundary_y + (i + 0.5) * spacing)
+        self.focus_ball("b")
+
+    def serve_ball(self, i, y=0.0):
+        """Put ball i back at the center line with a random direction."""
+        rng = self.rng
+        self.ball_xs[i] = 0.0
+        self.ball_ys[i] = y
+        self.ball_dxs[i] = rng.choice([-self.ball_speed_x, self.ball_speed_x])
+        self.ball_dys[i] = rng.choice([-self.ball_speed_y, self.ball_speed_y])
+
+    def step(self):
+        """Advance every ball by one tick and return the list of events."""
+        events = []
+        if not self.running:
+            return events
+        self.tick += 1
+
+        if self.paddle_a_dir or self.paddle_b_dir:
+            self.move_held_paddles()
+        self.move_balls(events)
+        self.run_ai()
+
+        if self.one_player and self.check_win():
+            events.append(GAME_OVER)
+            return events
+
+        # Paddles bounce balls where the AI has just moved them, as in Match.step
+        self.bounce_paddles(events)
+        events.extend(self.elapse(TICK_SECONDS))
+        return events
+
+    def win_limits(self):
+        limit_a, limit_b = super().win_limits()
+        return limit_a * self.ball_count, limit_b * self.ball_count
+
+    def move_balls(self, events):
+        """Move, bounce off the walls and score every ball for one tick."""
+        court = self.court
+        wall = court.boundary_y
+        goal = court.boundary_x
+        face = court.paddle_x_position - 20 - PADDLE_WIDTH - BALL_RADIUS
+        paddle_a_y = self.paddle_a_y
+        paddle_b_y = self.paddle_b_y
+        xs, ys, dxs, dys = self.ball_xs, self.ball_ys, self.ball_dxs, self.ball_dys
+        swept = self.swept
+
+        for i in range(self.ball_count):
+            x, y, dx, dy = xs[i], ys[i], dxs[i], dys[i]
+            if swept:
+                x, y, dx, dy = sweep(x, y, dx, dy, wall, face, paddle_a_y, paddle_b_y, events)
+            else:
+                x += dx
+                y += dy
+                if y > wall or y < -wall:
+                    dy = -dy
+                    events.append(WALL_HIT)
+
+            # Scoring serves just this ball again
+            if x > goal or x < -goal:
+                if x > goal:
+                    self.score_a += 1
+                    self.ai_recovery_counter = AI_RECOVERY_TICKS
+                else:
+                    self.score_b += 1
+                    self.left_ai_recovery_counter = AI_RECOVERY_TICKS
+                events.append(SCORE)
+                self.serve_ball(i, self.rng.uniform(-wall / 2, wall / 2))
+                continue
+
+            xs[i], ys[i], dxs[i], dys[i] = x, y, dx, dy
+
+    def bounce_paddles(self, events):
+        """Turn back every ball that has reached a paddle's face."""
+        face = self.court.paddle_x_position - 20 - PADDLE_WIDTH - BALL_RADIUS
+        paddle_a_y = self.paddle_a_y
+        paddle_b_y = self.paddle_b_y
+        xs, ys, dxs = self.ball_xs, self.ball_ys, self.ball_dxs
+
+        for i in range(self.ball_count):
+            x, y, dx = xs[i], ys[i], dxs[i]
+            # Same test as check_paddle_collision, for balls that come in
+            # around the end of a paddle
+            if dx > 0 and x >= face and paddle_b_y - PADDLE_HALF_HEIGHT < y < paddle_b_y + PADDLE_HALF_HEIGHT:
+                dxs[i] = -dx
+                events.append(PADDLE_HIT)
+            elif dx < 0 and x <= -face and paddle_a_y - PADDLE_HALF_HEIGHT < y < paddle_a_y + PADDLE_HALF_HEIGHT:
+                dxs[i] = -dx
+                events.append(PADDLE_HIT)
+
+    def focus_ball(self, side="b"):
+        """Copy the ball that will reach a side's paddle soonest into ball_x ... ball_dy."""
+        paddle_x = self.court.paddle_x_position if side == "b" else -self.court.paddle_x_position
+        xs, dxs = self.ball_xs, self.ball_dxs
+        best = 0
+        best_time = float("inf")
+        for i in range(self.ball_count):
+            dx = dxs[i]
+            if dx:
+                time_steps = (paddle_x - xs[i]) / dx
+                if 0 <= time_steps < best_time:
+                    best, best_time = i, time_steps
+        self.ball_x, self.ball_y = xs[best], self.ball_ys[best]
+        self.ball_dx, self.ball_dy = dxs[best], self.ball_dys[best]
+
+    def ai_move_paddle(self, side="b"):
+        """Move an AI paddle toward the most urgent ball."""
+        self.focus_ball(side)
+        super().ai_move_paddle(side)
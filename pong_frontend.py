@@ -0,0 +1,327 @@
+"""What every Pong front end shares: matches, the frame loop and the history.
+
+FrontEnd is the base of PongGame (turtle/Tk, in Pong.py) and PygameGame
+(pong_pygame). It builds matches from the player's settings, steps them
+at the fixed TICK_SECONDS rate against the wall clock, hands each frame
+to the front end's MatchRenderer, and profiles, records and adds
+finished matches to the match history. A front end brings its window,
+menus and input, and provides play_sound() and show_end_screen().
+"""
+import abc
+import os
+import sqlite3
+import time
+
+from pong_core import GAME_OVER, TICK_SECONDS
+from pong_history import MatchStore, RallyStats, match_result
+from pong_net import NetClient
+from pong_profiler import FrameProfiler, ProfiledMatch, ProfiledMultiBallMatch
+from pong_replay import MatchRecorder, DIRECTION_A, DIRECTION_B, ELAPSE
+
+MIN_WIDTH = 800
+MIN_HEIGHT = 600
+DEFAULT_BALL_SPEED = 0.15
+DEFAULT_PADDLE_SPEED = 20
+MAX_FRAME_TIME = 0.25  # Longest stall the physics will try to catch up on
+# Frames between refreshes of the F3 profiler overlay
+OVERLAY_INTERVAL = 50
+# Paddle keys, by their Tk names; other front ends map their keys to these
+PADDLE_KEYS = ("w", "s", "Up", "Down")
+
+
+def game_size(screen_width, screen_height):
+    """The (width, height) of the game area for a screen of the given size."""
+    return (min(1000, int(max(screen_width, MIN_WIDTH) * 0.95)),
+            min(800, int(max(screen_height, MIN_HEIGHT) * 0.95)))
+
+
+class FrontEnd(abc.ABC):
+    """Match setup, frame loop, profiling and history for a front end.
+
+    Subclasses set self.court with set_court() and self.renderer before
+    the first match.
+    """
+
+    def __init__(self, network=None):
+        # NetHost or NetClient for a game over the network
+        self.network = network
+        self.network_client = isinstance(network, NetClient)
+
+        self.game_running = False
+        self.paused = False
+        self.one_player = False
+        self.audio_enabled = True
+        self.difficulty_level = "medium"
+        self.time_limit_seconds = 300  # 5 minutes
+        self.ball_count = 1
+        self.selected_skin = "default"
+        self.player_1_name = "Player 1"
+        self.player_2_name = "Player 2"
+
+        self.match = None
+        self.recorder = None
+        self.rally_stats = RallyStats()
+        # Ball and paddle positions one tick before the match's current state
+        self.previous = None
+        self.keys_held = {}
+        # MatchStore, opened by the first match that needs it
+        self.history = None
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = False
+        self.renderer = None
+
+    def set_court(self, court):
+        """Use court for the coming matches, with speeds scaled to it."""
+        self.court = court
+        self.game_width = court.game_width
+        self.game_height = court.game_height
+        self.scale_factor = court.scale_factor
+        self.ball_speed_x = DEFAULT_BALL_SPEED * self.scale_factor
+        self.ball_speed_y = DEFAULT_BALL_SPEED * self.scale_factor
+        self.paddle_speed = DEFAULT_PADDLE_SPEED * self.scale_factor
+
+    @abc.abstractmethod
+    def play_sound(self, sound_name):
+        """Play a sound if audio is enabled."""
+
+    @abc.abstractmethod
+    def show_end_screen(self, title):
+        """Show the result of the finished match, with title from result_title()."""
+
+    def start_match(self):
+        """Build a match from the current settings and start drawing it."""
+        settings = dict(
+            seed=int.from_bytes(os.urandom(8), "little") >> 1,
+            one_player=self.one_player,
+            difficulty=self.difficulty_level,
+            ball_speed_x=self.ball_speed_x,
+            ball_speed_y=self.ball_speed_y,
+            paddle_speed=self.paddle_speed,
+            time_limit_seconds=self.time_limit_seconds,
+        )
+        if self.network_client:
+            # The host runs the match; this one only predicts it
+            self.match = self.network.match
+            self.recorder = None
+        elif self.ball_count > 1:
+            # Recordings only describe single-ball matches
+            self.match = ProfiledMultiBallMatch(self.court, profiler=self.profiler, ball_count=self.ball_count,
+                                                **settings)
+            self.recorder = None
+        else:
+            self.match = ProfiledMatch(self.court, profiler=self.profiler, **settings)
+            self.recorder = MatchRecorder(self.match)
+        if self.network and not self.network_client:
+            self.network.attach(self.match, self.recorder)
+        self.rally_stats = RallyStats()
+        self.previous = None
+        self.keys_held = dict.fromkeys(PADDLE_KEYS, False)
+
+        self.renderer.start(self.match, (self.player_1_name, self.player_2_name),
+                            self.selected_skin, show_timer=not self.one_player)
+        self.game_running = True
+        self.paused = False
+        self.reset_frame_clock()
+
+    def paddle_keys(self):
+        """Return {key: paddle side} for the keys that move a paddle in this match."""
+        if self.network_client:
+            # Either set of keys moves our paddle, the right-hand one
+            return dict.fromkeys(PADDLE_KEYS, "b")
+        keys = {"w": "a", "s": "a"}
+        if not self.one_player and not self.network:
+            keys.update({"Up": "b", "Down": "b"})
+        return keys
+
+    def set_key_held(self, key, side, held):
+        """Track a paddle key and update that paddle's held direction."""
+        if not self.match or self.keys_held.get(key) == held:
+            return
+        self.keys_held[key] = held
+        keys = self.keys_held
+        if self.network_client:
+            self.network.set_direction(int(keys["w"] or keys["Up"]) - int(keys["s"] or keys["Down"]))
+            return
+        up, down = ("w", "s") if side == "a" else ("Up", "Down")
+        direction = int(keys[up]) - int(keys[down])
+        if self.network:
+            # The host's inputs go through its rollback session
+            self.network.local_input(DIRECTION_A if side == "a" else DIRECTION_B, direction)
+            return
+        if self.recorder:
+            self.recorder.record_direction(side, direction)
+        self.match.set_paddle_direction(side, direction)
+
+    def step_match(self):
+        """Advance the match one tick, through the network link if there is one."""
+        if self.network:
+            return self.network.step()
+        return self.match.step()
+
+    def reset_frame_clock(self):
+        """Restart frame timing so a stall or pause is not replayed as physics."""
+        self.frame_previous = time.monotonic()
+        self.frame_accumulator = 0.0
+
+    def advance_frame(self):
+        """Step physics for the elapsed wall time and render one frame.
+
+        Returns the seconds until the next tick is due, or None once the
+        match is over.
+        """
+        self.profiler.begin_frame()
+        now = time.monotonic()
+        frame_time = now - self.frame_previous
+        self.frame_previous = now
+
+        events = []
+        if frame_time > MAX_FRAME_TIME:
+            # Skip physics we can't catch up on, but keep the clock honest
+            if self.network_client:
+                pass
+            elif self.network:
+                self.network.local_input(ELAPSE, frame_time - MAX_FRAME_TIME)
+            else:
+                if self.recorder:
+                    self.recorder.record_elapse(frame_time - MAX_FRAME_TIME)
+                events.extend(self.match.elapse(frame_time - MAX_FRAME_TIME))
+            frame_time = MAX_FRAME_TIME
+        self.frame_accumulator += frame_time
+
+        physics_start = time.perf_counter()
+        match = self.match
+        while self.frame_accumulator >= TICK_SECONDS and match.running:
+            self.previous = (match.ball_x, match.ball_y, match.paddle_a_y, match.paddle_b_y)
+            events.extend(self.step_match())
+            self.frame_accumulator -= TICK_SECONDS
+        self.profiler.add("physics", time.perf_counter() - physics_start)
+        self.rally_stats.add(events)
+
+        self.render_frame(events)
+        if GAME_OVER in events:
+            self.profiler.end_frame()
+            self.game_running = False
+            self.show_end_screen(self.result_title())
+            return None
+        return max(0.0, TICK_SECONDS - self.frame_accumulator)
+
+    def render_frame(self, events):
+        """Draw the current match state and play sounds for this frame's events."""
+        profiler = self.profiler
+        start = time.perf_counter()
+        # Renderers that draw faster than the physics runs blend from the last tick
+        self.renderer.draw(self.match, events, self.previous, min(1.0, self.frame_accumulator / TICK_SECONDS))
+        drawn = time.perf_counter()
+        profiler.add("sync", drawn - start)
+
+        for event in dict.fromkeys(events):
+            if event != GAME_OVER:
+                self.play_sound(event)
+        played = time.perf_counter()
+        profiler.add("audio", played - drawn)
+
+        if self.profiler_overlay and profiler.count % OVERLAY_INTERVAL == 0:
+            self.renderer.show_overlay(profiler.overlay_text())
+        profiler.add("hud", time.perf_counter() - played)
+
+    def present_frame(self):
+        """Push the frame to the screen and close its profiler sample."""
+        start = time.perf_counter()
+        self.renderer.present()
+        self.profiler.add("update", time.perf_counter() - start)
+        self.profiler.end_frame()
+
+    def toggle_profiler_overlay(self):
+        """Show or hide the frame time percentiles at the bottom of the screen."""
+        self.profiler_overlay = not self.profiler_overlay
+        self.renderer.show_overlay(self.profiler.overlay_text() if self.profiler_overlay else None)
+
+    def export_profile(self):
+        """Write the frame profile if PONG_PROFILE names an output prefix."""
+        prefix = os.environ.get("PONG_PROFILE")
+        if not prefix or not self.profiler.count:
+            return
+        try:
+            self.profiler.export_json(prefix + ".json")
+            self.profiler.export_chrome_trace(prefix + ".trace.json")
+        except OSError as e:
+            print(f"Error writing profile {prefix}: {e}")
+
+    def save_recording(self):
+        """Write the match recording if PONG_RECORD_DIR names a directory."""
+        record_dir = os.environ.get("PONG_RECORD_DIR")
+        if not record_dir or not self.recorder or self.recorder.finished:
+            return
+        path = os.path.join(record_dir, f"match-{time.strftime('%Y%m%d-%H%M%S')}-{self.match.seed:x}.pongrec")
+        try:
+            os.makedirs(record_dir, exist_ok=True)
+            self.recorder.save(path)
+        except OSError as e:
+            print(f"Error saving recording {path}: {e}")
+
+    def clear_game_objects(self):
+        """Remove the match from the screen and save its profile and recording."""
+        self.renderer.clear()
+        self.profiler_overlay = False
+        self.export_profile()
+        self.save_recording()
+        if self.network:
+            # Network matches are one-off; afterwards the game is local again
+            self.network.close()
+            self.network = None
+            self.network_client = False
+
+    def winner_name(self):
+        """Return the display name for the winner of the current match, or None for a tie."""
+        if self.match.winner == "a":
+            return self.player_1_name
+        if self.match.winner == "b":
+            return "AI" if self.one_player else self.player_2_name
+        return None
+
+    def result_title(self):
+        """The headline of the end screen."""
+        winner = self.winner_name()
+        return f"{winner} Wins!" if winner else "It's a Tie!"
+
+    def open_history(self):
+        """Return the match history store, opening it on first use; None if it can't be opened."""
+        if self.history is None:
+            try:
+                self.history = MatchStore()
+            except (sqlite3.Error, OSError) as e:
+                print(f"Error opening match history: {e}")
+                self.history = False
+        return self.history or None
+
+    def record_match(self):
+        """Add the finished match to the history and return the players' head to head line."""
+        history = self.open_history()
+        if not history:
+            return None
+        if self.network:
+            mode = "network"
+        elif self.ball_count > 1:
+            mode = "multi_ball"
+        elif self.one_player:
+            mode = "solo"
+        else:
+            mode = "two_player"
+        player_b = f"AI ({self.difficulty_level})" if self.one_player else self.player_2_name
+        try:
+            # Read before recording, as the write lands in the background
+            wins_a, wins_b, ties = history.head_to_head(self.player_1_name, player_b)
+        except sqlite3.Error as e:
+            print(f"Error reading match history: {e}")
+            return None
+        history.record(match_result(self.match, self.player_1_name, player_b, mode, rally_stats=self.rally_stats))
+        wins_a += self.match.winner == "a"
+        wins_b += self.match.winner == "b"
+        ties += self.match.winner == "tie"
+        line = f"{self.player_1_name} {wins_a} - {wins_b} {player_b}"
+        return line + (f", {ties} ties" if ties else "")
+
+    def close_history(self):
+        """Write any results still queued."""
+        if self.history:
+            self.history.close()
@@ -0,0 +1,291 @@
+"""Persistent match history and leaderboard in SQLite.
+
+Results are queued by record() and written by a background thread in
+batches, one transaction per batch, so neither the game loop nor a
+tournament waits on the disk. The database runs in WAL mode so queries
+from the game thread can read while a batch is being written.
+
+Per-player totals are kept in a standings table, updated in the same
+transaction as the matches, so the leaderboard is an index scan rather
+than a pass over every match. Matches that ran out of time without a
+winner are stored with winner UNFINISHED and left out of the standings
+and head to head records.
+
+    python pong_history.py                      # leaderboard
+    python pong_history.py --versus Ann Bob     # head to head
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from pong_core import PADDLE_HIT, SCORE, TICK_SECONDS
+
+BATCH_SIZE = 1000
+# Longest a queued result waits for more to batch with
+FLUSH_SECONDS = 0.5
+# Winner of a match that was stopped before anyone won
+UNFINISHED = "unfinished"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    difficulty TEXT,
+    player_a INTEGER NOT NULL REFERENCES players(id),
+    player_b INTEGER NOT NULL REFERENCES players(id),
+    score_a INTEGER NOT NULL,
+    score_b INTEGER NOT NULL,
+    winner TEXT,
+    ticks INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    rallies INTEGER NOT NULL,
+    paddle_hits INTEGER NOT NULL,
+    longest_rally INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_pairing ON matches (player_a, player_b);
+CREATE INDEX IF NOT EXISTS matches_player_b ON matches (player_b);
+CREATE INDEX IF NOT EXISTS matches_played_at ON matches (played_at);
+CREATE TABLE IF NOT EXISTS standings (
+    player INTEGER PRIMARY KEY REFERENCES players(id),
+    played INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    points_for INTEGER NOT NULL,
+    points_against INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS standings_rank ON standings (wins DESC, played);
+"""
+
+INSERT_PLAYER = "INSERT OR IGNORE INTO players (name) VALUES (?)"
+INSERT_MATCH = """
+INSERT INTO matches (played_at, source, mode, difficulty, player_a, player_b, score_a, score_b,
+                     winner, ticks, duration, rallies, paddle_hits, longest_rally)
+VALUES (:played_at, :source, :mode, :difficulty,
+        (SELECT id FROM players WHERE name = :player_a), (SELECT id FROM players WHERE name = :player_b),
+        :score_a, :score_b, :winner, :ticks, :duration, :rallies, :paddle_hits, :longest_rally)
+"""
+UPDATE_STANDING = """
+INSERT INTO standings (player, played, wins, losses, ties, points_for, points_against)
+VALUES ((SELECT id FROM players WHERE name = ?), 1, ?, ?, ?, ?, ?)
+ON CONFLICT (player) DO UPDATE SET
+    played = played + 1, wins = wins + excluded.wins, losses = losses + excluded.losses,
+    ties = ties + excluded.ties, points_for = points_for + excluded.points_for,
+    points_against = points_against + excluded.points_against
+"""
+
+
+def default_path():
+    """Database path under $XDG_DATA_HOME (~/.local/share) unless PONG_HISTORY is set."""
+    if os.environ.get("PONG_HISTORY"):
+        return os.environ["PONG_HISTORY"]
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "pong", "history.sqlite3")
+
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class RallyStats:
+    """Counts paddle hits per point from a match's step events."""
+
+    __slots__ = ("paddle_hits", "rallies", "longest_rally", "current")
+
+    def __init__(self):
+        self.paddle_hits = 0
+        self.rallies = 0
+        self.longest_rally = 0
+        self.current = 0
+
+    def add(self, events):
+        for event in events:
+            if event == PADDLE_HIT:
+                self.paddle_hits += 1
+                self.current += 1
+            elif event == SCORE:
+                self.rallies += 1
+                self.longest_rally = max(self.longest_rally, self.current)
+                self.current = 0
+
+
+def match_result(match, player_a, player_b, mode, source="game", rally_stats=None, played_at=None):
+    """Describe a match as a result for MatchStore.record(); one still running is UNFINISHED."""
+    rally_stats = rally_stats or RallyStats()
+    return {
+        "played_at": played_at or time.time(),
+        "source": source,
+        "mode": mode,
+        "difficulty": match.difficulty_level,
+        "player_a": player_a,
+        "player_b": player_b,
+        "score_a": match.score_a,
+        "score_b": match.score_b,
+        "winner": match.winner or UNFINISHED,
+        "ticks": match.tick,
+        "duration": match.tick * TICK_SECONDS,
+        "rallies": rally_stats.rallies,
+        "paddle_hits": rally_stats.paddle_hits,
+        "longest_rally": rally_stats.longest_rally,
+    }
+
+
+class MatchStore:
+    """Match results in SQLite, written in batches by a background thread."""
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.path = path or default_path()
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with connect(self.path) as db:
+            db.executescript(SCHEMA)
+        db.close()
+        # Read connection, opened by the first query in the querying thread
+        self.db = None
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="pong-history", daemon=True)
+        self.writer.start()
+
+    def record(self, result):
+        """Queue one result from match_result() to be written."""
+        self.queue.put([result])
+
+    def record_many(self, results):
+        """Queue many results, written batch_size to a transaction."""
+        results = list(results)
+        for start in range(0, len(results), self.batch_size):
+            self.queue.put(results[start:start + self.batch_size])
+
+    def flush(self):
+        """Block until everything queued so far has been written."""
+        self.queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        self.queue.put(None)
+        self.writer.join()
+        if self.db:
+            self.db.close()
+            self.db = None
+
+    def write_loop(self):
+        db = connect(self.path)
+        running = True
+        while running:
+            items = [self.queue.get()]
+            batch = []
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                item = items[-1]
+                if item is None:
+                    running = False
+                    break
+                batch.extend(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.write_batch(db, batch)
+                except sqlite3.Error as e:
+                    print(f"Error writing match history {self.path}: {e}")
+            for _ in items:
+                self.queue.task_done()
+        db.close()
+
+    def write_batch(self, db, batch):
+        """Insert a batch of results and update standings in one transaction."""
+        names = set()
+        standings = []
+        for r in batch:
+            names.update((r["player_a"], r["player_b"]))
+            if r["winner"] in (None, UNFINISHED):
+                continue
+            a_wins, b_wins = r["winner"] == "a", r["winner"] == "b"
+            tie = r["winner"] == "tie"
+            standings.append((r["player_a"], a_wins, b_wins, tie, r["score_a"], r["score_b"]))
+            standings.append((r["player_b"], b_wins, a_wins, tie, r["score_b"], r["score_a"]))
+        with db:
+            db.executemany(INSERT_PLAYER, [(name,) for name in names])
+            db.executemany(INSERT_MATCH, batch)
+            db.executemany(UPDATE_STANDING, standings)
+
+    def query(self, sql, params=()):
+        if self.db is None:
+            self.db = connect(self.path)
+        return self.db.execute(sql, params).fetchall()
+
+    def leaderboard(self, limit=10):
+        """Return (name, played, wins, losses, ties) for the players with most wins."""
+        return self.query(
+            "SELECT p.name, s.played, s.wins, s.losses, s.ties FROM standings s "
+            "JOIN players p ON p.id = s.player ORDER BY s.wins DESC, s.played LIMIT ?", (limit,))
+
+    def head_to_head(self, name_a, name_b):
+        """Return (wins for name_a, wins for name_b, ties) over all their finished matches."""
+        ids = dict(self.query("SELECT name, id FROM players WHERE name IN (?, ?)", (name_a, name_b)))
+        if name_a not in ids or name_b not in ids:
+            return 0, 0, 0
+        id_a, id_b = ids[name_a], ids[name_b]
+        rows = self.query(
+            "SELECT player_a, winner, COUNT(*) FROM matches "
+            "WHERE (player_a = ? AND player_b = ?) OR (player_a = ? AND player_b = ?) "
+            "GROUP BY player_a, winner", (id_a, id_b, id_b, id_a))
+        wins_a = wins_b = ties = 0
+        for player_a, winner, count in rows:
+            if winner == "tie":
+                ties += count
+            elif winner not in ("a", "b"):
+                continue
+            elif (winner == "a") == (player_a == id_a):
+                wins_a += count
+            else:
+                wins_b += count
+        return wins_a, wins_b, ties
+
+    def last_names(self, mode):
+        """Return (player a, player b) from the latest match in a mode, or None."""
+        rows = self.query(
+            "SELECT a.name, b.name FROM matches m JOIN players a ON a.id = m.player_a "
+            "JOIN players b ON b.id = m.player_b WHERE m.mode = ? ORDER BY m.played_at DESC LIMIT 1", (mode,))
+        return rows[0] if rows else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the Pong leaderboard or a head to head record.")
+    parser.add_argument("--db", default=None, help="database path (default: under $XDG_DATA_HOME/pong)")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--versus", nargs=2, metavar="NAME", help="show the record between two players")
+    args = parser.parse_args(argv)
+
+    store = MatchStore(args.db)
+    if args.versus:
+        wins_a, wins_b, ties = store.head_to_head(*args.versus)
+        print(f"{args.versus[0]} {wins_a} - {wins_b} {args.versus[1]}, {ties} ties")
+    else:
+        for rank, (name, played, wins, losses, ties) in enumerate(store.leaderboard(args.limit), 1):
+            print(f"{rank:3d}. {name:20s} {wins:6d} W {losses:6d} L {ties:5d} T  ({played} played)")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,497 @@
+"""Two-player Pong over UDP.
+
+The host runs the authoritative Match and plays the left paddle; the
+client plays the right paddle. The client sends only changes of its held
+direction, each numbered in sequence and stamped with its own tick, and
+resends them until the host acknowledges their sequence number, so lost
+packets cost nothing but a retry and two changes in one tick both count. The host sends a small state
+snapshot every SNAPSHOT_INTERVAL ticks. The client moves its own paddle
+immediately (prediction) and, on each snapshot, takes the host's state
+and replays its unacknowledged inputs on top (reconciliation).
+
+Client ticks count from the host tick in the welcome packet, so an input
+names the host tick it was meant for. The host runs the match through a
+pong_rollback.RollbackSession and rolls back to apply inputs that arrive
+late, so the client's paddle moves on the host exactly as predicted.
+
+    python Pong.py --host 5005
+    python Pong.py --join 192.168.1.20:5005
+
+Latency and packet loss can be simulated on any link, and a headless
+loopback run reports bandwidth and prediction error:
+
+    python pong_net.py --latency 0.06 --jitter 0.01 --loss 0.05
+"""
+import argparse
+import heapq
+import random
+import socket
+import struct
+import sys
+import time
+
+from pong_core import Court, Match, GAME_OVER, SCORE, HELD_KEY_RATE, TICK_SECONDS
+from pong_replay import DIRECTION_B
+from pong_rollback import RollbackSession
+
+DEFAULT_PORT = 5005
+# Host ticks between state snapshots (about 33 per second)
+SNAPSHOT_INTERVAL = 3
+# Client ticks between resends of unacknowledged inputs; they are only a
+# few bytes, and a lost change costs paddle position until it gets through
+INPUT_RESEND_INTERVAL = 1
+HELLO_INTERVAL = 0.5
+TIMEOUT_SECONDS = 5.0
+MAX_PACKET = 1024
+# Most unacknowledged inputs per packet; newer ones wait for the oldest
+# to be acknowledged rather than being dropped
+MAX_PENDING_INPUTS = 64
+
+# Packet types
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+STATE = 4
+BYE = 5
+
+# type, game width and height, ball speed x and y, paddle speed, time
+# limit, host tick
+WELCOME_PACKET = struct.Struct("<BHHddddI")
+# type, newest client tick, number of input changes
+INPUT_HEADER = struct.Struct("<BIB")
+# sequence number (from 1), tick, direction
+INPUT_CHANGE = struct.Struct("<IIb")
+# type, host tick, sequence number of the last input applied (0 for none),
+# ball x, y, dx, dy, paddle a and b y, time left, paddle a direction,
+# scores, running, winner
+STATE_PACKET = struct.Struct("<BII7fbHHBB")
+WINNERS = (None, "a", "b", "tie")
+
+
+class LinkConditioner:
+    """Sends datagrams after a simulated delay, dropping some of them.
+
+    With no latency, jitter or loss, packets are sent straight away.
+    Otherwise they wait in a queue until flush() finds them due.
+    """
+
+    def __init__(self, sock, latency=0.0, jitter=0.0, loss=0.0, rng=None, clock=time.monotonic):
+        self.sock = sock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.queue = []
+        self.sequence = 0
+        self.bytes_sent = 0
+        self.packets_dropped = 0
+
+    def sendto(self, data, address):
+        """Send a datagram, subject to simulated loss and delay."""
+        self.bytes_sent += len(data)
+        if self.loss and self.rng.random() < self.loss:
+            self.packets_dropped += 1
+            return
+        if not (self.latency or self.jitter):
+            self.send_now(data, address)
+            return
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        self.sequence += 1
+        heapq.heappush(self.queue, (self.clock() + delay, self.sequence, data, address))
+
+    def flush(self):
+        """Send every queued datagram whose delay has passed."""
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.queue)
+            self.send_now(data, address)
+
+    def send_now(self, data, address):
+        try:
+            self.sock.sendto(data, address)
+        except OSError as e:
+            print(f"Error sending to {address}: {e}")
+
+
+def open_socket(address):
+    """Return a non-blocking UDP socket bound to address."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(address)
+    sock.setblocking(False)
+    return sock
+
+
+def receive_all(sock):
+    """Yield (data, address) for every datagram waiting on a socket."""
+    while True:
+        try:
+            yield sock.recvfrom(MAX_PACKET)
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionResetError:
+            # ICMP port unreachable from a peer that went away (Windows)
+            continue
+
+
+class NetHost:
+    """Authoritative end of a network match; the remote player has paddle b.
+
+    The match can be attached after the host starts listening; a client
+    that says hello before then is welcomed once it is.
+    """
+
+    def __init__(self, match=None, port=DEFAULT_PORT, bind="0.0.0.0", recorder=None,
+                 latency=0.0, jitter=0.0, loss=0.0, rng=None, clock=time.monotonic):
+        self.clock = clock
+        self.sock = open_socket((bind, port))
+        self.link = LinkConditioner(self.sock, latency, jitter, loss, rng, clock)
+        self.client = None
+        self.last_received = clock()
+        self.bytes_received = 0
+        self.match = None
+        if match:
+            self.attach(match, recorder)
+
+    def attach(self, match, recorder=None):
+        """Start hosting a match, welcoming the client if one is waiting."""
+        self.match = match
+        self.session = RollbackSession(match, recorder=recorder)
+        self.ack_sequence = 0
+        if self.client:
+            self.send_welcome()
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    @property
+    def connected(self):
+        return self.client is not None
+
+    def poll(self):
+        """Handle every waiting packet from the client."""
+        for data, address in receive_all(self.sock):
+            self.bytes_received += len(data)
+            if not data:
+                continue
+            kind = data[0]
+            if kind == HELLO and self.client in (None, address):
+                self.client = address
+                self.last_received = self.clock()
+                if self.match:
+                    self.send_welcome()
+            elif address != self.client:
+                continue
+            elif kind == INPUT and self.match:
+                self.last_received = self.clock()
+                self.apply_inputs(data)
+            elif kind == BYE:
+                self.client = None
+        self.link.flush()
+
+    def send_welcome(self):
+        match = self.match
+        self.link.sendto(WELCOME_PACKET.pack(
+            WELCOME, match.court.game_width, match.court.game_height, match.ball_speed_x,
+            match.ball_speed_y, match.paddle_speed, match.time_limit_seconds, match.tick), self.client)
+
+    def apply_inputs(self, data):
+        """Apply the client's direction changes at their ticks, rolling back for late ones."""
+        _, _, count = INPUT_HEADER.unpack_from(data, 0)
+        pos = INPUT_HEADER.size
+        for _ in range(count):
+            sequence, tick, direction = INPUT_CHANGE.unpack_from(data, pos)
+            pos += INPUT_CHANGE.size
+            # Packets carry every unacknowledged input from the oldest, so
+            # anything but the next number has been applied already
+            if sequence != self.ack_sequence + 1:
+                continue
+            self.ack_sequence = sequence
+            self.session.add_input(tick, DIRECTION_B, direction)
+
+    def local_input(self, kind, value):
+        """Apply an input from the host's own player (a pong_replay input kind)."""
+        self.session.add_input(self.match.tick, kind, value)
+
+    def step(self):
+        """Read input, advance the match one tick and send a snapshot when due."""
+        match = self.match
+        score = match.score_a + match.score_b
+        was_running = match.running
+        self.poll()
+        events = self.session.step()
+        # A rollback can change the score or end the match without its events
+        if SCORE not in events and match.score_a + match.score_b != score:
+            events.append(SCORE)
+        if was_running and not match.running and GAME_OVER not in events:
+            events.append(GAME_OVER)
+        if self.client and (match.tick % SNAPSHOT_INTERVAL == 0 or GAME_OVER in events):
+            self.send_state()
+        self.link.flush()
+        return events
+
+    def send_state(self):
+        match = self.match
+        self.link.sendto(STATE_PACKET.pack(
+            STATE, match.tick, self.ack_sequence,
+            match.ball_x, match.ball_y, match.ball_dx, match.ball_dy,
+            match.paddle_a_y, match.paddle_b_y, match.time_left, match.paddle_a_dir,
+            match.score_a, match.score_b, int(match.running), WINNERS.index(match.winner)),
+            self.client)
+
+    def close(self):
+        if self.client:
+            self.link.send_now(bytes([BYE]), self.client)
+        self.sock.close()
+
+
+class NetClient:
+    """Remote end of a network match: predicts its own paddle (b) locally."""
+
+    def __init__(self, host_address, latency=0.0, jitter=0.0, loss=0.0, rng=None,
+                 clock=time.monotonic):
+        self.host_address = host_address
+        self.clock = clock
+        self.sock = open_socket(("0.0.0.0", 0))
+        self.link = LinkConditioner(self.sock, latency, jitter, loss, rng, clock)
+        self.court = None
+        self.match = None
+        self.tick = 0
+        self.direction = 0
+        self.sequence = 0
+        # Direction changes not yet acknowledged, as (sequence, client tick, direction)
+        self.pending = []
+        self.acked_direction = 0
+        self.host_tick = -1
+        self.last_received = clock()
+        self.last_hello = None
+        self.bytes_received = 0
+        # Paddle distance moved by reconciliation, for measuring prediction
+        self.corrections = 0
+        self.correction_total = 0.0
+        self.correction_max = 0.0
+
+    def connect(self, timeout=TIMEOUT_SECONDS, sleep=time.sleep):
+        """Say hello until the host answers; return True once connected."""
+        deadline = self.clock() + timeout
+        while self.match is None and self.clock() < deadline:
+            self.poll()
+            sleep(0.01)
+        return self.match is not None
+
+    def poll(self):
+        """Handle every waiting packet from the host."""
+        if self.match is None and (self.last_hello is None or self.clock() - self.last_hello >= HELLO_INTERVAL):
+            self.last_hello = self.clock()
+            self.link.sendto(bytes([HELLO]), self.host_address)
+        self.link.flush()
+
+        latest = None
+        for data, address in receive_all(self.sock):
+            self.bytes_received += len(data)
+            if address != self.host_address or not data:
+                continue
+            self.last_received = self.clock()
+            kind = data[0]
+            if kind == WELCOME and self.match is None:
+                self.start(data)
+            elif kind == STATE and self.match is not None:
+                state = STATE_PACKET.unpack(data)
+                # Only the newest snapshot matters; late ones are dropped
+                if state[1] > self.host_tick and (latest is None or state[1] > latest[1]):
+                    latest = state
+            elif kind == BYE and self.match is not None:
+                self.match.running = False
+        if latest:
+            self.reconcile(latest)
+
+    def start(self, data):
+        (_, width, height, ball_speed_x, ball_speed_y, paddle_speed, time_limit,
+         host_tick) = WELCOME_PACKET.unpack(data)
+        self.court = Court(width, height)
+        self.match = Match(self.court, ball_speed_x=ball_speed_x, ball_speed_y=ball_speed_y,
+                           paddle_speed=paddle_speed, time_limit_seconds=time_limit)
+        # Count ticks on the host's clock so inputs name the host tick they are for
+        self.tick = host_tick
+
+    def set_direction(self, direction):
+        """Change the held direction of our paddle, applied from the next tick."""
+        if direction == self.direction:
+            return
+        self.direction = direction
+        self.sequence += 1
+        self.pending.append((self.sequence, self.tick, direction))
+        if self.match:
+            self.match.set_paddle_direction("b", direction)
+            self.send_inputs()
+
+    def send_inputs(self):
+        """Send the oldest unacknowledged inputs; the rest follow as they are acknowledged."""
+        inputs = self.pending[:MAX_PENDING_INPUTS]
+        data = bytearray(INPUT_HEADER.pack(INPUT, self.tick, len(inputs)))
+        for sequence, tick, direction in inputs:
+            data += INPUT_CHANGE.pack(sequence, tick, direction)
+        self.link.sendto(bytes(data), self.host_address)
+
+    def reconcile(self, state):
+        """Adopt a host snapshot, then replay our unacknowledged inputs on top."""
+        (_, host_tick, ack_sequence, ball_x, ball_y, ball_dx, ball_dy, paddle_a_y,
+         paddle_b_y, time_left, paddle_a_dir, score_a, score_b, running, winner) = state
+        match = self.match
+        self.host_tick = host_tick
+
+        while self.pending and self.pending[0][0] <= ack_sequence:
+            self.acked_direction = self.pending.pop(0)[2]
+
+        match.ball_x, match.ball_y, match.ball_dx, match.ball_dy = ball_x, ball_y, ball_dx, ball_dy
+        match.paddle_a_y = paddle_a_y
+        match.paddle_a_dir = paddle_a_dir
+        match.time_left = time_left
+        match.score_a, match.score_b = score_a, score_b
+        if not running:
+            match.running = False
+            match.winner = WINNERS[winner]
+
+        # An input older than the snapshot that the host hasn't seen yet
+        # will be rolled back in, so the snapshot's paddle is about to change
+        if self.pending and self.pending[0][1] < host_tick:
+            return
+
+        # Step our paddle from the snapshot to now with the inputs the host
+        # hasn't seen yet
+        predicted = match.paddle_b_y
+        match.paddle_b_y = paddle_b_y
+        distance = match.paddle_speed * HELD_KEY_RATE * TICK_SECONDS
+        direction = self.acked_direction
+        pending = 0
+        for tick in range(host_tick, self.tick):
+            while pending < len(self.pending) and self.pending[pending][1] <= tick:
+                direction = self.pending[pending][2]
+                pending += 1
+            if direction:
+                match.move_paddle("b", direction * distance)
+
+        correction = abs(match.paddle_b_y - predicted)
+        self.corrections += 1
+        self.correction_total += correction
+        self.correction_max = max(self.correction_max, correction)
+
+    def step(self):
+        """Read snapshots, predict one tick and return this tick's events."""
+        match = self.match
+        score = match.score_a + match.score_b
+        was_running = match.running
+        self.poll()
+
+        if self.clock() - self.last_received > TIMEOUT_SECONDS:
+            print(f"Lost connection to {self.host_address[0]}:{self.host_address[1]}")
+            match.running = False
+
+        events = []
+        if match.running:
+            # Scores and the end of the match come from the host; the local
+            # step only predicts motion
+            events = [event for event in match.step() if event not in (SCORE, GAME_OVER)]
+            match.running = True
+            self.tick += 1
+            if self.pending and self.tick % INPUT_RESEND_INTERVAL == 0:
+                self.send_inputs()
+        if match.score_a + match.score_b != score:
+            events.append(SCORE)
+        if was_running and not match.running:
+            events.append(GAME_OVER)
+        self.link.flush()
+        return events
+
+    def close(self):
+        self.link.send_now(bytes([BYE]), self.host_address)
+        self.sock.close()
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """Turn "host[:port]" into a (host, port) tuple."""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return socket.gethostbyname(host or "127.0.0.1"), int(port or default_port)
+
+
+def loopback(seconds=30.0, latency=0.05, jitter=0.01, loss=0.05, seed=0):
+    """Play a scripted match between a host and client over 127.0.0.1.
+
+    Time is simulated, so the run takes as long as the CPU needs rather
+    than seconds of wall time. Both links get the same latency and loss.
+    Returns a dict of bandwidth and prediction statistics.
+    """
+    now = [0.0]
+    clock = lambda: now[0]
+    rng = random.Random(seed)
+
+    match = Match(seed=seed, time_limit_seconds=seconds + 10)
+    host = NetHost(match, port=0, bind="127.0.0.1", latency=latency, jitter=jitter, loss=loss,
+                   rng=random.Random(seed + 1), clock=clock)
+    client = NetClient(("127.0.0.1", host.address[1]), latency=latency, jitter=jitter, loss=loss,
+                       rng=random.Random(seed + 2), clock=clock)
+
+    def advance():
+        now[0] += TICK_SECONDS
+        # Give loopback datagrams a moment to land before the next poll
+        time.sleep(0)
+
+    connected = client.connect(timeout=5.0, sleep=lambda _: (host.poll(), advance()))
+    if not connected:
+        host.close()
+        client.close()
+        raise RuntimeError("client could not connect over loopback")
+
+    ticks = int(seconds / TICK_SECONDS)
+    ball_error = 0.0
+    next_change = 0
+    for tick in range(ticks):
+        if tick >= next_change:
+            client.set_direction(rng.choice((-1, 0, 1)))
+            next_change = tick + rng.randint(20, 100)
+        host.step()
+        client.step()
+        ball_error += abs(client.match.ball_y - match.ball_y) + abs(client.match.ball_x - match.ball_x)
+        advance()
+
+    stats = {
+        "seconds": seconds,
+        "latency_ms": latency * 1000,
+        "loss": loss,
+        "host_kbps": host.link.bytes_sent / seconds / 1024,
+        "client_kbps": client.link.bytes_sent / seconds / 1024,
+        "snapshots_applied": client.corrections,
+        "paddle_correction_mean": client.correction_total / max(1, client.corrections),
+        "paddle_correction_max": client.correction_max,
+        "paddle_error_final": abs(client.match.paddle_b_y - match.paddle_b_y),
+        "ball_error_mean": ball_error / ticks,
+        "score_host": (match.score_a, match.score_b),
+        "score_client": (client.match.score_a, client.match.score_b),
+    }
+    host.close()
+    client.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a headless network match over loopback.")
+    parser.add_argument("--seconds", type=float, default=30.0, help="game time to simulate")
+    parser.add_argument("--latency", type=float, default=0.05, help="one-way delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="random +/- delay in seconds")
+    parser.add_argument("--loss", type=float, default=0.05, help="fraction of packets dropped")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stats = loopback(args.seconds, args.latency, args.jitter, args.loss, args.seed)
+    print(f"{stats['seconds']:.0f}s at {stats['latency_ms']:.0f} ms one-way, {stats['loss']:.0%} loss")
+    print(f"  host sends {stats['host_kbps']:.2f} KB/s, client sends {stats['client_kbps']:.2f} KB/s")
+    print(f"  {stats['snapshots_applied']} snapshots, paddle correction mean "
+          f"{stats['paddle_correction_mean']:.2f} px, max {stats['paddle_correction_max']:.2f} px")
+    print(f"  ball error mean {stats['ball_error_mean']:.2f} px, "
+          f"score host {stats['score_host']} client {stats['score_client']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
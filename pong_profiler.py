@@ -0,0 +1,171 @@
+"""Per-phase frame timing for the game loop.
+
+FrameProfiler keeps the last few thousand frames in fixed-size ring
+buffers, one per phase, and can summarise them as percentiles or
+export them as JSON or a Chrome trace (chrome://tracing, Perfetto).
+"""
+import json
+import time
+from array import array
+
+from pong_core import Match, MultiBallMatch
+
+# Phases in the order they run within a frame
+PHASES = ("physics", "ai", "collision", "sync", "audio", "hud", "update")
+# ai and collision run inside physics; physics is stored without them
+NESTED_PHASES = ("ai", "collision")
+
+
+class FrameProfiler:
+    """Ring buffer of per-phase frame timings, in seconds."""
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.starts = array("d", [0.0]) * capacity
+        self.samples = {phase: array("d", [0.0]) * capacity for phase in PHASES + ("frame",)}
+        self.count = 0
+        self.slot = 0
+        self.frame_start = None
+        self.epoch = time.perf_counter()
+
+    def begin_frame(self):
+        """Start timing a new frame, overwriting the oldest sample."""
+        self.slot = self.count % self.capacity
+        for samples in self.samples.values():
+            samples[self.slot] = 0.0
+        self.frame_start = time.perf_counter()
+        self.starts[self.slot] = self.frame_start - self.epoch
+
+    def add(self, phase, seconds):
+        """Add time spent in a phase to the current frame."""
+        if self.frame_start is not None:
+            self.samples[phase][self.slot] += seconds
+
+    def end_frame(self):
+        """Close the current frame."""
+        if self.frame_start is None:
+            return
+        slot = self.slot
+        samples = self.samples
+        samples["frame"][slot] = time.perf_counter() - self.frame_start
+        for phase in NESTED_PHASES:
+            samples["physics"][slot] -= samples[phase][slot]
+        self.frame_start = None
+        self.count += 1
+
+    def frames(self):
+        """Return slot indices of recorded frames, oldest first."""
+        recorded = min(self.count, self.capacity)
+        first = self.count - recorded
+        return [(first + i) % self.capacity for i in range(recorded)]
+
+    def percentiles(self, phase="frame"):
+        """Return p50/p95/p99 of a phase in milliseconds."""
+        values = sorted(self.samples[phase][slot] for slot in self.frames())
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        last = len(values) - 1
+        return {name: values[min(last, int(q * len(values)))] * 1000
+                for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))}
+
+    def summary(self):
+        """Return percentiles for every phase and the whole frame."""
+        return {phase: self.percentiles(phase) for phase in PHASES + ("frame",)}
+
+    def overlay_text(self):
+        """Short frame-time line for the on-screen overlay."""
+        frame = self.percentiles("frame")
+        return f"frame p50 {frame['p50']:.1f}  p95 {frame['p95']:.1f}  p99 {frame['p99']:.1f} ms"
+
+    def export_json(self, path):
+        """Write the summary and raw samples (milliseconds, oldest first)."""
+        slots = self.frames()
+        data = {
+            "frames": len(slots),
+            "summary": self.summary(),
+            "samples": {phase: [samples[slot] * 1000 for slot in slots]
+                        for phase, samples in self.samples.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
+
+    def export_chrome_trace(self, path):
+        """Write the frames in Chrome trace event format.
+
+        Phases are laid out back to back from the frame start in the order
+        they run. ai and collision are totals for the frame, drawn at the
+        start of physics.
+        """
+        events = []
+        for slot in self.frames():
+            ts = self.starts[slot] * 1e6
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": ts, "dur": self.samples["frame"][slot] * 1e6})
+            nested_ts = ts
+            for phase in PHASES:
+                dur = self.samples[phase][slot] * 1e6
+                if phase in NESTED_PHASES:
+                    events.append({"name": phase, "ph": "X", "pid": 1, "tid": 1,
+                                   "ts": nested_ts, "dur": dur})
+                    nested_ts += dur
+                    continue
+                if phase == "physics":
+                    # Physics time was stored without its nested phases
+                    dur += sum(self.samples[p][slot] for p in NESTED_PHASES) * 1e6
+                events.append({"name": phase, "ph": "X", "pid": 1, "tid": 1, "ts": ts, "dur": dur})
+                ts += dur
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class Profiled:
+    """Mixin for Match classes that reports AI and collision time to a FrameProfiler.
+
+    Swept matches resolve paddle and wall bounces inside sweep_ball, and
+    multi-ball matches inside move_balls and bounce_paddles, so those
+    count as collision time along with check_paddle_collision.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args, profiler=None, **kwargs):
+        self.profiler = profiler or FrameProfiler()
+        super().__init__(*args, **kwargs)
+
+    def ai_move_paddle(self, side="b"):
+        start = time.perf_counter()
+        super().ai_move_paddle(side)
+        self.profiler.add("ai", time.perf_counter() - start)
+
+    def check_paddle_collision(self, paddle_y, x_boundary):
+        start = time.perf_counter()
+        hit = super().check_paddle_collision(paddle_y, x_boundary)
+        self.profiler.add("collision", time.perf_counter() - start)
+        return hit
+
+    def sweep_ball(self, events):
+        start = time.perf_counter()
+        super().sweep_ball(events)
+        self.profiler.add("collision", time.perf_counter() - start)
+
+    def move_balls(self, events):
+        start = time.perf_counter()
+        super().move_balls(events)
+        self.profiler.add("collision", time.perf_counter() - start)
+
+    def bounce_paddles(self, events):
+        start = time.perf_counter()
+        super().bounce_paddles(events)
+        self.profiler.add("collision", time.perf_counter() - start)
+
+
+class ProfiledMatch(Profiled, Match):
+    """Match that reports AI and collision time to a FrameProfiler."""
+
+    __slots__ = ("profiler",)
+
+
+class ProfiledMultiBallMatch(Profiled, MultiBallMatch):
+    """MultiBallMatch that reports AI and collision time to a FrameProfiler."""
+
+    __slots__ = ("profiler",)
@@ -0,0 +1,400 @@
+"""pygame front end: the same matches, drawn with blits and dirty rectangles.
+
+    python Pong.py --renderer pygame [--fps 240] [--vsync]
+    python pong_pygame.py --balls 100 --fps 0
+
+Tk's canvas redraw caps the turtle front end well below a monitor's
+refresh rate. Here the court background is drawn once; each frame only
+the rectangles the ball, paddles and changed HUD text covered last frame
+or cover now are restored and redrawn, and only those are sent to the
+display. Physics still runs at the fixed TICK_SECONDS rate; frames
+between two ticks interpolate the ball and paddles so motion stays
+smooth at any frame rate.
+
+PygameGame only adds the window, menus and input; matches, the frame
+loop, profiling, recordings and the match history come from
+pong_frontend.FrontEnd, as for the turtle front end. Network play is only
+in the turtle front end, which has the screen that waits for a client.
+"""
+import argparse
+import sys
+
+import pygame
+
+from pong_core import BALL_RADIUS, DIFFICULTY_PRESETS, SCORE, Court, MultiBallMatch
+from pong_frontend import FrontEnd, game_size
+from pong_render import (MatchRenderer, SkinCache, SKIN_FILES, SKIN_SIZE, SOUND_FILES, FALLBACK_BALL_COLOR,
+                         PADDLE_DRAW_WIDTH, PADDLE_DRAW_HEIGHT, BALL_DRAW_SIZE, TIMER_FONT_SIZE,
+                         OVERLAY_FONT_SIZE, score_font_size, score_text, timer_text)
+
+DEFAULT_FPS = 240
+MENU_FPS = 30
+# pygame keys for the paddle keys, which front ends share by their Tk names
+KEY_NAMES = {pygame.K_w: "w", pygame.K_s: "s", pygame.K_UP: "Up", pygame.K_DOWN: "Down"}
+BACKGROUND = "white"
+FOREGROUND = "black"
+HIGHLIGHT = "darkorange"
+FONT_NAME = "couriernew,courier,monospace"
+
+
+class PygameRenderer(MatchRenderer):
+    """Draws a match onto a pygame display surface, updating only what changed."""
+
+    def __init__(self, surface, court, ball_skins=None):
+        self.surface = surface
+        self.court = court
+        self.center_x = surface.get_width() / 2
+        self.center_y = surface.get_height() / 2
+        self.background = pygame.Surface(surface.get_size()).convert()
+        self.background.fill(BACKGROUND)
+        self.ball_skins = dict(ball_skins or SKIN_FILES)
+        self.skin_images = {}
+        self.fonts = {}
+        # slot -> (text, image, rect) for each line of HUD text
+        self.hud = {}
+        # Rectangles the ball and paddles covered in the last frame
+        self.sprite_rects = []
+        # Rectangles changed since the last present()
+        self.dirty = []
+        self.names = None
+        # Sprites are drawn once and blitted every frame
+        self.paddle_image = pygame.Surface((PADDLE_DRAW_WIDTH, PADDLE_DRAW_HEIGHT)).convert()
+        self.paddle_image.fill(FOREGROUND)
+        self.ball_image = None
+        self.show_timer = False
+
+    def font(self, size, bold=False):
+        """Return a cached font; SysFont searches the system fonts every call."""
+        key = (size, bold)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.SysFont(FONT_NAME, size, bold=bold)
+        return self.fonts[key]
+
+    def skin_image(self, skin):
+        """Return the scaled image for an image skin, or None for a color skin."""
+        source = self.ball_skins.get(skin)
+        if not (isinstance(source, str) and source.endswith(".gif")):
+            return None
+        if skin not in self.skin_images:
+            try:
+                # The cached copy is already SKIN_SIZE; some sources are 5000 pixels square
+                self.skin_images[skin] = pygame.image.load(SkinCache().get(source, SKIN_SIZE)).convert_alpha()
+            except (pygame.error, OSError) as e:
+                print(f"Error loading skin {source}: {e}")
+                self.ball_skins[skin] = FALLBACK_BALL_COLOR
+                self.skin_images[skin] = None
+        return self.skin_images[skin]
+
+    def to_screen(self, x, y):
+        """Convert court coordinates to surface pixels."""
+        return int(self.center_x + x), int(self.center_y - y)
+
+    def dot_image(self, color, size):
+        """A filled circle on a transparent (color keyed) square."""
+        image = pygame.Surface((size, size)).convert()
+        image.fill(BACKGROUND)
+        image.set_colorkey(BACKGROUND)
+        pygame.draw.circle(image, color, (size // 2, size // 2), size // 2)
+        return image
+
+    def start(self, match, names, skin, show_timer):
+        self.names = names
+        self.show_timer = show_timer
+        color = self.ball_skins.get(skin, FALLBACK_BALL_COLOR)
+        color = color if color.startswith("#") else FALLBACK_BALL_COLOR
+        if isinstance(match, MultiBallMatch):
+            self.ball_image = self.dot_image(color, BALL_RADIUS * 2)
+        else:
+            self.ball_image = self.skin_image(skin) or self.dot_image(color, BALL_DRAW_SIZE)
+        self.clear()
+        self.update_hud(match)
+
+    def set_text(self, slot, text, size, position, bold=False, color=FOREGROUND):
+        """Show text centered above position in a HUD slot, if it changed."""
+        entry = self.hud.get(slot)
+        if entry and entry[0] == text:
+            return
+        if entry:
+            self.erase(entry[2])
+            del self.hud[slot]
+        if text is None:
+            return
+        # Opaque on the background, so restoring text over itself is exact
+        image = self.font(size, bold).render(text, True, color, BACKGROUND).convert()
+        rect = image.get_rect(midbottom=self.to_screen(*position))
+        self.hud[slot] = (text, image, rect)
+        self.dirty.append(rect)
+
+    def update_hud(self, match):
+        court = self.court
+        scoreboard_y = court.boundary_y - score_font_size(court) * 0.1
+        # Turtle writes text upward from its position, so the score sits on
+        # the top edge of the court
+        self.set_text("score", score_text(match, self.names), score_font_size(court), (0, scoreboard_y))
+        if self.show_timer:
+            self.set_text("timer", timer_text(match), TIMER_FONT_SIZE, (0, court.boundary_y - 30), bold=True)
+
+    def erase(self, rect):
+        self.surface.blit(self.background, rect, rect)
+        self.dirty.append(rect)
+
+    def draw(self, match, events, previous=None, alpha=1.0):
+        surface = self.surface
+        background = self.background
+        surface.blits([(background, rect, rect) for rect in self.sprite_rects], doreturn=False)
+        self.dirty.extend(self.sprite_rects)
+        self.update_hud(match)
+        # Restore any HUD text the erased sprites were covering
+        dirty = self.dirty
+        for _, image, rect in self.hud.values():
+            if rect.collidelist(dirty) != -1:
+                surface.blit(image, rect)
+
+        paddle_a_y, paddle_b_y = match.paddle_a_y, match.paddle_b_y
+        ball_x, ball_y = match.ball_x, match.ball_y
+        if previous and SCORE not in events:
+            # A point teleports the ball to the center, so that tick is not blended
+            ball_x = previous[0] + (ball_x - previous[0]) * alpha
+            ball_y = previous[1] + (ball_y - previous[1]) * alpha
+            paddle_a_y = previous[2] + (paddle_a_y - previous[2]) * alpha
+            paddle_b_y = previous[3] + (paddle_b_y - previous[3]) * alpha
+
+        # Blits of the ready-made sprites, as (image, top left corner)
+        paddle_x = self.court.paddle_x_position
+        paddle_left = PADDLE_DRAW_WIDTH // 2
+        paddle_top = PADDLE_DRAW_HEIGHT // 2
+        sprites = [(self.paddle_image, (int(self.center_x - paddle_x) - paddle_left,
+                                        int(self.center_y - paddle_a_y) - paddle_top)),
+                   (self.paddle_image, (int(self.center_x + paddle_x) - paddle_left,
+                                        int(self.center_y - paddle_b_y) - paddle_top))]
+        image = self.ball_image
+        left = self.center_x - image.get_width() // 2
+        top = self.center_y - image.get_height() // 2
+        if isinstance(match, MultiBallMatch):
+            sprites.extend((image, (int(left + x), int(top - y))) for x, y in zip(match.ball_xs, match.ball_ys))
+        else:
+            sprites.append((image, (int(left + ball_x), int(top - ball_y))))
+        rects = surface.blits(sprites)
+        self.sprite_rects = rects
+        dirty.extend(rects)
+
+    def show_overlay(self, text):
+        self.set_text("overlay", text, OVERLAY_FONT_SIZE, (0, -self.court.boundary_y + 10), color="gray40")
+
+    def present(self):
+        pygame.display.update(self.dirty)
+        self.dirty = []
+
+    def clear(self):
+        self.surface.blit(self.background, (0, 0))
+        self.hud.clear()
+        self.sprite_rects = []
+        self.dirty = [self.surface.get_rect()]
+
+
+class PygameGame(FrontEnd):
+    """Window, menus and input of the pygame front end."""
+
+    def __init__(self, width=None, height=None, fps=DEFAULT_FPS, vsync=False, ball_count=1):
+        super().__init__()
+        pygame.init()
+        info = pygame.display.Info()
+        default_width, default_height = game_size(info.current_w, info.current_h)
+        self.set_court(Court(width or default_width, height or default_height))
+        pygame.display.set_caption("Pong Game")
+        size = (self.game_width, self.game_height)
+        if vsync:
+            try:
+                # SDL only honors vsync on a renderer-backed (SCALED) window
+                self.surface = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+            except pygame.error as e:
+                print(f"Error enabling vsync: {e}")
+                vsync = False
+        if not vsync:
+            self.surface = pygame.display.set_mode(size)
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+        self.renderer = PygameRenderer(self.surface, self.court)
+        self.one_player = True
+        self.ball_count = ball_count
+        self.sounds = self.load_sounds()
+
+        # Paddle side for each key name in the current match
+        self.key_sides = {}
+        # (title, buttons, subtitle) of the menu on screen
+        self.menu = None
+        # (label, action) for the buttons of the current menu and where they were drawn
+        self.buttons = []
+        self.button_rects = []
+        self.selected = 0
+        self.running = True
+
+    def load_sounds(self):
+        if not pygame.mixer.get_init():
+            print("Audio disabled, the mixer could not be started")
+            return {}
+        sounds = {}
+        for name, path in SOUND_FILES.items():
+            try:
+                sounds[name] = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Error loading sound {path}: {e}")
+        return sounds
+
+    def play_sound(self, sound_name):
+        sound = self.sounds.get(sound_name)
+        if self.audio_enabled and sound:
+            sound.play()
+
+    def show_menu(self, title, buttons, subtitle=None):
+        """Draw a menu of (label, action) buttons; it is redrawn only on input."""
+        self.menu = (title, buttons, subtitle)
+        self.buttons = buttons
+        self.selected = min(self.selected, len(buttons) - 1)
+        surface = self.surface
+        surface.fill(BACKGROUND)
+        center_x = self.game_width // 2
+        title_image = self.renderer.font(int(36 * self.scale_factor), bold=True).render(title, True, "darkblue")
+        surface.blit(title_image, title_image.get_rect(center=(center_x, int(self.game_height * 0.2))))
+        if subtitle:
+            image = self.renderer.font(int(14 * self.scale_factor)).render(subtitle, True, "gray40")
+            surface.blit(image, image.get_rect(center=(center_x, int(self.game_height * 0.28))))
+
+        font = self.renderer.font(int(18 * self.scale_factor))
+        self.button_rects = []
+        y = int(self.game_height * 0.38)
+        for i, (label, _) in enumerate(buttons):
+            rect = pygame.Rect(0, 0, int(self.game_width * 0.4), int(self.game_height * 0.07))
+            rect.center = (center_x, y)
+            color = HIGHLIGHT if i == self.selected else FOREGROUND
+            pygame.draw.rect(surface, color, rect, width=3)
+            image = font.render(label, True, color)
+            surface.blit(image, image.get_rect(center=rect.center))
+            self.button_rects.append(rect)
+            y += int(self.game_height * 0.1)
+        pygame.display.flip()
+
+    def main_menu(self):
+        self.selected = 0
+        self.show_main_menu()
+
+    def show_main_menu(self):
+        self.show_menu("PONG GAME", [
+            ("Solo Player", lambda: self.start_game(one_player=True)),
+            ("Two Player", lambda: self.start_game(one_player=False)),
+            (f"Difficulty: {self.difficulty_level}", self.next_difficulty),
+            (f"Skin: {self.selected_skin}", self.next_skin),
+            ("Exit Game", self.quit),
+        ])
+
+    def next_difficulty(self):
+        levels = list(DIFFICULTY_PRESETS)
+        self.difficulty_level = levels[(levels.index(self.difficulty_level) + 1) % len(levels)]
+        self.show_main_menu()
+
+    def next_skin(self):
+        skins = list(SKIN_FILES)
+        self.selected_skin = skins[(skins.index(self.selected_skin) + 1) % len(skins)]
+        self.show_main_menu()
+
+    def activate(self, index):
+        self.play_sound("click")
+        self.selected = index
+        self.buttons[index][1]()
+
+    def start_game(self, one_player=None):
+        """Start a match with the current settings."""
+        if one_player is not None:
+            self.one_player = one_player
+        self.buttons = []
+        self.start_match()
+        self.key_sides = self.paddle_keys()
+
+    def show_end_screen(self, title):
+        head_to_head = self.record_match()
+        self.clear_game_objects()
+        self.selected = 0
+        self.show_menu(title, [
+            ("Rematch", self.start_game),
+            ("Back to Menu", self.main_menu),
+        ], subtitle=head_to_head)
+
+    def return_to_menu(self):
+        self.play_sound("click")
+        self.game_running = False
+        self.clear_game_objects()
+        self.main_menu()
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.quit()
+        elif self.game_running:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.return_to_menu()
+                elif event.key == pygame.K_p:
+                    self.paused = not self.paused
+                    self.reset_frame_clock()
+                elif event.key == pygame.K_m:
+                    self.audio_enabled = not self.audio_enabled
+                elif event.key == pygame.K_F3:
+                    self.toggle_profiler_overlay()
+                elif KEY_NAMES.get(event.key) in self.key_sides:
+                    key = KEY_NAMES[event.key]
+                    self.set_key_held(key, self.key_sides[key], True)
+            elif event.type == pygame.KEYUP and KEY_NAMES.get(event.key) in self.key_sides:
+                key = KEY_NAMES[event.key]
+                self.set_key_held(key, self.key_sides[key], False)
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_UP, pygame.K_DOWN):
+                step = 1 if event.key == pygame.K_DOWN else -1
+                self.selected = (self.selected + step) % len(self.buttons)
+                self.show_menu(*self.menu)
+            elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                self.activate(self.selected)
+            elif event.key == pygame.K_ESCAPE:
+                self.quit()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            index = pygame.Rect(event.pos, (1, 1)).collidelist(self.button_rects)
+            if index != -1:
+                self.activate(index)
+
+    def quit(self):
+        self.running = False
+
+    def run(self):
+        """Run menus and matches until the window is closed."""
+        self.show_main_menu()
+        while self.running:
+            for event in pygame.event.get():
+                self.handle_event(event)
+                if not self.running:
+                    break
+            if self.game_running and not self.paused and self.running:
+                if self.advance_frame() is not None:
+                    self.present_frame()
+                self.clock.tick(self.fps)
+            else:
+                if self.game_running:
+                    # Show overlay changes made while paused
+                    self.renderer.present()
+                self.clock.tick(MENU_FPS)
+        self.close_history()
+        pygame.quit()
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Pong with the pygame renderer.")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS, help="frame rate cap, 0 for none")
+    parser.add_argument("--vsync", action="store_true", help="wait for the display's vertical sync")
+    parser.add_argument("--balls", type=int, default=1, help="balls in play")
+    parser.add_argument("--size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), help="window size")
+    args = parser.parse_args(argv)
+    width, height = args.size or (None, None)
+    return PygameGame(width, height, fps=args.fps, vsync=args.vsync, ball_count=args.balls).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""The interface between a Pong front end and whatever draws the match.
+
+PongGame draws with turtle through TurtleRenderer, pong_pygame onto a
+pygame surface through PygameRenderer and pong_video into NumPy arrays
+through FrameRenderer. All of them take court coordinates (origin at the
+center, y up) straight from a pong_core Match and share the layout,
+asset tables and skin cache below, so a match looks the same on every
+backend.
+"""
+import abc
+import hashlib
+import os
+import tempfile
+
+# Ball skins: a color, or a GIF that is resized to SKIN_SIZE
+SKIN_FILES = {
+    "default": "#FF0000",
+    "Basketball": "skins/skin ball.gif",
+    "Pingpong Ball": "skins/pingpong.gif",
+    "Tennis Ball": "skins/tennis.gif",
+}
+SKIN_SIZE = (80, 60)
+FALLBACK_BALL_COLOR = "#FF0000"
+
+SOUND_FILES = {
+    "paddle_hit": "sounds/boing-101318.wav",
+    "wall_hit": "sounds/wall-hit-3-48114.wav",
+    "score": "sounds/score.wav",
+    "click": "sounds/click.wav",
+}
+
+# Drawn paddle size; the turtle square stretched 5 x 1
+PADDLE_DRAW_WIDTH = 20
+PADDLE_DRAW_HEIGHT = 100
+# Diameter of a color skin ball, the turtle "circle" shape
+BALL_DRAW_SIZE = 20
+TIMER_FONT_SIZE = 18
+OVERLAY_FONT_SIZE = 12
+
+
+class SkinCache:
+    """Resized skin images stored under a hash of their source content.
+
+    Entries live in the user's cache directory, never next to the game,
+    and are named <stem>-<sha256>-<width>x<height>-<mode>.gif so a
+    changed source, size or mode gets a new entry.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or self.default_cache_dir()
+        self.hashes = {}
+
+    @staticmethod
+    def default_cache_dir():
+        """Return a writable cache directory for resized skins."""
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "pong", "skins")
+        try:
+            os.makedirs(path, exist_ok=True)
+            return path
+        except OSError:
+            path = os.path.join(tempfile.gettempdir(), "pong-skins")
+            os.makedirs(path, exist_ok=True)
+            return path
+
+    def source_hash(self, source):
+        """Hash a source image, reusing the result while the file is unchanged."""
+        stat = os.stat(source)
+        key = (source, stat.st_mtime_ns, stat.st_size)
+        if key not in self.hashes:
+            with open(source, "rb") as f:
+                self.hashes[key] = hashlib.sha256(f.read()).hexdigest()[:16]
+        return self.hashes[key]
+
+    def entry_name(self, stem, digest, size, mode):
+        """Return the cache file name for one version of a skin."""
+        return f"{stem}-{digest}-{size[0]}x{size[1]}-{mode}.gif"
+
+    def get(self, source, size=SKIN_SIZE, mode="resize"):
+        """Return the path of a resized copy of source, creating it if needed."""
+        stem = os.path.splitext(os.path.basename(source))[0].replace(" ", "_")
+        digest = self.source_hash(source)
+        path = os.path.join(self.cache_dir, self.entry_name(stem, digest, size, mode))
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            return path
+
+        from PIL import Image  # Only needed when a cache entry is missing
+        img = Image.open(source)
+        img = img.resize(size)
+        # Write to a temp name first so a crash never leaves a half-written entry
+        tmp_path = path + ".tmp"
+        img.save(tmp_path, format="GIF")
+        os.replace(tmp_path, path)
+        self.evict_stale(stem, digest, size, mode)
+        return path
+
+    def evict_stale(self, stem, digest, size, mode):
+        """Remove entries made from older contents of the same source."""
+        current = self.entry_name(stem, digest, size, mode)
+        prefix = f"{stem}-"
+        suffix = current[len(prefix) + len(digest):]
+        for name in os.listdir(self.cache_dir):
+            old_digest = name[len(prefix):-len(suffix)]
+            if (name != current and name.startswith(prefix) and name.endswith(suffix)
+                    and len(old_digest) == len(digest)):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+def score_font_size(court):
+    return max(18, min(24, int(court.game_height / 30)))
+
+
+def score_text(match, names):
+    return f"{names[0]}: {match.score_a}  {names[1]}: {match.score_b}"
+
+
+def timer_text(match):
+    seconds = int(match.time_left)
+    return f"Time Left: {seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class MatchRenderer(abc.ABC):
+    """Draws one match at a time for a front end.
+
+    start() creates whatever the backend needs for a match, draw() brings
+    it up to date with the match once per frame and present() puts the
+    frame on screen. previous and alpha let a backend that draws faster
+    than the physics runs place the ball and paddles between the last two
+    ticks; previous is (ball x, ball y, paddle a y, paddle b y) one tick
+    before the match's current state and alpha how far to go from there.
+    """
+
+    @abc.abstractmethod
+    def start(self, match, names, skin, show_timer):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def draw(self, match, events, previous=None, alpha=1.0):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def show_overlay(self, text):
+        """Show a line of debug text at the bottom of the court, or hide it for None."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def present(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        """Remove everything start() created."""
+        raise NotImplementedError
@@ -0,0 +1,247 @@
+"""Compact binary match recordings and bit-exact replay.
+
+A recording holds everything needed to re-run a match: the RNG seed,
+the court and rules, then every input (paddle direction changes, direct
+moves, skipped clock time) tagged with the tick it arrived before. Replaying feeds the inputs to a fresh Match at the same ticks,
+so the match runs exactly as it did live, as fast as the CPU allows.
+A digest of the final state is stored at the end to check that.
+
+    python pong_replay.py recordings/*.pongrec
+"""
+import hashlib
+import struct
+import sys
+import time
+
+from pong_core import Court, Match
+
+MAGIC = b"PONGREC1"
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# magic, flags (FLAG_*), difficulty, seed, game width and height, ball speed
+# x and y, paddle speed, time limit, then the five AI parameters
+HEADER = struct.Struct("<8sBBQHH9d")
+FOOTER = struct.Struct("<Q16s")
+VALUE = struct.Struct("<d")
+
+# Header flags
+FLAG_ONE_PLAYER = 1
+FLAG_SWEPT = 2
+
+# Input kinds
+MOVE_A = 0
+MOVE_B = 1
+ELAPSE = 2
+DIRECTION_A = 3
+DIRECTION_B = 4
+END = 255
+
+
+def state_digest(match):
+    """Hash the full simulation state so replays can be checked bit for bit."""
+    packed = struct.pack("<9d3q", match.ball_x, match.ball_y, match.ball_dx, match.ball_dy,
+                         match.paddle_a_y, match.paddle_b_y, match.ai_frame_counter,
+                         match.ai_recovery_counter, match.time_left,
+                         match.score_a, match.score_b, match.tick)
+    return hashlib.blake2b(packed, digest_size=16).digest()
+
+
+def apply_input(match, kind, value):
+    """Apply one recorded input to a match; return any events it caused."""
+    if kind == MOVE_A:
+        match.move_paddle("a", value)
+    elif kind == MOVE_B:
+        match.move_paddle("b", value)
+    elif kind == DIRECTION_A:
+        match.set_paddle_direction("a", int(value))
+    elif kind == DIRECTION_B:
+        match.set_paddle_direction("b", int(value))
+    elif kind == ELAPSE:
+        return match.elapse(value)
+    return []
+
+
+def write_varint(out, value):
+    """Append an unsigned LEB128 integer."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Read an unsigned LEB128 integer; return (value, new position)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class MatchRecorder:
+    """Records a match's seed, rules and inputs as they happen."""
+
+    def __init__(self, match):
+        if match.seed is None:
+            raise ValueError("only matches created with a seed can be recorded")
+        self.match = match
+        self.data = bytearray(HEADER.pack(
+            MAGIC, (FLAG_ONE_PLAYER if match.one_player else 0) | (FLAG_SWEPT if match.swept else 0),
+            DIFFICULTIES.index(match.difficulty_level), match.seed,
+            match.court.game_width, match.court.game_height,
+            match.ball_speed_x, match.ball_speed_y, match.paddle_speed, match.time_limit_seconds,
+            match.ai_accuracy, match.ai_reaction_delay, match.ai_max_speed,
+            match.ai_prediction_error, match.ai_edge_weakness))
+        self.last_tick = 0
+        self.finished = False
+        # (tick, length of data before it) for every input, for rewind()
+        self.marks = []
+
+    def record(self, kind, value):
+        """Record an input applied before the match's next tick."""
+        if self.finished:
+            return
+        self.marks.append((self.match.tick, len(self.data)))
+        write_varint(self.data, self.match.tick - self.last_tick)
+        self.last_tick = self.match.tick
+        self.data.append(kind)
+        self.data += VALUE.pack(value)
+
+    def rewind(self, tick):
+        """Forget every input recorded for tick or later (after a rollback)."""
+        if self.finished:
+            return
+        while self.marks and self.marks[-1][0] >= tick:
+            del self.data[self.marks.pop()[1]:]
+        self.last_tick = self.marks[-1][0] if self.marks else 0
+
+    def record_move(self, side, distance):
+        """Record a paddle move for side "a" or "b"."""
+        self.record(MOVE_A if side == "a" else MOVE_B, distance)
+
+    def record_direction(self, side, direction):
+        """Record a held paddle direction change for side "a" or "b"."""
+        self.record(DIRECTION_A if side == "a" else DIRECTION_B, direction)
+
+    def record_elapse(self, seconds):
+        """Record clock time that was skipped instead of simulated."""
+        self.record(ELAPSE, seconds)
+
+    def finish(self):
+        """Close the recording with the final tick and state digest; return the bytes."""
+        if not self.finished:
+            write_varint(self.data, 0)
+            self.data.append(END)
+            self.data += FOOTER.pack(self.match.tick, state_digest(self.match))
+            self.finished = True
+        return bytes(self.data)
+
+    def save(self, path):
+        """Finish the recording and write it to path."""
+        with open(path, "wb") as f:
+            f.write(self.finish())
+
+
+class Recording:
+    """A parsed recording."""
+
+    def __init__(self, data):
+        fields = HEADER.unpack_from(data, 0)
+        if fields[0] != MAGIC:
+            raise ValueError("not a Pong recording")
+        (_, flags, difficulty, self.seed, self.game_width, self.game_height,
+         self.ball_speed_x, self.ball_speed_y, self.paddle_speed, self.time_limit_seconds,
+         *ai_values) = fields
+        self.one_player = bool(flags & FLAG_ONE_PLAYER)
+        # Recordings from before swept collisions have the flag clear
+        self.swept = bool(flags & FLAG_SWEPT)
+        self.difficulty = DIFFICULTIES[difficulty]
+        self.ai_params = dict(zip(("ai_accuracy", "ai_reaction_delay", "ai_max_speed",
+                                   "ai_prediction_error", "ai_edge_weakness"), ai_values))
+
+        self.inputs = []
+        pos = HEADER.size
+        tick = 0
+        while True:
+            delta, pos = read_varint(data, pos)
+            kind = data[pos]
+            pos += 1
+            if kind == END:
+                break
+            tick += delta
+            self.inputs.append((tick, kind, VALUE.unpack_from(data, pos)[0]))
+            pos += VALUE.size
+        self.final_tick, self.digest = FOOTER.unpack_from(data, pos)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def create_match(self):
+        """Return a fresh Match set up exactly as the recorded one was."""
+        return Match(Court(self.game_width, self.game_height), one_player=self.one_player,
+                     difficulty=self.difficulty, ball_speed_x=self.ball_speed_x,
+                     ball_speed_y=self.ball_speed_y, paddle_speed=self.paddle_speed,
+                     time_limit_seconds=self.time_limit_seconds, ai_params=self.ai_params,
+                     seed=self.seed, swept=self.swept)
+
+    def replay(self):
+        """Re-run the match to its recorded final tick and return it."""
+        match = self.create_match()
+        for tick, kind, value in self.inputs:
+            while match.tick < tick and match.running:
+                match.step()
+            apply_input(match, kind, value)
+        while match.tick < self.final_tick and match.running:
+            match.step()
+        return match
+
+    def play(self, every=1):
+        """Re-run the match, yielding it at tick 0, every `every` ticks and at the end.
+
+        The same Match is yielded each time, so read it before advancing.
+        """
+        match = self.create_match()
+        inputs = self.inputs
+        i = 0
+        yield match
+        while match.tick < self.final_tick and match.running:
+            while i < len(inputs) and inputs[i][0] <= match.tick:
+                apply_input(match, inputs[i][1], inputs[i][2])
+                i += 1
+            match.step()
+            if match.tick % every == 0:
+                yield match
+        for _, kind, value in inputs[i:]:
+            apply_input(match, kind, value)
+        if match.tick % every:
+            yield match
+
+    def verify(self):
+        """Replay the match and check it ends in the recorded state."""
+        return state_digest(self.replay()) == self.digest
+
+
+def main(paths):
+    failed = 0
+    total_ticks = 0
+    start = time.perf_counter()
+    for path in paths:
+        recording = Recording.load(path)
+        ok = recording.verify()
+        total_ticks += recording.final_tick
+        if not ok:
+            failed += 1
+            print(f"MISMATCH {path}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths) - failed}/{len(paths)} recordings replayed exactly, "
+          f"{total_ticks} ticks in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""Match state snapshots and rollback for late inputs.
+
+A snapshot is the full simulation state of a Match, RNG included, packed
+into a fixed-size binary slot. SnapshotRing keeps one slot per tick for
+the last few ticks in a single preallocated buffer. RollbackSession uses
+it to accept inputs for ticks that have already been simulated: it
+restores the snapshot from that tick, applies the input and steps back
+up to the present, so the match ends up as if the input had arrived on
+time.
+
+MultiBallMatch's extra balls are not part of a snapshot.
+"""
+import struct
+from array import array
+
+from pong_replay import apply_input
+
+WINNERS = (None, "a", "b", "tie")
+
+# ball x, y, dx, dy, paddle a and b y, AI frame and recovery counters for
+# both sides, time left; paddle directions, running, winner; scores, tick;
+# RNG state (624 words and position) and the cached gauss value
+SNAPSHOT = struct.Struct("<11d4b3q625I?d")
+SNAPSHOT_SIZE = SNAPSHOT.size
+# Ticks a late input can be rolled back
+ROLLBACK_TICKS = 64
+
+
+def save_state(match, buffer, offset=0):
+    """Pack a match's full state into buffer at offset."""
+    version, internal, gauss = match.rng.getstate()
+    SNAPSHOT.pack_into(
+        buffer, offset,
+        match.ball_x, match.ball_y, match.ball_dx, match.ball_dy,
+        match.paddle_a_y, match.paddle_b_y,
+        match.ai_frame_counter, match.ai_recovery_counter,
+        match.left_ai_frame_counter, match.left_ai_recovery_counter, match.time_left,
+        match.paddle_a_dir, match.paddle_b_dir, match.running, WINNERS.index(match.winner),
+        match.score_a, match.score_b, match.tick,
+        *internal, gauss is not None, gauss or 0.0)
+
+
+def load_state(match, buffer, offset=0):
+    """Restore a match's full state from a snapshot in buffer at offset."""
+    fields = SNAPSHOT.unpack_from(buffer, offset)
+    (match.ball_x, match.ball_y, match.ball_dx, match.ball_dy,
+     match.paddle_a_y, match.paddle_b_y,
+     match.ai_frame_counter, match.ai_recovery_counter,
+     match.left_ai_frame_counter, match.left_ai_recovery_counter, match.time_left,
+     match.paddle_a_dir, match.paddle_b_dir, running, winner,
+     match.score_a, match.score_b, match.tick) = fields[:18]
+    match.running = bool(running)
+    match.winner = WINNERS[winner]
+    match.rng.setstate((3, fields[18:643], fields[644] if fields[643] else None))
+
+
+class SnapshotRing:
+    """The last capacity ticks of a match's state, one fixed-size slot each."""
+
+    def __init__(self, capacity=ROLLBACK_TICKS):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * SNAPSHOT_SIZE)
+        self.ticks = array("q", [-1]) * capacity
+
+    def save(self, match):
+        """Snapshot the match under its current tick."""
+        slot = match.tick % self.capacity
+        save_state(match, self.buffer, slot * SNAPSHOT_SIZE)
+        self.ticks[slot] = match.tick
+
+    def has(self, tick):
+        return tick >= 0 and self.ticks[tick % self.capacity] == tick
+
+    def restore(self, match, tick):
+        """Put the match back to its state at tick; return False if it is gone."""
+        slot = tick % self.capacity
+        if self.ticks[slot] != tick:
+            return False
+        load_state(match, self.buffer, slot * SNAPSHOT_SIZE)
+        return True
+
+
+class RollbackSession:
+    """Steps a match and applies inputs at the tick they belong to.
+
+    Inputs use the recording kinds from pong_replay and, as in a
+    recording, an input for tick t is applied before the match steps
+    from t to t + 1. If a recorder is given, it is rewound along with
+    the match so the recording only ever holds the final timeline.
+    """
+
+    def __init__(self, match, capacity=ROLLBACK_TICKS, recorder=None):
+        self.match = match
+        self.recorder = recorder
+        self.ring = SnapshotRing(capacity)
+        # tick -> [(kind, value), ...] for ticks still inside the window
+        self.inputs = {}
+        self.rollbacks = 0
+        self.resimulated_ticks = 0
+        self.ring.save(match)
+
+    def add_input(self, tick, kind, value):
+        """Queue an input for tick, rolling back if that tick is already past.
+
+        Inputs older than the snapshot window are moved up to the oldest
+        tick still held. Returns the number of ticks re-simulated.
+        """
+        match = self.match
+        if tick < match.tick:
+            # A finished match is not reopened
+            if not match.running:
+                return 0
+            tick = max(tick, match.tick - self.ring.capacity + 1)
+            while not self.ring.has(tick):
+                tick += 1
+        self.inputs.setdefault(tick, []).append((kind, value))
+        if tick < match.tick:
+            return self.rollback(tick)
+        return 0
+
+    def rollback(self, tick):
+        """Restore the snapshot at tick and re-simulate up to the present."""
+        match = self.match
+        now = match.tick
+        self.ring.restore(match, tick)
+        if self.recorder:
+            self.recorder.rewind(tick)
+        self.rollbacks += 1
+        self.resimulated_ticks += now - tick
+        while match.tick < now and match.running:
+            for kind, value in self.inputs.get(match.tick, ()):
+                self.apply(kind, value)
+            match.step()
+            self.ring.save(match)
+        return now - tick
+
+    def apply(self, kind, value):
+        if self.recorder:
+            self.recorder.record(kind, value)
+        return apply_input(self.match, kind, value)
+
+    def step(self):
+        """Apply the inputs for the current tick, step and snapshot; return events."""
+        match = self.match
+        events = []
+        for kind, value in self.inputs.get(match.tick, ()):
+            events.extend(self.apply(kind, value))
+        events.extend(match.step())
+        self.ring.save(match)
+        self.inputs.pop(match.tick - self.ring.capacity, None)
+        return events
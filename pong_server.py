@@ -0,0 +1,373 @@
+"""Headless match server: many matches on one asyncio event loop.
+
+    python pong_server.py serve --port 5006
+    python pong_server.py bots --count 300 --port 5006 --seconds 30
+
+Clients talk to the server over TCP in frames: a two-byte little-endian
+length, then a packet laid out as in pong_net (INPUT and STATE), plus a
+JOIN/JOINED handshake. A client joins either against the AI or against
+the next player who asks for an opponent. Every frame (60 per second
+by default) the server steps each match through the physics ticks that
+are due and sends each player the match state.
+
+The server logs how long its frames take; from that it estimates how
+many matches one core could keep at the frame rate. The bots command
+opens hundreds of connections whose bots follow the ball, to load it.
+"""
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import time
+
+from pong_core import Court, Match, GAME_OVER, TICK_SECONDS
+from pong_net import INPUT, INPUT_CHANGE, INPUT_HEADER, STATE, STATE_PACKET, WINNERS
+
+DEFAULT_PORT = 5006
+FRAME_RATE = 60
+REPORT_SECONDS = 5.0
+# Skip state updates to a client with this much unsent data
+MAX_WRITE_BUFFER = 64 * 1024
+
+FRAME_HEADER = struct.Struct("<H")
+
+# Packet types, after pong_net's
+JOIN = 10
+JOINED = 11
+
+# Join modes
+VERSUS_AI = 0
+VERSUS_PLAYER = 1
+
+# type, mode, then the player's name
+JOIN_PACKET = struct.Struct("<BB")
+# type, side (0 left, 1 right), game width and height
+JOINED_PACKET = struct.Struct("<BBHH")
+
+
+def frame(payload):
+    """Prefix a packet with its length."""
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader):
+    """Read one framed packet; raises IncompleteReadError when the peer goes."""
+    header = await reader.readexactly(FRAME_HEADER.size)
+    return await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+
+
+class Player:
+    """A connected client and its place in a match."""
+
+    __slots__ = ("writer", "name", "game", "side", "last_input")
+
+    def __init__(self, writer, name):
+        self.writer = writer
+        self.name = name
+        self.game = None
+        self.side = None
+        # Sequence number of the newest input applied
+        self.last_input = 0
+
+    def send(self, payload):
+        """Queue a packet, dropping it if the client has stopped reading."""
+        transport = self.writer.transport
+        if transport.is_closing() or transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            return False
+        self.writer.write(frame(payload))
+        return True
+
+
+class Game:
+    """A match and the players in it."""
+
+    __slots__ = ("match", "players")
+
+    def __init__(self, match):
+        self.match = match
+        self.players = []
+
+
+class MatchServer:
+    """Runs every match on one event loop at a fixed frame rate."""
+
+    def __init__(self, frame_rate=FRAME_RATE, court=None, time_limit_seconds=300, seed=None):
+        self.frame_rate = frame_rate
+        self.court = court or Court()
+        self.time_limit_seconds = time_limit_seconds
+        self.rng = random.Random(seed)
+        self.games = set()
+        self.waiting = None
+        self.players = 0
+        self.frame_times = []
+        self.frames_late = 0
+        self.states_sent = 0
+        self.states_dropped = 0
+
+    def new_match(self, one_player):
+        return Match(self.court, one_player=one_player, time_limit_seconds=self.time_limit_seconds,
+                     seed=self.rng.getrandbits(63))
+
+    def join(self, player, mode):
+        """Seat a player against the AI or the next player who wants an opponent."""
+        if mode == VERSUS_PLAYER and self.waiting:
+            game = self.waiting
+            self.waiting = None
+            self.seat(player, game, "b")
+            return
+        if mode == VERSUS_PLAYER:
+            game = Game(self.new_match(one_player=False))
+            self.waiting = game
+        else:
+            game = Game(self.new_match(one_player=True))
+            self.games.add(game)
+        self.seat(player, game, "a")
+
+    def seat(self, player, game, side):
+        player.game = game
+        player.side = side
+        game.players.append(player)
+        if len(game.players) == 2 or game.match.one_player:
+            self.games.add(game)
+        player.send(JOINED_PACKET.pack(JOINED, 0 if side == "a" else 1,
+                                       self.court.game_width, self.court.game_height))
+
+    def apply_input(self, player, data):
+        """Set the player's paddle direction from its newest input change."""
+        _, _, count = INPUT_HEADER.unpack_from(data, 0)
+        if not count or not player.game:
+            return
+        sequence, _, direction = INPUT_CHANGE.unpack_from(data, INPUT_HEADER.size + (count - 1) * INPUT_CHANGE.size)
+        if sequence > player.last_input:
+            player.last_input = sequence
+            player.game.match.set_paddle_direction(player.side, max(-1, min(1, direction)))
+
+    def leave(self, player):
+        """Take a player out; their opponent wins a match left unfinished."""
+        game = player.game
+        if not game:
+            return
+        if self.waiting is game:
+            self.waiting = None
+        game.players.remove(player)
+        match = game.match
+        if match.running:
+            match.running = False
+            match.winner = "b" if player.side == "a" else "a"
+            self.broadcast(game)
+        self.games.discard(game)
+
+    def broadcast(self, game):
+        """Send the match state to everyone in the game."""
+        match = game.match
+        for player in game.players:
+            sent = player.send(STATE_PACKET.pack(
+                STATE, match.tick, player.last_input,
+                match.ball_x, match.ball_y, match.ball_dx, match.ball_dy,
+                match.paddle_a_y, match.paddle_b_y, match.time_left, match.paddle_a_dir,
+                match.score_a, match.score_b, int(match.running), WINNERS.index(match.winner)))
+            if sent:
+                self.states_sent += 1
+            else:
+                self.states_dropped += 1
+
+    async def handle_client(self, reader, writer):
+        player = None
+        self.players += 1
+        try:
+            while True:
+                data = await read_frame(reader)
+                if not data:
+                    continue
+                if data[0] == JOIN and player is None:
+                    _, mode = JOIN_PACKET.unpack_from(data, 0)
+                    name = data[JOIN_PACKET.size:].decode("utf-8", "replace")[:32]
+                    player = Player(writer, name or "Player")
+                    self.join(player, mode)
+                elif data[0] == INPUT and player:
+                    self.apply_input(player, data)
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass
+        finally:
+            self.players -= 1
+            if player:
+                self.leave(player)
+            writer.close()
+
+    def run_frame(self, ticks):
+        """Step every match by ticks physics ticks and broadcast its state."""
+        finished = []
+        for game in self.games:
+            match = game.match
+            for _ in range(ticks):
+                if GAME_OVER in match.step():
+                    break
+            self.broadcast(game)
+            if not match.running:
+                finished.append(game)
+        for game in finished:
+            self.games.discard(game)
+            for player in game.players:
+                player.game = None
+
+    async def run_frames(self):
+        """Run frames forever at the frame rate, catching physics up on the clock."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.frame_rate
+        next_frame = loop.time()
+        accumulator = 0.0
+        last_report = time.perf_counter()
+        while True:
+            accumulator += interval
+            ticks = int(accumulator / TICK_SECONDS)
+            accumulator -= ticks * TICK_SECONDS
+
+            start = time.perf_counter()
+            self.run_frame(ticks)
+            self.frame_times.append(time.perf_counter() - start)
+
+            if start - last_report >= REPORT_SECONDS:
+                print(self.report())
+                self.frame_times.clear()
+                last_report = start
+
+            next_frame += interval
+            delay = next_frame - loop.time()
+            if delay < 0:
+                # Behind; don't try to run the missed frames back to back
+                self.frames_late += 1
+                next_frame = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def report(self):
+        """One line of load and frame time statistics."""
+        times = sorted(self.frame_times)
+        if not times:
+            return f"{len(self.games)} matches, {self.players} players, no frames"
+        p50 = times[len(times) // 2]
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        mean = sum(times) / len(times)
+        budget = 1 / self.frame_rate
+        line = (f"{len(self.games)} matches, {self.players} players | frame p50 {p50 * 1000:.2f} ms "
+                f"p99 {p99 * 1000:.2f} ms, {self.frames_late} late | states sent {self.states_sent}, "
+                f"dropped {self.states_dropped}")
+        if self.games and mean:
+            line += f" | about {int(len(self.games) * budget / mean)} matches per core at {self.frame_rate} Hz"
+        return line
+
+    async def serve(self, host="0.0.0.0", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Serving Pong matches on {host}:{port} at {self.frame_rate} Hz")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.run_frames())
+
+
+async def run_bot(host, port, mode, seconds, stats, rng):
+    """Play one connection: follow the ball, count the states received."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        stats["failed"] += 1
+        print(f"Error connecting bot: {e}")
+        return
+    writer.write(frame(JOIN_PACKET.pack(JOIN, mode) + b"bot"))
+    side = None
+    direction = 0
+    sent_tick = 0
+    sequence = 0
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            try:
+                data = await asyncio.wait_for(read_frame(reader), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            if data[0] == JOINED:
+                side = "a" if data[1] == 0 else "b"
+                stats["joined"] += 1
+                continue
+            if data[0] != STATE or side is None:
+                continue
+            state = STATE_PACKET.unpack(data)
+            stats["states"] += 1
+            if not state[13]:
+                stats["finished"] += 1
+                break
+            ball_y = state[4]
+            paddle_y = state[7] if side == "a" else state[8]
+            # Follow the ball, with some slack so bots can miss
+            wanted = 0
+            if ball_y > paddle_y + 20 + rng.uniform(0, 40):
+                wanted = 1
+            elif ball_y < paddle_y - 20 - rng.uniform(0, 40):
+                wanted = -1
+            if wanted != direction:
+                direction = wanted
+                sent_tick = max(sent_tick + 1, state[1])
+                sequence += 1
+                writer.write(frame(INPUT_HEADER.pack(INPUT, sent_tick, 1)
+                                   + INPUT_CHANGE.pack(sequence, sent_tick, direction)))
+                stats["inputs"] += 1
+    except (asyncio.IncompleteReadError, ConnectionError):
+        stats["disconnected"] += 1
+    finally:
+        writer.close()
+
+
+async def run_bots(host, port, count, mode, seconds, ramp, seed):
+    stats = dict.fromkeys(("joined", "states", "inputs", "finished", "failed", "disconnected"), 0)
+    rng = random.Random(seed)
+    bots = []
+    for _ in range(count):
+        bots.append(asyncio.create_task(run_bot(host, port, mode, seconds, stats, rng)))
+        if ramp:
+            await asyncio.sleep(ramp / count)
+    await asyncio.gather(*bots)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Pong match server and load tester.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the match server")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--frame-rate", type=int, default=FRAME_RATE, help="state updates per second")
+    serve.add_argument("--time-limit", type=float, default=300, help="seconds per two player match")
+
+    bots = commands.add_parser("bots", help="connect many bot players to a server")
+    bots.add_argument("--host", default="127.0.0.1")
+    bots.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bots.add_argument("--count", type=int, default=100, help="bot connections")
+    bots.add_argument("--versus", choices=("ai", "player"), default="player",
+                      help="play the server's AI, or pair bots with each other")
+    bots.add_argument("--seconds", type=float, default=30.0)
+    bots.add_argument("--ramp", type=float, default=2.0, help="seconds over which to connect the bots")
+    bots.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = MatchServer(args.frame_rate, time_limit_seconds=args.time_limit)
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    mode = VERSUS_AI if args.versus == "ai" else VERSUS_PLAYER
+    start = time.perf_counter()
+    stats = asyncio.run(run_bots(args.host, args.port, args.count, mode, args.seconds, args.ramp, args.seed))
+    elapsed = time.perf_counter() - start
+    joined = stats["joined"] or 1
+    print(f"{stats['joined']}/{args.count} bots joined, {stats['failed']} failed, "
+          f"{stats['disconnected']} disconnected, {stats['finished']} saw their match end")
+    print(f"{stats['states'] / elapsed:.0f} states/s in total, "
+          f"{stats['states'] / elapsed / joined:.1f} per bot; {stats['inputs']} inputs sent")
+    return 0 if stats["joined"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""AI vs AI self-play tournaments across a process pool.
+
+    python pong_tournament.py --matches 1000 --workers 64 -o results.json
+
+Every ordered pair of presets plays --matches games (first to --points),
+with the first preset on the left paddle. Games are split into shards
+that each worker plays start to finish, sending back only aggregated
+counts, so throughput grows with the number of cores. With --history,
+workers also send back each match's result, and every one is added to
+the match history database as shards finish; games cut off by
+--max-ticks are stored as unfinished and do not count in the standings.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from pong_core import DIFFICULTY_PRESETS, PADDLE_HIT, SCORE, TICK_SECONDS, Court, Match
+from pong_history import UNFINISHED
+
+
+def play_match(left, right, seed, points=5, ball_speed=None, max_ticks=1000000):
+    """Play one AI vs AI match and return its result and rally lengths."""
+    match = Match(Court(), one_player=True, difficulty=right, left_ai=left,
+                  win_score=points, ball_speed_x=ball_speed, seed=seed)
+    rallies = []
+    hits = 0
+    step = match.step
+    while match.running and match.tick < max_ticks:
+        events = step()
+        if events:
+            if PADDLE_HIT in events:
+                hits += 1
+            if SCORE in events:
+                rallies.append(hits)
+                hits = 0
+    return match.winner, match.score_a, match.score_b, match.tick, rallies
+
+
+def empty_stats():
+    """Aggregated results for one pairing."""
+    return {"matches": 0, "left_wins": 0, "right_wins": 0, "unfinished": 0,
+            "ticks": 0, "points": 0, "rally_hits": 0, "longest_rally": 0,
+            "scores": Counter(), "rally_lengths": Counter()}
+
+
+def history_result(left, right, winner, score_a, score_b, ticks, rallies):
+    """One match as a pong_history result; one that hit max_ticks is UNFINISHED, not a tie."""
+    return {
+        "played_at": time.time(), "source": "tournament", "mode": "ai_vs_ai", "difficulty": right,
+        "player_a": f"AI {left}", "player_b": f"AI {right}", "score_a": score_a, "score_b": score_b,
+        "winner": winner or UNFINISHED, "ticks": ticks, "duration": ticks * TICK_SECONDS, "rallies": len(rallies),
+        "paddle_hits": sum(rallies), "longest_rally": max(rallies, default=0),
+    }
+
+
+def play_shard(shard):
+    """Play a shard of (left, right, seed) matches and aggregate the results.
+
+    Returns the stats per pairing and, if the shard asks for them, each
+    match's history result.
+    """
+    points, ball_speed, max_ticks, games, keep_results = shard
+    stats = {}
+    results = []
+    for left, right, seed in games:
+        winner, score_a, score_b, ticks, rallies = play_match(left, right, seed, points, ball_speed, max_ticks)
+        if keep_results:
+            results.append(history_result(left, right, winner, score_a, score_b, ticks, rallies))
+        pair = stats.setdefault((left, right), empty_stats())
+        pair["matches"] += 1
+        if winner == "a":
+            pair["left_wins"] += 1
+        elif winner == "b":
+            pair["right_wins"] += 1
+        else:
+            pair["unfinished"] += 1
+        pair["ticks"] += ticks
+        pair["points"] += len(rallies)
+        pair["rally_hits"] += sum(rallies)
+        pair["longest_rally"] = max([pair["longest_rally"]] + rallies)
+        pair["scores"][f"{score_a}-{score_b}"] += 1
+        pair["rally_lengths"].update(rallies)
+    return stats, results
+
+
+def merge(total, stats):
+    """Add one shard's stats into the running totals."""
+    for pair, pair_stats in stats.items():
+        into = total.setdefault(pair, empty_stats())
+        for key, value in pair_stats.items():
+            if key == "longest_rally":
+                into[key] = max(into[key], value)
+            else:
+                into[key] += value
+
+
+def run_tournament(presets=None, matches=100, points=5, ball_speed=None, workers=None,
+                   seed=0, max_ticks=1000000, shards_per_worker=4, history=None):
+    """Play every ordered pair of presets and return a report per pairing.
+
+    If history is a pong_history.MatchStore, every match is recorded in it.
+    """
+    presets = list(presets or DIFFICULTY_PRESETS)
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    games = [(left, right, rng.getrandbits(63))
+             for left in presets for right in presets for _ in range(matches)]
+
+    shard_count = max(1, min(len(games), workers * shards_per_worker))
+    shards = [(points, ball_speed, max_ticks, games[i::shard_count], history is not None)
+              for i in range(shard_count)]
+
+    total = {}
+    if workers == 1:
+        outcomes = map(play_shard, shards)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        outcomes = pool.map(play_shard, shards)
+    try:
+        for stats, results in outcomes:
+            merge(total, stats)
+            if history is not None:
+                history.record_many(results)
+    finally:
+        if workers != 1:
+            pool.shutdown()
+    return report(total)
+
+
+def report(total):
+    """Turn aggregated counts into win rates and averages."""
+    results = {}
+    for (left, right), stats in sorted(total.items()):
+        finished = stats["matches"] - stats["unfinished"]
+        results[f"{left} vs {right}"] = {
+            "matches": stats["matches"],
+            "unfinished": stats["unfinished"],
+            "left_win_rate": stats["left_wins"] / finished if finished else 0.0,
+            "right_win_rate": stats["right_wins"] / finished if finished else 0.0,
+            "mean_rally_hits": stats["rally_hits"] / stats["points"] if stats["points"] else 0.0,
+            "longest_rally": stats["longest_rally"],
+            "mean_match_ticks": stats["ticks"] / stats["matches"] if stats["matches"] else 0.0,
+            "scores": dict(stats["scores"].most_common()),
+            "rally_lengths": {str(k): v for k, v in sorted(stats["rally_lengths"].items())},
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an AI vs AI Pong tournament.")
+    parser.add_argument("--presets", nargs="+", default=list(DIFFICULTY_PRESETS), choices=list(DIFFICULTY_PRESETS))
+    parser.add_argument("--matches", type=int, default=100, help="matches per ordered pairing")
+    parser.add_argument("--points", type=int, default=5, help="points needed to win a match")
+    parser.add_argument("--ball-speed", type=float, default=None, help="ball speed per tick")
+    parser.add_argument("--max-ticks", type=int, default=1000000, help="give up on a match after this many ticks")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--history", nargs="?", const="", metavar="DB",
+                        help="record every match in the match history (default database if no path)")
+    args = parser.parse_args(argv)
+
+    history = None
+    if args.history is not None:
+        from pong_history import MatchStore
+        history = MatchStore(args.history or None)
+
+    start = time.perf_counter()
+    results = run_tournament(args.presets, args.matches, args.points, args.ball_speed,
+                             args.workers, args.seed, args.max_ticks, history=history)
+    elapsed = time.perf_counter() - start
+    if history:
+        history.close()
+
+    for pairing, result in results.items():
+        print(f"{pairing:18s} left {result['left_win_rate']:6.1%}  right {result['right_win_rate']:6.1%}  "
+              f"rally {result['mean_rally_hits']:5.2f} hits  unfinished {result['unfinished']}")
+    print(f"{sum(r['matches'] for r in results.values())} matches in {elapsed:.1f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Search for AI difficulty presets that hit a target player win rate.
+
+    python pong_tuner.py --method refine --candidates 96 --workers 8 -o presets.json
+
+Each candidate is a set of the five AI parameters. It is scored by
+playing batches of matches (pong_batch.BatchMatch, with the game's
+swept collisions) against the batch reference player and comparing
+the player's win rate with the target for that level. Candidates are
+evaluated across a process pool, and ones that are clearly worse than
+the best so far are stopped after their first round of matches. The
+best candidate per level is printed in the form used by
+pong_core.DIFFICULTY_PRESETS.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pong_batch import BatchMatch
+
+# Range searched for each AI parameter
+SEARCH_SPACE = {
+    "ai_accuracy": (0.0, 1.0),
+    "ai_reaction_delay": (1.0, 12.0),
+    "ai_max_speed": (5.0, 25.0),
+    "ai_prediction_error": (0.0, 1.2),
+    "ai_edge_weakness": (0.0, 1.5),
+}
+
+# Player win rate each preset should give against the reference player
+DEFAULT_TARGETS = {"easy": 0.8, "medium": 0.5, "hard": 0.25}
+
+
+def random_candidates(rng, count):
+    """Uniformly sampled parameter sets."""
+    return [{name: rng.uniform(low, high) for name, (low, high) in SEARCH_SPACE.items()}
+            for _ in range(count)]
+
+
+def grid_candidates(steps):
+    """Every combination of steps evenly spaced values per parameter."""
+    candidates = [{}]
+    for name, (low, high) in SEARCH_SPACE.items():
+        values = [low + (high - low) * i / max(1, steps - 1) for i in range(steps)]
+        candidates = [dict(c, **{name: v}) for c in candidates for v in values]
+    return candidates
+
+
+def refined_candidates(rng, elite, count, spread):
+    """Sample around the best candidates so far (cross-entropy style)."""
+    candidates = []
+    for i in range(count):
+        parent = elite[i % len(elite)]
+        candidate = {}
+        for name, (low, high) in SEARCH_SPACE.items():
+            value = rng.gauss(parent[name], spread * (high - low))
+            candidate[name] = min(high, max(low, value))
+        candidates.append(candidate)
+    return candidates
+
+
+def evaluate(job):
+    """Score one candidate: how far its player win rate is from the target."""
+    params, level, target, matches, rounds, ball_speed, max_ticks, seed, best_error = job
+    wins = finished = played = 0
+    stopped_early = False
+    per_round = max(1, matches // rounds)
+    for round_number in range(rounds):
+        batch = BatchMatch(per_round, difficulty=level, ai_params=params,
+                           ball_speed_x=ball_speed, seed=seed + round_number)
+        batch.run(max_ticks)
+        played += per_round
+        finished += int((batch.result_winner > 0).sum())
+        wins += int((batch.result_winner == 1).sum())
+
+        win_rate = wins / finished if finished else 0.0
+        std_error = math.sqrt(win_rate * (1 - win_rate) / finished) if finished else 1.0
+        # Stop if even the optimistic end of the estimate loses to the best
+        if round_number < rounds - 1 and abs(win_rate - target) - 2 * std_error > best_error:
+            stopped_early = True
+            break
+
+    win_rate = wins / finished if finished else 0.0
+    return {
+        "params": params,
+        "win_rate": win_rate,
+        "error": abs(win_rate - target) if finished else float("inf"),
+        "matches": played,
+        "finished": finished,
+        "stopped_early": stopped_early,
+    }
+
+
+def tune_level(level, target, method="random", candidates=64, matches=400, rounds=4,
+               ball_speed=None, max_ticks=200000, workers=None, seed=0, grid_steps=3,
+               iterations=3):
+    """Search for the best parameters for one level and return all evaluations."""
+    rng = random.Random(f"{seed}-{level}")
+    workers = workers or os.cpu_count() or 1
+    evaluated = []
+    best_error = float("inf")
+
+    if method == "grid":
+        waves = [grid_candidates(grid_steps)]
+    elif method == "refine":
+        per_iteration = max(1, candidates // iterations)
+        waves = [random_candidates(rng, per_iteration)]
+    else:
+        waves = [random_candidates(rng, candidates)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        iteration = 0
+        while waves:
+            wave = waves.pop(0)
+            # Submit in chunks so later chunks can stop early against the best
+            for start in range(0, len(wave), workers):
+                jobs = [(params, level, target, matches, rounds, ball_speed, max_ticks,
+                         seed, best_error) for params in wave[start:start + workers]]
+                for future in as_completed([pool.submit(evaluate, job) for job in jobs]):
+                    result = future.result()
+                    evaluated.append(result)
+                    best_error = min(best_error, result["error"])
+
+            iteration += 1
+            if method == "refine" and iteration < iterations:
+                elite = [r["params"] for r in sorted(evaluated, key=lambda r: r["error"])[:4]]
+                spread = 0.15 / iteration
+                waves.append(refined_candidates(rng, elite, max(1, candidates // iterations), spread))
+
+    evaluated.sort(key=lambda r: r["error"])
+    return evaluated
+
+
+def format_preset(params):
+    """Round a parameter set the way DIFFICULTY_PRESETS writes it."""
+    return {name: round(value, 3) for name, value in params.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune AI difficulty presets.")
+    parser.add_argument("--levels", nargs="+", default=list(DEFAULT_TARGETS), choices=list(DEFAULT_TARGETS))
+    parser.add_argument("--targets", nargs="+", type=float, help="player win rate per level")
+    parser.add_argument("--method", choices=("random", "grid", "refine"), default="refine")
+    parser.add_argument("--candidates", type=int, default=64, help="candidates per level (random, refine)")
+    parser.add_argument("--grid-steps", type=int, default=3, help="values per parameter (grid)")
+    parser.add_argument("--matches", type=int, default=400, help="matches per candidate")
+    parser.add_argument("--rounds", type=int, default=4, help="early-stopping checkpoints per candidate")
+    parser.add_argument("--ball-speed", type=float, default=None, help="ball speed per tick")
+    parser.add_argument("--max-ticks", type=int, default=200000, help="tick budget per batch of matches")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the presets and search log as JSON")
+    args = parser.parse_args(argv)
+
+    targets = dict(DEFAULT_TARGETS)
+    if args.targets:
+        targets.update(zip(args.levels, args.targets))
+
+    presets = {}
+    log = {}
+    for level in args.levels:
+        evaluated = tune_level(level, targets[level], args.method, args.candidates, args.matches,
+                               args.rounds, args.ball_speed, args.max_ticks, args.workers,
+                               args.seed, args.grid_steps)
+        best = evaluated[0]
+        presets[level] = format_preset(best["params"])
+        log[level] = evaluated
+        stopped = sum(r["stopped_early"] for r in evaluated)
+        print(f"{level}: player win rate {best['win_rate']:.1%} (target {targets[level]:.0%}), "
+              f"{len(evaluated)} candidates, {stopped} stopped early")
+
+    print("DIFFICULTY_PRESETS = " + json.dumps(presets, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"targets": targets, "presets": presets, "log": log}, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
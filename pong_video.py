@@ -0,0 +1,466 @@
+"""Render recorded matches to animated GIFs or PNG frames, without a display.
+
+    python pong_video.py match.pongrec -o clip.gif --start 30 --end 45
+    python pong_video.py match.pongrec -o frames/ --fps 100
+
+FrameRenderer draws a match into an RGB NumPy array with the turtle
+front end's layout and skins. render_recording() replays a recording in
+this process and hands chunks of frame states to a pool of workers,
+which render and encode them. At most two chunks per worker are in
+flight and encoded GIF frames are written out as soon as they arrive in
+order, so memory stays flat however long the match is.
+
+Every GIF frame uses one global palette, taken from the most common
+colors of the match's first frame. Pixels whose color is in the palette
+are encoded as exactly that color; any others (from scaling, or a frame
+with more than 256 colors) get the nearest one. Frames after the first
+hold only the rectangle that changed since the frame before.
+"""
+import argparse
+import os
+import struct
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+from PIL.GifImagePlugin import getdata
+
+from pong_core import BALL_RADIUS, TICK_SECONDS, Court, MultiBallMatch
+from pong_render import (MatchRenderer, SkinCache, SKIN_FILES, SKIN_SIZE, FALLBACK_BALL_COLOR, PADDLE_DRAW_WIDTH,
+                         PADDLE_DRAW_HEIGHT, BALL_DRAW_SIZE, TIMER_FONT_SIZE, OVERLAY_FONT_SIZE,
+                         score_font_size, score_text, timer_text)
+from pong_replay import Recording
+
+DEFAULT_FPS = 50  # GIF delays are whole centiseconds and most viewers slow anything under 2
+CHUNK_FRAMES = 50
+# Chunks queued per worker before the writer waits for the oldest one
+CHUNKS_IN_FLIGHT = 2
+FONT_FILES = {False: "DejaVuSansMono.ttf", True: "DejaVuSansMono-Bold.ttf"}
+TEXT_CACHE_SIZE = 512
+BACKGROUND = (255, 255, 255)
+FOREGROUND = (0, 0, 0)
+GIF_HEADER = struct.Struct("<6sHHBBB")
+# NETSCAPE2.0 application extension: loop forever
+GIF_LOOP = b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+
+
+class FrameState:
+    """What FrameRenderer needs from a match, small enough to send to a worker."""
+
+    __slots__ = ("tick", "ball_x", "ball_y", "paddle_a_y", "paddle_b_y", "score_a", "score_b", "time_left")
+
+    def __init__(self, match):
+        self.tick = match.tick
+        self.ball_x = match.ball_x
+        self.ball_y = match.ball_y
+        self.paddle_a_y = match.paddle_a_y
+        self.paddle_b_y = match.paddle_b_y
+        self.score_a = match.score_a
+        self.score_b = match.score_b
+        self.time_left = match.time_left
+
+
+def load_font(size, bold=False):
+    try:
+        return ImageFont.truetype(FONT_FILES[bold], size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def paste(frame, left, top, color, alpha=None):
+    """Draw color (an RGB triple or an (h, w, 3) array) onto frame through alpha (h, w), clipped.
+
+    alpha is 0-255 coverage; without it the pixels are opaque.
+    """
+    if alpha is not None:
+        height, width = alpha.shape
+    else:
+        height, width = color.shape[:2]
+    x0, y0 = max(left, 0), max(top, 0)
+    x1, y1 = min(left + width, frame.shape[1]), min(top + height, frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    region = frame[y0:y1, x0:x1]
+    if isinstance(color, np.ndarray) and color.ndim == 3:
+        color = color[y0 - top:y1 - top, x0 - left:x1 - left]
+    if alpha is None:
+        region[:] = color
+        return
+    coverage = alpha[y0 - top:y1 - top, x0 - left:x1 - left, None].astype(np.uint16)
+    region[:] = (region * (255 - coverage) + np.asarray(color, np.uint16) * coverage + 127) // 255
+
+
+class FrameRenderer(MatchRenderer):
+    """Renders a match into an RGB NumPy array (height, width, 3) with the on-screen layout.
+
+    draw() leaves the frame in self.frame; the array is reused, so copy
+    it if it has to outlive the next draw().
+    """
+
+    def __init__(self, court, ball_skins=None):
+        self.court = court
+        self.center_x = court.game_width // 2
+        self.center_y = court.game_height // 2
+        self.background = np.empty((court.game_height, court.game_width, 3), np.uint8)
+        self.background[:] = BACKGROUND
+        self.frame = self.background.copy()
+        self.ball_skins = dict(ball_skins or SKIN_FILES)
+        self.paddle = np.zeros((PADDLE_DRAW_HEIGHT, PADDLE_DRAW_WIDTH, 3), np.uint8)
+        self.paddle[:] = FOREGROUND
+        # (color or RGB array, alpha) of the ball sprite
+        self.ball = None
+        self.fonts = {}
+        self.text_cache = {}
+        # slot -> (text, size, bold, position, color) for each line of HUD text
+        self.hud = {}
+        self.names = None
+        self.show_timer = False
+
+    def font(self, size, bold=False):
+        key = (size, bold)
+        if key not in self.fonts:
+            self.fonts[key] = load_font(size, bold)
+        return self.fonts[key]
+
+    def text_mask(self, text, size, bold):
+        """Coverage of text as an alpha array and its baseline, cached."""
+        key = (text, size, bold)
+        if key not in self.text_cache:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            font = self.font(size, bold)
+            left, top, right, bottom = font.getbbox(text, anchor="ls")
+            image = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+            ImageDraw.Draw(image).text((-left, -top), text, fill=255, font=font, anchor="ls")
+            self.text_cache[key] = (np.asarray(image), -top)
+        return self.text_cache[key]
+
+    def dot(self, color, size):
+        """A filled circle sprite."""
+        yy, xx = np.mgrid[:size, :size]
+        radius = size / 2
+        inside = (xx + 0.5 - radius) ** 2 + (yy + 0.5 - radius) ** 2 <= radius ** 2
+        return ImageColor.getrgb(color), inside.astype(np.uint8) * 255
+
+    def skin_sprite(self, skin):
+        """The ball sprite for a skin: the scaled image with its transparency, or a dot."""
+        source = self.ball_skins.get(skin, FALLBACK_BALL_COLOR)
+        if isinstance(source, str) and source.endswith(".gif"):
+            try:
+                # The cached copy is already SKIN_SIZE; some sources are 5000 pixels square
+                with Image.open(SkinCache().get(source, SKIN_SIZE)) as image:
+                    image = image.convert("RGBA")
+                pixels = np.asarray(image)
+                return pixels[:, :, :3].copy(), pixels[:, :, 3].copy()
+            except OSError as e:
+                print(f"Error loading skin {source}: {e}")
+                source = FALLBACK_BALL_COLOR
+        return self.dot(source if source.startswith("#") else FALLBACK_BALL_COLOR, BALL_DRAW_SIZE)
+
+    def start(self, match, names, skin, show_timer):
+        self.names = names
+        self.show_timer = show_timer
+        if isinstance(match, MultiBallMatch):
+            color = self.ball_skins.get(skin, FALLBACK_BALL_COLOR)
+            self.ball = self.dot(color if color.startswith("#") else FALLBACK_BALL_COLOR, BALL_RADIUS * 2)
+        else:
+            self.ball = self.skin_sprite(skin)
+        self.clear()
+
+    def set_text(self, slot, text, size, position, bold=False, color=FOREGROUND):
+        if text is None:
+            self.hud.pop(slot, None)
+        else:
+            self.hud[slot] = (text, size, bold, position, color)
+
+    def draw(self, match, events=(), previous=None, alpha=1.0):
+        """Render the match's current tick; previous and alpha are not needed at whole ticks."""
+        court = self.court
+        frame = self.frame
+        np.copyto(frame, self.background)
+
+        self.set_text("score", score_text(match, self.names), score_font_size(court),
+                      (0, court.boundary_y - score_font_size(court) * 0.1))
+        if self.show_timer:
+            self.set_text("timer", timer_text(match), TIMER_FONT_SIZE, (0, court.boundary_y - 30), bold=True)
+        for text, size, bold, (x, y), color in self.hud.values():
+            mask, baseline = self.text_mask(text, size, bold)
+            paste(frame, int(self.center_x + x) - mask.shape[1] // 2, int(self.center_y - y) - baseline,
+                  color, mask)
+
+        paddle_x = court.paddle_x_position
+        for x, y in ((-paddle_x, match.paddle_a_y), (paddle_x, match.paddle_b_y)):
+            paste(frame, int(self.center_x + x) - PADDLE_DRAW_WIDTH // 2,
+                  int(self.center_y - y) - PADDLE_DRAW_HEIGHT // 2, self.paddle)
+        color, coverage = self.ball
+        height, width = coverage.shape
+        if isinstance(match, MultiBallMatch):
+            positions = zip(match.ball_xs, match.ball_ys)
+        else:
+            positions = ((match.ball_x, match.ball_y),)
+        for x, y in positions:
+            paste(frame, int(self.center_x + x) - width // 2, int(self.center_y - y) - height // 2,
+                  color, coverage)
+
+    def show_overlay(self, text):
+        self.set_text("overlay", text, OVERLAY_FONT_SIZE, (0, -self.court.boundary_y + 10),
+                      color=ImageColor.getrgb("gray40"))
+
+    def present(self):
+        """Frames stay in self.frame; there is no screen to update."""
+
+    def clear(self):
+        self.hud.clear()
+        np.copyto(self.frame, self.background)
+
+    def render(self, match):
+        """Draw the match and return the frame."""
+        self.draw(match)
+        return self.frame
+
+
+def pack_rgb(pixels):
+    """One uint32 per pixel, 0xRRGGBB; far cheaper to compare and count than three bytes."""
+    packed = pixels.astype(np.uint32)
+    return (packed[..., 0] << 16) | (packed[..., 1] << 8) | packed[..., 2]
+
+
+def build_palette(frame, colors=256):
+    """The frame's most common colors, at most colors of them, as an (n, 3) uint8 array."""
+    unique, counts = np.unique(pack_rgb(frame), return_counts=True)
+    common = unique[np.argsort(counts)[::-1][:colors]]
+    return (np.stack([common >> 16, common >> 8, common], axis=1) & 0xFF).astype(np.uint8)
+
+
+class PaletteMap:
+    """Maps RGB pixels to indices into a fixed palette.
+
+    Colors in the palette are found exactly by binary search over the
+    sorted packed palette; only the rest are matched to the nearest
+    color by squared RGB distance.
+    """
+
+    def __init__(self, palette):
+        self.palette = palette
+        packed = pack_rgb(palette)
+        order = np.argsort(packed)
+        self.keys = packed[order]
+        self.indices = order.astype(np.uint8)
+        # 256 entries for the GIF color table, unused ones black
+        table = np.zeros((256, 3), np.uint8)
+        table[:len(palette)] = palette
+        self.table = table.tobytes()
+
+    def indices_of(self, pixels):
+        """Return a uint8 array of palette indices with the shape of pixels' first two axes."""
+        packed = pack_rgb(pixels)
+        position = np.minimum(np.searchsorted(self.keys, packed), len(self.keys) - 1)
+        indices = self.indices[position]
+        missing = self.keys[position] != packed
+        if missing.any():
+            colors, inverse = np.unique(packed[missing], return_inverse=True)
+            rgb = np.stack([colors >> 16, colors >> 8, colors], axis=1).astype(np.int32) & 0xFF
+            distance = ((rgb[:, None, :] - self.palette[None, :, :].astype(np.int32)) ** 2).sum(axis=2)
+            indices[missing] = distance.argmin(axis=1).astype(np.uint8)[inverse]
+        return indices
+
+    def image(self, pixels):
+        """A 'P' image of pixels using the palette."""
+        indices = self.indices_of(pixels)
+        image = Image.frombytes("P", (indices.shape[1], indices.shape[0]), indices.tobytes())
+        image.putpalette(self.table)
+        return image
+
+
+def gif_header(width, height, palette):
+    """GIF89a header with a 256 color global palette, looping forever."""
+    # Global color table present, 8 bit color resolution, 2 ** (7 + 1) entries
+    return GIF_HEADER.pack(b"GIF89a", width, height, 0xF7, 0, 0) + PaletteMap(palette).table + GIF_LOOP
+
+
+class FrameEncoder:
+    """Renders frame states and encodes them; one per worker process."""
+
+    def __init__(self, court, skin, names, show_timer, palette, scale, duration, output):
+        self.renderer = FrameRenderer(court)
+        self.renderer.start(None, names, skin, show_timer)
+        self.palette = PaletteMap(palette) if palette is not None else None
+        self.size = (round(court.game_width * scale), round(court.game_height * scale))
+        self.duration = duration
+        self.output = output
+
+    def pixels(self, state):
+        """The state as an RGB array at the output size."""
+        frame = self.renderer.render(state)
+        if (frame.shape[1], frame.shape[0]) == self.size:
+            return frame
+        return np.asarray(Image.fromarray(frame).resize(self.size, Image.Resampling.BILINEAR))
+
+    def encode(self, first_index, previous, states):
+        """Write PNG frames, or return GIF frame data cropped to the change since the frame before."""
+        if self.output is not None:
+            for index, state in enumerate(states, first_index):
+                Image.fromarray(self.pixels(state)).save(os.path.join(self.output, f"frame-{index:06d}.png"))
+            return []
+
+        last = self.pixels(previous).copy() if previous else None
+        encoded = []
+        for state in states:
+            pixels = self.pixels(state)
+            box = (0, 0) + self.size
+            if last is not None:
+                # Only the changed rectangle is mapped to the palette and encoded
+                # Reduce over whole rows of bytes; any() across the three
+                # channels of each pixel is many times slower
+                changed = (pixels != last).reshape(pixels.shape[0], -1).view(np.uint8)
+                rows = np.flatnonzero(changed.max(axis=1))
+                if len(rows):
+                    columns = np.flatnonzero(changed[rows[0]:rows[-1] + 1].max(axis=0)) // 3
+                    box = (int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1)
+                else:
+                    # Nothing moved; a one pixel frame keeps the timing
+                    box = (0, 0, 1, 1)
+                np.copyto(last, pixels)
+            else:
+                last = pixels.copy()
+            image = self.palette.image(pixels[box[1]:box[3], box[0]:box[2]])
+            encoded.append(b"".join(getdata(image, box[:2], duration=self.duration)))
+        return encoded
+
+
+# The FrameEncoder of this worker process, set by init_worker
+worker_encoder = None
+
+
+def init_worker(*args):
+    global worker_encoder
+    worker_encoder = FrameEncoder(*args)
+
+
+def encode_chunk(task):
+    return worker_encoder.encode(*task)
+
+
+def frame_states(recording, ticks_per_frame, start_tick=0, end_tick=None):
+    """FrameStates for every frame of a recording between two ticks."""
+    for match in recording.play(ticks_per_frame):
+        if match.tick < start_tick:
+            continue
+        if end_tick is not None and match.tick > end_tick:
+            break
+        yield FrameState(match)
+
+
+def render_recording(recording, output, fps=DEFAULT_FPS, start=0.0, end=None, skin="default",
+                     names=("Player 1", "Player 2"), scale=1.0, workers=None):
+    """Render a recording to an animated GIF (output ending in .gif) or a directory of PNGs.
+
+    start and end are in seconds of game time. Returns the number of
+    frames written.
+    """
+    workers = workers or os.cpu_count() or 1
+    ticks_per_frame = max(1, round(1 / (fps * TICK_SECONDS)))
+    duration = ticks_per_frame * TICK_SECONDS * 1000
+    states = frame_states(recording, ticks_per_frame, round(start / TICK_SECONDS),
+                          None if end is None else round(end / TICK_SECONDS))
+    first = next(states, None)
+    if first is None:
+        return 0
+
+    court = Court(recording.game_width, recording.game_height)
+    show_timer = not recording.one_player
+    gif = output.lower().endswith(".gif")
+    palette = None
+    if gif:
+        renderer = FrameRenderer(court)
+        renderer.start(None, names, skin, show_timer)
+        palette = build_palette(renderer.render(first))
+    else:
+        os.makedirs(output, exist_ok=True)
+    encoder_args = (court, skin, names, show_timer, palette, scale, duration, None if gif else output)
+
+    def chunks():
+        previous = None
+        chunk = [first]
+        index = 0
+        for state in states:
+            chunk.append(state)
+            if len(chunk) == CHUNK_FRAMES:
+                yield index, previous, chunk
+                index += len(chunk)
+                previous = chunk[-1]
+                chunk = []
+        if chunk:
+            yield index, previous, chunk
+
+    frames = 0
+    out = open(output, "wb") if gif else None
+    try:
+        if out:
+            width, height = round(court.game_width * scale), round(court.game_height * scale)
+            out.write(gif_header(width, height, palette))
+        if workers == 1:
+            init_worker(*encoder_args)
+            for task in chunks():
+                write_frames(out, encode_chunk(task))
+                frames += len(task[2])
+        else:
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=encoder_args) as pool:
+                pending = deque()
+                for task in chunks():
+                    pending.append((len(task[2]), pool.submit(encode_chunk, task)))
+                    if len(pending) >= workers * CHUNKS_IN_FLIGHT:
+                        count, future = pending.popleft()
+                        write_frames(out, future.result())
+                        frames += count
+                # The rest, in order
+                while pending:
+                    count, future = pending.popleft()
+                    write_frames(out, future.result())
+                    frames += count
+        if out:
+            out.write(b";")
+    finally:
+        if out:
+            out.close()
+    return frames
+
+
+def write_frames(out, data):
+    """Append encoded GIF frames; PNG workers have written theirs already."""
+    if out:
+        out.writelines(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a Pong recording to a GIF or PNG frames.")
+    parser.add_argument("recording")
+    parser.add_argument("-o", "--output", required=True, help="a .gif file, or a directory for PNG frames")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    parser.add_argument("--start", type=float, default=0.0, help="first second of game time to render")
+    parser.add_argument("--end", type=float, default=None, help="last second of game time to render")
+    parser.add_argument("--skin", default="default", choices=list(SKIN_FILES))
+    parser.add_argument("--names", nargs=2, default=("Player 1", "Player 2"), metavar="NAME")
+    parser.add_argument("--scale", type=float, default=1.0, help="output size relative to the court")
+    parser.add_argument("--workers", type=int, default=None, help="encoding processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    try:
+        recording = Recording.load(args.recording)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Error reading recording {args.recording}: {e}")
+        return 1
+    try:
+        frames = render_recording(recording, args.output, args.fps, args.start, args.end, args.skin,
+                                  tuple(args.names), args.scale, args.workers)
+    except OSError as e:
+        print(f"Error writing {args.output}: {e}")
+        return 1
+    print(f"{frames} frames written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Clickable widgets and a grid index that finds the one under a click.
+
+Widgets are rectangles in court coordinates (origin at the center, y up)
+given by their center and size, the same way menus draw their borders,
+so a button is hit exactly where it is drawn. WidgetIndex buckets them
+into square cells; a click only tests the widgets in its own cell, so
+the cost of a click does not grow with the number of buttons on screen.
+"""
+import math
+
+CELL_SIZE = 64
+
+
+class Widget:
+    """A clickable rectangle and the function it calls."""
+
+    __slots__ = ("left", "bottom", "right", "top", "onclick", "sound")
+
+    def __init__(self, x, y, width, height, onclick, sound=True):
+        self.left = x - width / 2
+        self.right = x + width / 2
+        self.bottom = y - height / 2
+        self.top = y + height / 2
+        self.onclick = onclick
+        # False when onclick plays its own click sound
+        self.sound = sound
+
+    def contains(self, x, y):
+        return self.left < x < self.right and self.bottom < y < self.top
+
+
+class WidgetIndex:
+    """Widgets bucketed by the grid cells they overlap.
+
+    Where widgets overlap, the one added last wins, as it is drawn on top.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def cell_range(self, low, high):
+        return range(math.floor(low / self.cell_size), math.floor(high / self.cell_size) + 1)
+
+    def add(self, widget):
+        for column in self.cell_range(widget.left, widget.right):
+            for row in self.cell_range(widget.bottom, widget.top):
+                self.cells.setdefault((column, row), []).append(widget)
+        return widget
+
+    def find(self, x, y):
+        """Return the widget under (x, y), or None."""
+        cell = self.cells.get((math.floor(x / self.cell_size), math.floor(y / self.cell_size)), ())
+        for widget in reversed(cell):
+            if widget.contains(x, y):
+                return widget
+        return None
+
+    def clear(self):
+        self.cells.clear()